@@ -0,0 +1 @@
+"""Reproducible benchmarks for the agent harness and the agents."""
@@ -0,0 +1,194 @@
+"""Micro-benchmarks of the Board primitives every agent is built on.
+
+Run from the repository root::
+
+    python -m benchmarks.board_primitives                   # compare with the stored baseline
+    python -m benchmarks.board_primitives --update-baseline # record a new baseline
+
+Positions and move samples come from fixed seeds, so two runs time exactly the
+same work. Any primitive that got slower than its baseline by more than
+``--threshold`` is reported and makes the command exit with status 1.
+"""
+
+from __future__ import annotations
+
+import argparse
+import io
+import json
+import os
+import platform
+import random
+import sys
+import timeit
+from typing import Callable, Dict, List, Tuple
+
+from dots_core.board import Board, PlayerSide, get_capturing_grids
+from dots_core.move import Move
+from dots_core.token_stream import TokenStream
+
+SIZES = (3, 5, 10, 20, 30)
+SEED = 20240601
+FILL_RATIO = 0.5  # fraction of lines drawn in the benchmark positions
+SAMPLE_MOVES = 64
+DEFAULT_THRESHOLD = 0.25
+DEFAULT_BASELINE = os.path.join(os.path.dirname(__file__), "baselines", "board_primitives.json")
+
+
+def empty_board(rows: int, cols: int) -> Board:
+    return Board(
+        rows,
+        cols,
+        [[0] * (cols - 1) for _ in range(rows)],
+        [[0] * cols for _ in range(rows - 1)],
+        [[0] * (cols - 1) for _ in range(rows - 1)],
+    )
+
+
+def midgame_board(size: int, rng: random.Random) -> Board:
+    """Board with ``FILL_RATIO`` of its lines drawn by a seeded random game."""
+    board = empty_board(size, size)
+    moves = board.get_valid_moves()
+    rng.shuffle(moves)
+    side = PlayerSide.FIRST_PLAYER
+    for move in moves[: int(len(moves) * FILL_RATIO)]:
+        if not board.make_move(move, side):
+            side = side.opponent()
+    return board
+
+
+def board_to_text(board: Board) -> str:
+    """Serialise *board* the way ``ui.py`` sends it to an agent."""
+    stringify_grid = lambda grid: "\n".join(" ".join(str(int(x)) for x in row) for row in grid)
+    return "\n".join([
+        f"{board.rows} {board.cols}",
+        stringify_grid(board.horizontal_lines),
+        stringify_grid(board.vertical_lines),
+        stringify_grid(board.grid_owner),
+    ])
+
+
+def random_playout(board: Board, rng: random.Random) -> None:
+    side = PlayerSide.FIRST_PLAYER
+    while not board.is_completed():
+        if not board.make_move(rng.choice(board.get_valid_moves()), side):
+            side = side.opponent()
+
+
+def build_cases(size: int) -> List[Tuple[str, Callable[[], object], int]]:
+    """Return ``(name, callable, operations per call)`` for one board size."""
+    rng = random.Random(SEED + size)
+    board = midgame_board(size, rng)
+    valid = board.get_valid_moves()
+    sample: List[Move] = [rng.choice(valid) for _ in range(SAMPLE_MOVES)]
+    remaining = list(valid)
+    rng.shuffle(remaining)
+    text = board_to_text(board)
+    playout_seed = rng.randrange(1 << 30)
+
+    def play_remaining() -> None:
+        clone = board.clone()
+        side = PlayerSide.FIRST_PLAYER
+        for move in remaining:
+            if not clone.make_move(move, side):
+                side = side.opponent()
+
+    def capturing_grids() -> None:
+        for move in sample:
+            get_capturing_grids(board, move)
+
+    def capturing_moves() -> None:
+        for move in sample:
+            board.is_capturing_move(move)
+
+    tag = f"{size}x{size}"
+    return [
+        (f"clone/{tag}", board.clone, 1),
+        # one clone amortised over playing every remaining line
+        (f"make_move/{tag}", play_remaining, len(remaining)),
+        (f"get_valid_moves/{tag}", board.get_valid_moves, 1),
+        (f"get_capturing_grids/{tag}", capturing_grids, len(sample)),
+        (f"is_capturing_move/{tag}", capturing_moves, len(sample)),
+        (f"from_token_stream/{tag}", lambda: Board.from_token_stream(TokenStream(io.StringIO(text))), 1),
+        (f"random_playout/{tag}", lambda: random_playout(empty_board(size, size), random.Random(playout_seed)), 1),
+    ]
+
+
+def time_case(func: Callable[[], object], ops: int, repeat: int) -> float:
+    """Best-of-*repeat* seconds per operation."""
+    timer = timeit.Timer(func)
+    number, _ = timer.autorange()
+    return min(timer.repeat(repeat=repeat, number=number)) / (number * ops)
+
+
+def run(sizes: List[int], repeat: int, name_filter: str) -> Dict[str, float]:
+    results: Dict[str, float] = {}
+    for size in sizes:
+        for name, func, ops in build_cases(size):
+            if name_filter in name:
+                results[name] = time_case(func, ops, repeat)
+    return results
+
+
+def load_baseline(path: str) -> Dict[str, float]:
+    if not os.path.isfile(path):
+        return {}
+    with open(path) as f:
+        return json.load(f)["results"]
+
+
+def save_baseline(path: str, results: Dict[str, float]) -> None:
+    merged = load_baseline(path)
+    merged.update(results)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "w") as f:
+        json.dump({
+            "python": platform.python_version(),
+            "machine": platform.machine(),
+            "results": dict(sorted(merged.items())),
+        }, f, indent=2)
+        f.write("\n")
+
+
+def report(results: Dict[str, float], baseline: Dict[str, float], threshold: float) -> List[str]:
+    """Print a comparison table and return the names of regressed benchmarks."""
+    regressions = []
+    print(f"{'benchmark':<28} {'baseline us':>12} {'now us':>12} {'ratio':>7}")
+    for name, seconds in results.items():
+        base = baseline.get(name)
+        if base is None:
+            print(f"{name:<28} {'-':>12} {seconds * 1e6:>12.2f} {'-':>7}")
+            continue
+        ratio = seconds / base
+        flag = ""
+        if ratio > 1 + threshold:
+            regressions.append(name)
+            flag = "  REGRESSION"
+        print(f"{name:<28} {base * 1e6:>12.2f} {seconds * 1e6:>12.2f} {ratio:>7.2f}{flag}")
+    return regressions
+
+
+def main(argv: List[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=list(SIZES), help="dots per side of the boards")
+    parser.add_argument("--repeat", type=int, default=5, help="timing repetitions, the best one counts")
+    parser.add_argument("--filter", default="", help="only run benchmarks whose name contains this")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD, help="allowed slowdown, 0.25 = 25%%")
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE)
+    parser.add_argument("--update-baseline", action="store_true")
+    args = parser.parse_args(argv)
+
+    results = run(args.sizes, args.repeat, args.filter)
+    regressions = report(results, load_baseline(args.baseline), args.threshold)
+
+    if args.update_baseline:
+        save_baseline(args.baseline, results)
+        print(f"baseline written to {args.baseline}")
+        return 0
+    if regressions:
+        print(f"{len(regressions)} benchmark(s) slower than baseline by more than {args.threshold:.0%}")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,106 @@
+"""Tune the UCT exploration constant of the MCTS agent.
+
+Run from the repository root::
+
+    python -m benchmarks.mcts_tuning --sizes 3 5 8 --constants 0.3 0.5 0.7 1.0 1.4 \\
+        --baseline 1.4 --rollouts 300 --games 20
+
+Each candidate constant plays ``--games`` games against the same agent with
+the ``--baseline`` constant, both at a fixed number of rollouts per move
+(``MCTS_MAX_ITERS``) and with a clock too long to matter, so the result
+depends on the constant and not on the machine. Every player runs its own
+copy of ``python_agent_MCTS.submission.agent``, re-executed for each game,
+with the overrides applied to it. The report gives each candidate's Elo
+against the baseline, as in :mod:`benchmarks.strength`, and the best
+constant per size. The agent uses one constant, ``EXPLORATION``: a constant
+per size is only worth having where the Elo intervals separate.
+"""
+
+from __future__ import annotations
+
+import argparse
+import contextlib
+import importlib.util
+import json
+import os
+import sys
+from typing import Dict, List, Optional
+
+from benchmarks.strength import AgentUnderTest, print_report, run_match
+
+MCTS_MODULE = "python_agent_MCTS.submission.agent"
+DEFAULT_SIZES = (3, 5, 8)
+DEFAULT_CONSTANTS = (0.3, 0.5, 0.7, 1.0, 1.4)
+DEFAULT_BASELINE = 1.4
+UNLIMITED_SECS = 1e6  # per game: rollouts, not the clock, bound the search
+
+
+class MCTSPlayer(AgentUnderTest):
+    """A private copy of the MCTS agent with module constants overridden."""
+
+    def __init__(self, name: str, overrides: Dict[str, object]) -> None:
+        self.name = name
+        self.overrides = overrides
+        self.nodes = 0
+        self.new_game()
+
+    def new_game(self) -> None:
+        # a module object of our own, so two players never share the tree
+        spec = importlib.util.find_spec(MCTS_MODULE)
+        module = importlib.util.module_from_spec(spec)
+        spec.loader.exec_module(module)
+        for attribute, value in self.overrides.items():
+            setattr(module, attribute, value)
+        self.submission = module
+        self.nodes = 0
+
+
+def exploration_player(c: float, rollouts: int) -> MCTSPlayer:
+    overrides = {
+        "EXPLORATION": c,
+        "MCTS_MAX_ITERS": rollouts,
+        "TOTAL_GAME_TIME": UNLIMITED_SECS,
+    }
+    return MCTSPlayer(f"mcts c={c:g}", overrides)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=list(DEFAULT_SIZES), help="dots per side of the board")
+    parser.add_argument("--constants", type=float, nargs="+", default=list(DEFAULT_CONSTANTS),
+                        help="exploration constants to try")
+    parser.add_argument("--baseline", type=float, default=DEFAULT_BASELINE, help="constant of the opponent")
+    parser.add_argument("--rollouts", type=int, default=300, help="rollouts per move")
+    parser.add_argument("--games", type=int, default=10, help="games per size and constant")
+    parser.add_argument("--json", help="also write the rows to this file")
+    parser.add_argument("--verbose", action="store_true", help="keep the agents' log output")
+    args = parser.parse_args(argv)
+
+    baseline = exploration_player(args.baseline, args.rollouts)
+    rows = []
+    best: Dict[int, dict] = {}
+    with open(os.devnull, "w") as devnull:
+        agent_logs = contextlib.nullcontext() if args.verbose else contextlib.redirect_stderr(devnull)
+        with agent_logs:
+            for size in args.sizes:
+                for c in args.constants:
+                    row = run_match(exploration_player(c, args.rollouts), baseline, args.games, size, UNLIMITED_SECS)
+                    row.update(size=size, exploration=c)
+                    rows.append(row)
+                    if size not in best or row["score"] > best[size]["score"]:
+                        best[size] = row
+
+    for size in best:
+        print(f"{size}x{size}, {args.rollouts} rollouts per move, baseline c={args.baseline:g}")
+        print_report([row for row in rows if row["size"] == size])
+        print()
+    table = ", ".join(f"{size}: {row['exploration']:g}" for size, row in best.items())
+    print(f"best constant per size: {table}")
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(rows, f, indent=2)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
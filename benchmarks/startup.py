@@ -0,0 +1,91 @@
+"""Agent startup latency: how long until a fresh process talks to the engine.
+
+Run from the repository root::
+
+    python -m benchmarks.startup python_agent python_agent_9 --runs 20
+    python -m benchmarks.startup python_agent --imports   # slowest imports too
+
+Each run spawns ``python -m dots_core <agent>`` like ``ui.py`` does and
+measures the time to its first message (``!REQ_PLAYER_NUM``) and, after the
+player number is answered, to ``!REQ_BOARD``. On small boards a tournament's
+throughput is dominated by these numbers.
+"""
+
+from __future__ import annotations
+
+import argparse
+import statistics
+import subprocess as sps
+import sys
+import time
+from typing import List, Optional, Tuple
+
+
+def time_startup(agent: str) -> Tuple[float, float]:
+    """Seconds to the first message, and to ``!REQ_BOARD``."""
+    start = time.perf_counter()
+    proc = sps.Popen(
+        [sys.executable, "-m", "dots_core", agent],
+        stdin=sps.PIPE,
+        stdout=sps.PIPE,
+        stderr=sps.DEVNULL,
+        text=True,
+    )
+    try:
+        first = proc.stdout.readline().strip()
+        first_at = time.perf_counter() - start
+        assert first == "!REQ_PLAYER_NUM", f"unexpected first message {first!r}"
+
+        proc.stdin.write("1\n")
+        proc.stdin.flush()
+        second = proc.stdout.readline().strip()
+        board_at = time.perf_counter() - start
+        assert second == "!REQ_BOARD", f"unexpected second message {second!r}"
+    finally:
+        proc.kill()
+        proc.wait()
+    return first_at, board_at
+
+
+def slowest_imports(agent: str, top: int) -> List[Tuple[int, str]]:
+    """Cumulative microseconds of the slowest imports, from ``-X importtime``."""
+    proc = sps.run(
+        [sys.executable, "-X", "importtime", "-m", "dots_core", agent],
+        input="",
+        stdout=sps.DEVNULL,
+        stderr=sps.PIPE,
+        text=True,
+    )
+    imports = []
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        imports.append((int(cumulative), name.rstrip()))
+    return sorted(imports, reverse=True)[:top]
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("agents", nargs="+", help="agent packages to start")
+    parser.add_argument("--runs", type=int, default=10)
+    parser.add_argument("--imports", action="store_true", help="also list the slowest imports")
+    args = parser.parse_args(argv)
+
+    print(f"{'agent':<20} {'first msg ms':>13} {'min':>7} {'board req ms':>13} {'min':>7}")
+    for agent in args.agents:
+        samples = [time_startup(agent) for _ in range(args.runs)]
+        first = [1000 * s[0] for s in samples]
+        board = [1000 * s[1] for s in samples]
+        print(
+            f"{agent:<20} {statistics.median(first):>13.1f} {min(first):>7.1f} "
+            f"{statistics.median(board):>13.1f} {min(board):>7.1f}"
+        )
+        if args.imports:
+            for cumulative, name in slowest_imports(agent, 15):
+                print(f"    {cumulative / 1000:>8.1f} ms {name}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,196 @@
+"""Strength per CPU second: agents against fixed reference opponents.
+
+Run from the repository root::
+
+    python -m benchmarks.strength python_agent_4 python_agent_9 python_agent_MCTS \\
+        --references python_agent python_agent_7 --time-controls 1 10 60 --games 20
+
+Games run in-process through :class:`dots_core.referee.Referee` and the
+controller's snapshot mode (``use_protocol=False``), so no time is lost to
+subprocesses and pipes. Every
+player gets a chess-style clock of ``time control`` seconds per game; running
+out of time or playing an illegal move loses the game. For each agent,
+reference and time control the report gives the Elo difference to the
+reference with a 95% confidence interval, the games lost by forfeit, the
+average think time per move and the nodes (or rollouts) per second reported
+through ``profiling.count_nodes``.
+"""
+
+from __future__ import annotations
+
+import argparse
+import contextlib
+import importlib
+import json
+import math
+import os
+import random
+import sys
+from typing import Dict, List, Optional, Tuple
+
+from dots_core import profiling
+from dots_core.board import Board, PlayerSide
+from dots_core.referee import GameResult, Referee
+
+DEFAULT_REFERENCES = ("python_agent", "python_agent_7")
+DEFAULT_TIME_CONTROLS = (1.0, 10.0, 60.0)
+SEED = 1234
+Z_95 = 1.96
+
+
+class AgentUnderTest:
+    """A submission loaded in-process, counting the nodes it reports."""
+
+    def __init__(self, name: str) -> None:
+        self.name = name
+        self.submission = importlib.import_module(f"{name}.submission.agent")
+        self.nodes = 0
+
+    def new_game(self) -> None:
+        # submissions keep state in module globals (e.g. the MCTS tree)
+        self.submission = importlib.reload(self.submission)
+        self.nodes = 0
+
+    def make_move(self, controller):
+        nodes_before = profiling.nodes
+        try:
+            return self.submission.make_move(controller)
+        finally:
+            self.nodes += profiling.nodes - nodes_before
+
+
+class PlayerStats:
+    def __init__(self) -> None:
+        self.moves = 0
+        self.think_seconds = 0.0
+        self.nodes = 0
+
+
+def play_game(
+    first: AgentUnderTest,
+    second: AgentUnderTest,
+    size: int,
+    time_limit: float,
+    seed: int,
+) -> Tuple[GameResult, Dict[PlayerSide, PlayerStats]]:
+    """Play one refereed game; returns its result and each side's stats."""
+    random.seed(seed)
+    board = Board(
+        size,
+        size,
+        [[0] * (size - 1) for _ in range(size)],
+        [[0] * size for _ in range(size - 1)],
+        [[0] * (size - 1) for _ in range(size - 1)],
+    )
+    agents = {PlayerSide.FIRST_PLAYER: first, PlayerSide.SECOND_PLAYER: second}
+    for agent in agents.values():
+        agent.new_game()
+
+    result = Referee(first.make_move, second.make_move, board, time_limit_secs=time_limit).play()
+
+    stats = {}
+    for side, agent in agents.items():
+        stats[side] = PlayerStats()
+        stats[side].moves = result.moves[side]
+        stats[side].think_seconds = result.think_seconds[side]
+        stats[side].nodes = agent.nodes
+    return result, stats
+
+
+def elo_with_interval(results: List[float]) -> Tuple[float, float, float]:
+    """Elo difference implied by the mean score, with a 95% interval."""
+    n = len(results)
+    mean = sum(results) / n
+    variance = sum((r - mean) ** 2 for r in results) / max(1, n - 1)
+    margin = Z_95 * math.sqrt(variance / n)
+
+    def to_elo(p: float) -> float:
+        # a perfect score has no finite Elo, clamp to half a game from it
+        p = min(max(p, 0.5 / n), 1 - 0.5 / n)
+        return -400 * math.log10(1 / p - 1)
+
+    return to_elo(mean), to_elo(mean - margin), to_elo(mean + margin)
+
+
+def run_match(
+    agent: AgentUnderTest,
+    reference: AgentUnderTest,
+    games: int,
+    size: int,
+    time_limit: float,
+) -> dict:
+    results: List[float] = []
+    totals = PlayerStats()
+    forfeits = 0
+    for game in range(games):
+        # alternate who moves first so neither player keeps the tempo
+        if game % 2 == 0:
+            outcome, stats = play_game(agent, reference, size, time_limit, SEED + game)
+            agent_side = PlayerSide.FIRST_PLAYER
+        else:
+            outcome, stats = play_game(reference, agent, size, time_limit, SEED + game)
+            agent_side = PlayerSide.SECOND_PLAYER
+        results.append(outcome.result_for(agent_side))
+        forfeits += outcome.forfeited is agent_side
+        totals.moves += stats[agent_side].moves
+        totals.think_seconds += stats[agent_side].think_seconds
+        totals.nodes += stats[agent_side].nodes
+
+    elo, low, high = elo_with_interval(results)
+    return {
+        "agent": agent.name,
+        "reference": reference.name,
+        "timeControl": time_limit,
+        "games": games,
+        "score": sum(results) / games,
+        "forfeits": forfeits,
+        "elo": elo,
+        "eloLow": low,
+        "eloHigh": high,
+        "avgThinkMs": 1000 * totals.think_seconds / max(1, totals.moves),
+        "nodesPerSec": totals.nodes / totals.think_seconds if totals.think_seconds > 0 else 0.0,
+    }
+
+
+def print_report(rows: List[dict]) -> None:
+    print(f"{'agent':<20} {'reference':<16} {'tc s':>5} {'score':>6} {'forf':>4} {'elo':>7} {'95% ci':>17} {'think ms':>9} {'nodes/s':>9}")
+    for row in rows:
+        ci = f"[{row['eloLow']:.0f}, {row['eloHigh']:.0f}]"
+        print(
+            f"{row['agent']:<20} {row['reference']:<16} {row['timeControl']:>5g} {row['score']:>6.2f} {row['forfeits']:>4} "
+            f"{row['elo']:>7.0f} {ci:>17} {row['avgThinkMs']:>9.1f} {row['nodesPerSec']:>9.0f}"
+        )
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("agents", nargs="+", help="agent packages to evaluate")
+    parser.add_argument("--references", nargs="+", default=list(DEFAULT_REFERENCES))
+    parser.add_argument("--time-controls", type=float, nargs="+", default=list(DEFAULT_TIME_CONTROLS),
+                        help="seconds per player per game")
+    parser.add_argument("--games", type=int, default=10, help="games per agent, reference and time control")
+    parser.add_argument("--size", type=int, default=5, help="dots per side of the board")
+    parser.add_argument("--json", help="also write the rows to this file")
+    parser.add_argument("--verbose", action="store_true", help="keep the agents' log output")
+    args = parser.parse_args(argv)
+
+    references = [AgentUnderTest(name) for name in args.references]
+    rows = []
+    with open(os.devnull, "w") as devnull:
+        agent_logs = contextlib.nullcontext() if args.verbose else contextlib.redirect_stderr(devnull)
+        with agent_logs:
+            for name in args.agents:
+                agent = AgentUnderTest(name)
+                for time_limit in args.time_controls:
+                    for reference in references:
+                        rows.append(run_match(agent, reference, args.games, args.size, time_limit))
+
+    print_report(rows)
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(rows, f, indent=2)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1 @@
+"""Shared harness for Python dots game agents: board, controller and protocol."""
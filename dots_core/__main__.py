@@ -0,0 +1,62 @@
+from __future__ import annotations
+
+import importlib
+import os
+import sys
+import threading
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:  # pragma: no cover
+    from types import ModuleType
+    from typing import List, Optional
+
+
+class _BackgroundImport(threading.Thread):
+    """Import a module while the main thread is blocked on the engine handshake."""
+
+    def __init__(self, name: str) -> None:
+        super().__init__(daemon=True)
+        self.name_to_import = name
+        self.module: Optional[ModuleType] = None
+        self.error: Optional[BaseException] = None
+
+    def run(self) -> None:
+        try:
+            self.module = importlib.import_module(self.name_to_import)
+        except BaseException as e:  # re-raised in the main thread
+            self.error = e
+
+    def result(self) -> ModuleType:
+        self.join()
+        if self.error is not None:
+            raise self.error
+        assert self.module is not None
+        return self.module
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    """Run the agent package named on the command line (``python -m dots_core python_agent``)."""
+    args = sys.argv[1:] if argv is None else argv
+    if len(args) != 1:
+        sys.exit("usage: python -m dots_core <agent package>")
+
+    # the submission (and whatever it imports) loads while the engine answers
+    # !REQ_PLAYER_NUM / !REQ_BOARD, instead of delaying the first message
+    submission_import = _BackgroundImport(f"{args[0]}.submission.agent")
+    submission_import.start()
+
+    from .agent import Agent
+    from .controller import Controller
+
+    # DOTS_PUSH_TIME=1: the engine answers !REQ_MOVES_TIMED (ui.py sets it)
+    controller = Controller(push_time=os.environ.get("DOTS_PUSH_TIME") == "1")
+    submission = submission_import.result()
+    agent_dir = os.path.dirname(os.path.dirname(os.path.abspath(submission.__file__)))
+
+    agent = Agent(controller, submission.make_move, agent_dir)
+    agent.init()
+    agent.run()
+
+
+if __name__ == "__main__":
+    main()
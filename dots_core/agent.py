@@ -0,0 +1,58 @@
+from __future__ import annotations
+
+import random
+from typing import TYPE_CHECKING
+
+from .profiling import GameProfiler
+
+if TYPE_CHECKING:  # pragma: no cover
+    from typing import Callable, Optional, Tuple
+
+    from .controller import Controller
+    from .move import Move
+# import time
+# from time import sleep
+
+
+class Agent:
+    """Python port of the starter C++ agent scaffolding."""
+
+    def __init__(
+        self,
+        controller: Controller,
+        make_move: Callable[[Controller], Tuple[bool, Move]],
+        agent_dir: Optional[str] = None,
+    ) -> None:
+        self.controller = controller
+        self.make_move = make_move
+        self.agent_dir = agent_dir
+
+    def init(self) -> None:
+        # Use a fixed seed for deterministic behavior across runs
+        # sleep(5)
+        random.seed(42)
+
+    def run(self) -> None:
+        profiler = GameProfiler.from_env(self.controller, self.agent_dir)
+        if profiler is None:
+            self._play(self.make_move)
+            return
+
+        profiler.start()
+        try:
+            self._play(profiler.wrap(self.make_move))
+        finally:
+            profiler.finish()
+
+    def _play(self, make_move) -> None:
+        board = self.controller.get_current_board()
+        while not board.is_completed():
+            while True:
+                requires_more, _ = make_move(self.controller)
+                if not requires_more or board.is_completed():
+                    break
+            if board.is_completed():
+                break
+
+
+__all__ = ["Agent"]
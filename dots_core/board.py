@@ -0,0 +1,412 @@
+from __future__ import annotations
+
+from enum import IntEnum
+from typing import TYPE_CHECKING
+
+from . import tables
+from .move import Move
+
+if TYPE_CHECKING:  # pragma: no cover
+    from typing import Callable, Dict, List, Sequence, Tuple
+
+    from .token_stream import TokenStream
+
+    # called as listener(move, side, captured) after make_move; captured holds
+    # the (row, col) of every box the move completed
+    MoveListener = Callable[[Move, "PlayerSide", List[Tuple[int, int]]], None]
+
+
+class PlayerSide(IntEnum):
+    FIRST_PLAYER = 1
+    SECOND_PLAYER = 2
+
+    def opponent(self) -> "PlayerSide":
+        return PlayerSide.SECOND_PLAYER if self is PlayerSide.FIRST_PLAYER else PlayerSide.FIRST_PLAYER
+
+
+class GridOwner(IntEnum):
+    UNSPECIFIED = 0
+    FIRST_PLAYER = 1
+    SECOND_PLAYER = 2
+    PRE_FILLED = 3
+
+    @staticmethod
+    def from_side(side: PlayerSide) -> "GridOwner":
+        if side is PlayerSide.FIRST_PLAYER:
+            return GridOwner.FIRST_PLAYER
+        if side is PlayerSide.SECOND_PLAYER:
+            return GridOwner.SECOND_PLAYER
+        raise ValueError(f"Unsupported player side: {side}")
+
+
+class MoveClass(IntEnum):
+    """What a move does to the boxes next to it (``Board.edge_class`` values)."""
+
+    DRAWN = 0
+    SAFE = 1  # no box next to it reaches three sides
+    SACRIFICE = 2  # hands the opponent at least one box
+    CAPTURE = 3  # completes a box
+
+
+# Board line value -> MoveClass of the edge, before boxes raise it
+_LINE_CLASS = bytes([MoveClass.SAFE]) + bytes([MoveClass.DRAWN]) * 255
+
+
+class Board:
+    """Game board state mirroring the behaviour of the C++ reference."""
+
+    def __init__(
+        self,
+        rows: int,
+        cols: int,
+        horizontal_lines: Sequence[Sequence[int]],
+        vertical_lines: Sequence[Sequence[int]],
+        grid_owner: Sequence[Sequence[int | GridOwner]],
+    ) -> None:
+        self.rows = rows
+        self.cols = cols
+        self.horizontal_lines: List[List[int]] = [list(row) for row in horizontal_lines]
+        self.vertical_lines: List[List[int]] = [list(row) for row in vertical_lines]
+        self.grid_owner: List[List[GridOwner]] = [
+            [cell if isinstance(cell, GridOwner) else GridOwner(cell) for cell in row]
+            for row in grid_owner
+        ]
+
+        self.scores: Dict[PlayerSide, int] = {
+            PlayerSide.FIRST_PLAYER: 0,
+            PlayerSide.SECOND_PLAYER: 0,
+        }
+        self.num_empty_grids = 0
+        self.num_horizontal_lines_left = 0
+        self.num_vertical_lines_left = 0
+        # box id -> number of drawn sides, kept up to date by make_move
+        self.box_sides: List[int] = []
+        # edge id -> MoveClass: the most sides of a box next to the edge, at
+        # least SAFE for an undrawn edge; kept up to date by make_move
+        self.edge_class = bytearray()
+        # Zobrist hash of the drawn lines, kept up to date by make_move
+        self.zobrist = 0
+        self._zobrist_keys = tables.zobrist_keys(rows, cols)
+        self._edge_boxes = tables.edge_boxes(rows, cols)
+        self._box_edges = tables.box_edges(rows, cols)
+        self._box_cells = tables.box_cells(rows, cols)
+        self._listeners: List[MoveListener] = []
+        self._recompute_metadata()
+
+    @classmethod
+    def from_token_stream(cls, tokens: TokenStream) -> "Board":
+        rows = tokens.next_int()
+        cols = tokens.next_int()
+        horizontal = [[tokens.next_int() for _ in range(cols - 1)] for _ in range(rows)]
+        vertical = [[tokens.next_int() for _ in range(cols)] for _ in range(rows - 1)]
+        owners = [[tokens.next_int() for _ in range(cols - 1)] for _ in range(rows - 1)]
+        return cls(rows, cols, horizontal, vertical, owners)
+
+    def clone(self) -> "Board":
+        # skips the constructor: the metadata is copied instead of recomputed
+        copy = Board.__new__(Board)
+        copy.rows = self.rows
+        copy.cols = self.cols
+        copy.horizontal_lines = [row[:] for row in self.horizontal_lines]
+        copy.vertical_lines = [row[:] for row in self.vertical_lines]
+        copy.grid_owner = [row[:] for row in self.grid_owner]
+        copy.scores = dict(self.scores)
+        copy.num_empty_grids = self.num_empty_grids
+        copy.num_horizontal_lines_left = self.num_horizontal_lines_left
+        copy.num_vertical_lines_left = self.num_vertical_lines_left
+        copy.box_sides = self.box_sides[:]
+        copy.edge_class = self.edge_class[:]
+        copy.zobrist = self.zobrist
+        copy._zobrist_keys = self._zobrist_keys
+        copy._edge_boxes = self._edge_boxes
+        copy._box_edges = self._box_edges
+        copy._box_cells = self._box_cells
+        copy._listeners = []  # listeners follow one board, not its copies
+        return copy
+
+    def __getstate__(self) -> dict:
+        # the shared per-size tables are looked up again on unpickling
+        state = self.__dict__.copy()
+        for name in ("_zobrist_keys", "_edge_boxes", "_box_edges", "_box_cells", "_listeners"):
+            del state[name]
+        return state
+
+    def __setstate__(self, state: dict) -> None:
+        self.__dict__.update(state)
+        self._zobrist_keys = tables.zobrist_keys(self.rows, self.cols)
+        self._edge_boxes = tables.edge_boxes(self.rows, self.cols)
+        self._box_edges = tables.box_edges(self.rows, self.cols)
+        self._box_cells = tables.box_cells(self.rows, self.cols)
+        self._listeners = []
+
+    def subscribe(self, listener: MoveListener) -> None:
+        """Call ``listener(move, side, captured)`` after every ``make_move`` on this board.
+
+        *captured* lists the ``(row, col)`` of the boxes the move completed.
+        Copies made by :meth:`clone` start without listeners, and
+        :meth:`unmake_move` reports nothing, so searches on copies stay silent.
+        """
+        self._listeners.append(listener)
+
+    def unsubscribe(self, listener: MoveListener) -> None:
+        self._listeners.remove(listener)
+
+    def edge_id(self, move: Move) -> int:
+        """Index of *move* in the per-size tables of :mod:`dots_core.tables`."""
+        if move.is_horizontal:
+            return move.row * (self.cols - 1) + move.col
+        return self.rows * (self.cols - 1) + move.row * self.cols + move.col
+
+    def _recompute_metadata(self) -> None:
+        self.num_horizontal_lines_left = sum(1 for row in self.horizontal_lines for cell in row if cell == 0)
+        self.num_vertical_lines_left = sum(1 for row in self.vertical_lines for cell in row if cell == 0)
+        self.num_empty_grids = 0
+        self.scores[PlayerSide.FIRST_PLAYER] = 0
+        self.scores[PlayerSide.SECOND_PLAYER] = 0
+        for row in self.grid_owner:
+            for owner in row:
+                if owner is GridOwner.UNSPECIFIED:
+                    self.num_empty_grids += 1
+                elif owner is GridOwner.FIRST_PLAYER:
+                    self.scores[PlayerSide.FIRST_PLAYER] += 1
+                elif owner is GridOwner.SECOND_PLAYER:
+                    self.scores[PlayerSide.SECOND_PLAYER] += 1
+        h, v = self.horizontal_lines, self.vertical_lines
+        self.box_sides = [
+            (h[r][c] != 0) + (h[r + 1][c] != 0) + (v[r][c] != 0) + (v[r][c + 1] != 0)
+            for r, c in self._box_cells
+        ]
+        # lines are 0 or 1 in edge id order; translate them to DRAWN or SAFE
+        lines = b"".join(bytes(row) for row in h) + b"".join(bytes(row) for row in v)
+        self.edge_class = edge_class = bytearray(lines.translate(_LINE_CLASS))
+        box_edges = self._box_edges
+        for box, sides in enumerate(self.box_sides):
+            if sides >= 2:
+                # a box with two or three sides raises its undrawn edges
+                for e in box_edges[box]:
+                    if 0 < edge_class[e] < sides:
+                        edge_class[e] = sides
+        zobrist = 0
+        for key, line in zip(self._zobrist_keys, lines):
+            if line:
+                zobrist ^= key
+        self.zobrist = zobrist
+
+    def is_valid_move(self, move: Move) -> bool:
+        if move.is_horizontal:
+            if move.row < 0 or move.row >= self.rows:
+                return False
+            if move.col < 0 or move.col >= self.cols - 1:
+                return False
+            return self.horizontal_lines[move.row][move.col] == 0
+        if move.row < 0 or move.row >= self.rows - 1:
+            return False
+        if move.col < 0 or move.col >= self.cols:
+            return False
+        return self.vertical_lines[move.row][move.col] == 0
+
+    def requires_continuation(self, move: Move) -> bool:
+        return self.is_capturing_move(move) and not self.is_completing_move(move)
+
+    def is_completing_move(self, move: Move) -> bool:
+        return (self.num_horizontal_lines_left + self.num_vertical_lines_left) == 1
+
+    def is_capturing_move(self, move: Move) -> bool:
+        if move.is_horizontal:
+            sides = 4 if self.horizontal_lines[move.row][move.col] else 3
+        else:
+            sides = 4 if self.vertical_lines[move.row][move.col] else 3
+        box_sides = self.box_sides
+        for box in self._edge_boxes[self.edge_id(move)]:
+            if box_sides[box] == sides:
+                return True
+        return False
+
+    def make_move(self, move: Move, side: PlayerSide) -> bool:
+        if not self.is_valid_move(move):
+            raise ValueError(f"Invalid move attempted: {move}")
+
+        edge = self.edge_id(move)
+        edge_class = self.edge_class
+        edge_class[edge] = 0  # MoveClass.DRAWN; enum lookups cost on this path
+        self.zobrist ^= self._zobrist_keys[edge]
+        box_sides = self.box_sides
+        capturing_grids = []
+        for box in self._edge_boxes[edge]:
+            sides = box_sides[box] + 1
+            box_sides[box] = sides
+            if sides == 4:
+                capturing_grids.append(self._box_cells[box])
+            elif sides >= 2:
+                # a box with two or three sides raises its undrawn edges
+                for e in self._box_edges[box]:
+                    if 0 < edge_class[e] < sides:
+                        edge_class[e] = sides
+        is_completing = self.num_horizontal_lines_left + self.num_vertical_lines_left == 1
+
+        for grid_row, grid_col in capturing_grids:
+            previous_owner = self.grid_owner[grid_row][grid_col]
+            if previous_owner is GridOwner.UNSPECIFIED:
+                self.num_empty_grids -= 1
+            elif previous_owner in (GridOwner.FIRST_PLAYER, GridOwner.SECOND_PLAYER):
+                previous_side = PlayerSide(previous_owner.value)
+                self.scores[previous_side] -= 1
+            owner = GridOwner.from_side(side)
+            self.grid_owner[grid_row][grid_col] = owner
+            self.scores[side] += 1
+
+        if move.is_horizontal:
+            self.horizontal_lines[move.row][move.col] = 1
+            self.num_horizontal_lines_left -= 1
+        else:
+            self.vertical_lines[move.row][move.col] = 1
+            self.num_vertical_lines_left -= 1
+
+        if self._listeners:
+            for listener in self._listeners[:]:
+                listener(move, side, capturing_grids)
+        return bool(capturing_grids) and not is_completing
+
+    def unmake_move(self, move: Move) -> None:
+        """Take back *move*, the last move made on this board."""
+        edge = self.edge_id(move)
+        box_sides = self.box_sides
+        for box in self._edge_boxes[edge]:
+            if box_sides[box] == 4:  # captured by this move
+                r, c = self._box_cells[box]
+                owner = self.grid_owner[r][c]
+                if owner is not GridOwner.UNSPECIFIED:
+                    self.scores[PlayerSide(owner.value)] -= 1
+                    self.grid_owner[r][c] = GridOwner.UNSPECIFIED
+                    self.num_empty_grids += 1
+            box_sides[box] -= 1
+
+        if move.is_horizontal:
+            self.horizontal_lines[move.row][move.col] = 0
+            self.num_horizontal_lines_left += 1
+        else:
+            self.vertical_lines[move.row][move.col] = 0
+            self.num_vertical_lines_left += 1
+        self.zobrist ^= self._zobrist_keys[edge]
+
+        # an undrawn edge is classed by the most sides of a box next to it
+        edge_class = self.edge_class
+        edge_class[edge] = MoveClass.SAFE
+        for box in self._edge_boxes[edge]:
+            for e in self._box_edges[box]:
+                if e == edge or edge_class[e] != MoveClass.DRAWN:
+                    edge_class[e] = max(
+                        [MoveClass.SAFE] + [box_sides[b] for b in self._edge_boxes[e] if box_sides[b] >= 2]
+                    )
+
+    def is_completed(self) -> bool:
+        return self.num_empty_grids == 0
+
+    def get_scores(self) -> Dict[PlayerSide, int]:
+        return dict(self.scores)
+
+    def get_valid_moves(self) -> List[Move]:
+        moves: List[Move] = []
+        for r in range(self.rows):
+            for c in range(self.cols - 1):
+                if self.horizontal_lines[r][c] == 0:
+                    moves.append(Move(r, c, True))
+        for r in range(self.rows - 1):
+            for c in range(self.cols):
+                if self.vertical_lines[r][c] == 0:
+                    moves.append(Move(r, c, False))
+        return moves
+
+
+    def sacrifice_sizes(self) -> List[int]:
+        """Box id -> boxes the opponent takes once the box gets a third side.
+
+        Boxes with two sides form paths and loops through their undrawn
+        edges. Any line that opens one draws the same lines in the end, so
+        the count is walked once per path or loop. Other boxes map to 0.
+        """
+        box_sides = self.box_sides
+        edge_class = self.edge_class
+        sizes = [0] * len(box_sides)
+        for start, sides in enumerate(box_sides):
+            if sides != 2 or sizes[start]:
+                continue
+            chain = [start]
+            sizes[start] = -1
+            for box in chain:  # grows while it is walked
+                for e in self._box_edges[box]:
+                    if edge_class[e] == MoveClass.DRAWN:
+                        continue
+                    for other in self._edge_boxes[e]:
+                        if box_sides[other] == 2 and not sizes[other]:
+                            sizes[other] = -1
+                            chain.append(other)
+            opening = next(e for e in self._box_edges[start] if edge_class[e] != MoveClass.DRAWN)
+            taken = self._forced_captures(opening)
+            for box in chain:
+                sizes[box] = taken
+        return sizes
+
+    def sacrifice_size(self, move: Move) -> int:
+        """Boxes the opponent can take right after *move*, 0 unless it is a sacrifice."""
+        edge = self.edge_id(move)
+        if self.edge_class[edge] != MoveClass.SACRIFICE:
+            return 0
+        return self._forced_captures(edge)
+
+    def _forced_captures(self, edge: int) -> int:
+        """Boxes the opponent takes in a row after *edge* is drawn."""
+        sides = {box: self.box_sides[box] + 1 for box in self._edge_boxes[edge]}
+        drawn = {edge}
+        ready = [box for box, n in sides.items() if n == 3]
+        taken = 0
+        while ready:
+            box = ready.pop()
+            if sides[box] != 3:  # completed from its other side meanwhile
+                continue
+            last = next(
+                e for e in self._box_edges[box]
+                if self.edge_class[e] != MoveClass.DRAWN and e not in drawn
+            )
+            drawn.add(last)
+            for other in self._edge_boxes[last]:  # includes *box* itself
+                n = sides.get(other, self.box_sides[other]) + 1
+                sides[other] = n
+                if n == 4:
+                    taken += 1
+                elif n == 3:
+                    ready.append(other)
+        return taken
+
+    def classify_moves(self) -> Tuple[List[Move], List[Move], List[Tuple[int, Move]]]:
+        """Capturing moves, safe moves and ``(k, move)`` for sacrifices of k boxes, in one pass."""
+        moves = tables.edge_moves(self.rows, self.cols)
+        captures: List[Move] = []
+        safe: List[Move] = []
+        sacrifices: List[Tuple[int, Move]] = []
+        sizes = None
+        for edge, kind in enumerate(self.edge_class):
+            if kind == MoveClass.SAFE:
+                safe.append(moves[edge])
+            elif kind == MoveClass.SACRIFICE:
+                if sizes is None:
+                    sizes = self.sacrifice_sizes()
+                sacrifices.append((max(sizes[box] for box in self._edge_boxes[edge]), moves[edge]))
+            elif kind == MoveClass.CAPTURE:
+                captures.append(moves[edge])
+        return captures, safe, sacrifices
+
+
+def get_capturing_grids(board: Board, move: Move) -> List[Tuple[int, int]]:
+    """Boxes whose other three sides are drawn, so *move* would complete them."""
+    cols = board.cols
+    # a box bordered by an already drawn *move* counts that side as well
+    if move.is_horizontal:
+        edge = move.row * (cols - 1) + move.col
+        sides = 4 if board.horizontal_lines[move.row][move.col] else 3
+    else:
+        edge = board.rows * (cols - 1) + move.row * cols + move.col
+        sides = 4 if board.vertical_lines[move.row][move.col] else 3
+    box_sides = board.box_sides
+    cells = board._box_cells
+    return [cells[box] for box in board._edge_boxes[edge] if box_sides[box] == sides]
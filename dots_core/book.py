@@ -0,0 +1,234 @@
+"""Opening book: best replies for opening positions, learned from self-play.
+
+Positions are keyed by a canonical hash: the Zobrist hash of the drawn lines,
+minimised over the board's symmetries, so mirrored and rotated openings share
+one entry. Each entry holds the book move in the canonical orientation; a
+lookup maps it back through the symmetry that produced the key.
+
+Build a book offline (it is not committed, like the tables snapshot)::
+
+    python -m dots_core.book --sizes 5 --agent python_agent_9 --games 400 --depth 6
+
+The generator plays random safe openings of ``--depth`` moves, lets the agent
+finish each game against itself and keeps, for every opening position seen
+in at least ``--min-games`` games, the move with the best average result for
+the player who made it.
+
+Agents call :func:`lookup` from ``make_move``; without a book file it returns
+``None`` at once. Set ``DOTS_BOOK`` to use a file other than
+``dots_core/opening.book``.
+"""
+
+from __future__ import annotations
+
+import os
+from typing import TYPE_CHECKING
+
+from . import tables
+from .move import Move
+
+if TYPE_CHECKING:  # pragma: no cover
+    from typing import Dict, List, Optional, Tuple
+
+    from .board import Board
+    from .packed import PackedTable
+
+BOOK_MAGIC = b"DOTSBOOK"
+DEFAULT_BOOK = os.path.join(os.path.dirname(os.path.abspath(__file__)), "opening.book")
+_MASK64 = (1 << 64) - 1
+
+_book: Optional[PackedTable] = None
+_book_path: Optional[str] = None
+_book_loaded = False
+_inverse_symmetries: Dict[Tuple[int, int], List[Tuple[int, ...]]] = {}
+
+
+def use_book(path: Optional[str]) -> None:
+    """Read the book from *path* from now on; ``None`` disables the book."""
+    global _book, _book_path, _book_loaded
+    _book = None
+    _book_path = path
+    _book_loaded = path is None
+
+
+def _get_book() -> Optional[PackedTable]:
+    global _book, _book_loaded
+    if not _book_loaded:
+        _book_loaded = True
+        path = _book_path or os.environ.get("DOTS_BOOK", DEFAULT_BOOK)
+        if os.path.isfile(path):
+            from .packed import PackedTable
+
+            _book = PackedTable(path, BOOK_MAGIC)
+    return _book
+
+
+def drawn_edges(board: Board) -> List[int]:
+    """Edge ids of the lines drawn on *board*."""
+    edges: List[int] = []
+    width = board.cols - 1
+    # comparing whole rows with an empty one skips the empty rows in C
+    empty = [0] * width
+    for r, row in enumerate(board.horizontal_lines):
+        if row != empty:
+            edges.extend(r * width + c for c, line in enumerate(row) if line)
+    offset = board.rows * width
+    empty = [0] * board.cols
+    for r, row in enumerate(board.vertical_lines):
+        if row != empty:
+            edges.extend(offset + r * board.cols + c for c, line in enumerate(row) if line)
+    return edges
+
+
+def canonical_key(rows: int, cols: int, edges: List[int]) -> Tuple[int, int]:
+    """``(key, symmetry index)`` of the position with *edges* drawn."""
+    keys = tables.zobrist_keys(rows, cols)
+    best_hash = -1
+    best_sym = 0
+    for sym, perm in enumerate(tables.edge_symmetries(rows, cols)):
+        h = 0
+        for e in edges:
+            h ^= keys[perm[e]]
+        if best_hash < 0 or h < best_hash:
+            best_hash = h
+            best_sym = sym
+    # the size goes into the key: every empty board hashes to 0
+    return best_hash ^ ((((rows << 16) | cols) * 0x9E3779B97F4A7C15) & _MASK64), best_sym
+
+
+def _inverse(rows: int, cols: int, sym: int) -> Tuple[int, ...]:
+    size = (rows, cols)
+    inverses = _inverse_symmetries.get(size)
+    if inverses is None:
+        inverses = []
+        for perm in tables.edge_symmetries(rows, cols):
+            inverse = [0] * len(perm)
+            for e, image in enumerate(perm):
+                inverse[image] = e
+            inverses.append(tuple(inverse))
+        _inverse_symmetries[size] = inverses
+    return inverses[sym]
+
+
+def lookup(board: Board) -> Optional[Move]:
+    """The book move for *board*, or ``None`` if the position is not in the book."""
+    book = _get_book()
+    if book is None:
+        return None
+    num_drawn = tables.num_edges(board.rows, board.cols) - board.num_horizontal_lines_left - board.num_vertical_lines_left
+    if num_drawn > book.meta:
+        return None
+
+    key, sym = canonical_key(board.rows, board.cols, drawn_edges(board))
+    edge = book.get(key)
+    if edge is None:
+        return None
+    move = tables.edge_moves(board.rows, board.cols)[_inverse(board.rows, board.cols, sym)[edge]]
+    # a hash collision can name a line that is already drawn
+    return move if board.is_valid_move(move) else None
+
+
+def _random_safe_move(board: Board, rng) -> Optional[Move]:
+    """A move that neither captures nor hands a box over, if any is left."""
+    safe = [
+        m for m in board.get_valid_moves()
+        if all(board.box_sides[b] < 2 for b in tables.edge_boxes(board.rows, board.cols)[board.edge_id(m)])
+    ]
+    return rng.choice(safe) if safe else None
+
+
+def generate(
+    size: int,
+    agent: str,
+    games: int,
+    depth: int,
+    seed: int = 0,
+    time_limit_secs: Optional[float] = None,
+) -> Dict[int, Dict[int, List[float]]]:
+    """Self-play statistics: canonical key -> canonical edge -> [result sum, games]."""
+    import importlib
+    import random
+
+    from .board import Board, PlayerSide
+    from .referee import Referee
+
+    submission = importlib.import_module(f"{agent}.submission.agent")
+    rng = random.Random(seed)
+    stats: Dict[int, Dict[int, List[float]]] = {}
+    for game in range(games):
+        random.seed(seed + game)
+        submission = importlib.reload(submission)  # drop state kept in module globals
+        board = Board(
+            size,
+            size,
+            [[0] * (size - 1) for _ in range(size)],
+            [[0] * size for _ in range(size - 1)],
+            [[0] * (size - 1) for _ in range(size - 1)],
+        )
+        opening: List[Tuple[PlayerSide, int, int]] = []
+        side = PlayerSide.FIRST_PLAYER
+        for _ in range(depth):
+            move = _random_safe_move(board, rng)
+            if move is None:
+                break
+            key, sym = canonical_key(size, size, drawn_edges(board))
+            opening.append((side, key, tables.edge_symmetries(size, size)[sym][board.edge_id(move)]))
+            board.make_move(move, side)
+            side = side.opponent()
+
+        referee = Referee(
+            submission.make_move, submission.make_move, board, time_limit_secs=time_limit_secs, to_move=side
+        )
+        result = referee.play()
+        for mover, key, edge in opening:
+            entry = stats.setdefault(key, {}).setdefault(edge, [0.0, 0])
+            entry[0] += result.result_for(mover)
+            entry[1] += 1
+    return stats
+
+
+def best_moves(stats: Dict[int, Dict[int, List[float]]], min_games: int) -> Dict[int, int]:
+    """Canonical key -> the canonical edge with the best average result."""
+    book = {}
+    for key, moves in stats.items():
+        tried = [(total / n, n, edge) for edge, (total, n) in moves.items() if n >= min_games]
+        if tried:
+            book[key] = max(tried)[2]
+    return book
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    import argparse
+    import contextlib
+
+    from .packed import write_packed_table
+
+    parser = argparse.ArgumentParser(description="Build the opening book from self-play.")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[5], help="dots per side")
+    parser.add_argument("--agent", default="python_agent_9", help="agent package that finishes the games")
+    parser.add_argument("--games", type=int, default=200, help="self-play games per size")
+    parser.add_argument("--depth", type=int, default=6, help="opening moves recorded per game")
+    parser.add_argument("--min-games", type=int, default=3, help="games a move needs to be trusted")
+    parser.add_argument("--time-limit", type=float, help="seconds per player per game, as in benchmarks.strength")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", default=DEFAULT_BOOK)
+    parser.add_argument("--verbose", action="store_true", help="keep the agent's log output")
+    args = parser.parse_args(argv)
+
+    use_book(None)  # the agent must not play from the book it is building
+    entries: Dict[int, int] = {}
+    for size in args.sizes:
+        with open(os.devnull, "w") as devnull:
+            agent_logs = contextlib.nullcontext() if args.verbose else contextlib.redirect_stderr(devnull)
+            with agent_logs:
+                stats = generate(size, args.agent, args.games, args.depth, args.seed, args.time_limit)
+        found = best_moves(stats, args.min_games)
+        print(f"{size}x{size}: {len(stats)} positions seen, {len(found)} in the book")
+        entries.update(found)
+
+    write_packed_table(args.output, BOOK_MAGIC, entries, meta=args.depth)
+    print(f"wrote {len(entries)} positions to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
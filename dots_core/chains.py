@@ -0,0 +1,91 @@
+"""Chains and loops: the boxes a single sacrifice hands over.
+
+A box with two sides drawn has two undrawn lines; following them links such
+boxes into paths (chains) and cycles (loops). Drawing any undrawn line of a
+chain gives the opponent the whole chain, so a :class:`Chain` carries those
+lines itself and its opening moves come out in O(chain length), with no scan
+over the board's valid moves.
+"""
+
+from __future__ import annotations
+
+from typing import TYPE_CHECKING
+
+from . import tables
+from .board import MoveClass
+
+if TYPE_CHECKING:  # pragma: no cover
+    from typing import List, Tuple
+
+    from .board import Board
+    from .move import Move
+
+
+class Chain:
+    """A chain or loop of two-sided boxes on a board."""
+
+    __slots__ = ("rows", "cols", "boxes", "edges", "is_loop")
+
+    def __init__(self, rows: int, cols: int, boxes: List[int], edges: List[int], is_loop: bool) -> None:
+        self.rows = rows
+        self.cols = cols
+        self.boxes = boxes  # box ids
+        self.edges = edges  # undrawn lines of the boxes, each once
+        self.is_loop = is_loop
+
+    def __len__(self) -> int:
+        return len(self.boxes)
+
+    def __repr__(self) -> str:
+        kind = "loop" if self.is_loop else "chain"
+        return f"<{kind} of {len(self.boxes)} at {self.cells()[0]}>"
+
+    def cells(self) -> List[Tuple[int, int]]:
+        """``(row, col)`` of every box."""
+        cells = tables.box_cells(self.rows, self.cols)
+        return [cells[b] for b in self.boxes]
+
+    def opening_moves(self) -> List[Move]:
+        """Every move that hands the chain over."""
+        moves = tables.edge_moves(self.rows, self.cols)
+        return [moves[e] for e in self.edges]
+
+
+def find_chains(board: Board) -> List[Chain]:
+    """Every chain and loop of two-sided boxes on *board*."""
+    rows, cols = board.rows, board.cols
+    box_edges = tables.box_edges(rows, cols)
+    edge_boxes = tables.edge_boxes(rows, cols)
+    box_sides = board.box_sides
+    edge_class = board.edge_class
+
+    chains = []
+    seen = set()
+    for start, sides in enumerate(box_sides):
+        if sides != 2 or start in seen:
+            continue
+        seen.add(start)
+        boxes = [start]
+        edges = []
+        internal = 0
+        edge_seen = set()
+        for box in boxes:  # grows while it is walked
+            for e in box_edges[box]:
+                if edge_class[e] == MoveClass.DRAWN or e in edge_seen:
+                    continue
+                edge_seen.add(e)
+                edges.append(e)
+                for other in edge_boxes[e]:
+                    if other == box:
+                        continue
+                    if box_sides[other] == 2:
+                        internal += 1
+                        if other not in seen:
+                            seen.add(other)
+                            boxes.append(other)
+        # a path of n boxes has n - 1 lines inside it, a loop has n
+        chains.append(Chain(rows, cols, boxes, edges, internal == len(boxes)))
+    return chains
+
+
+__all__ = ["Chain", "find_chains"]
@@ -1,12 +1,18 @@
 from __future__ import annotations
 
 import sys
-from typing import List, Optional
+import time
+from typing import TYPE_CHECKING
 
 from .board import Board, PlayerSide
 from .move import Move
 from .token_stream import TokenStream
 
+if TYPE_CHECKING:  # pragma: no cover
+    from typing import Callable, List, Optional
+
+    from .board import MoveListener
+
 
 class Controller:
     """Handles communication with the game engine and mirrors the C++ API."""
@@ -18,11 +24,23 @@ class Controller:
         *,
         use_protocol: bool = True,
         tokens: Optional[TokenStream] = None,
+        clock: Optional[Callable[[], int]] = None,
+        push_time: bool = False,
     ) -> None:
         self.use_protocol = use_protocol
+        # snapshot mode only: returns the remaining time in milliseconds
+        self._clock = clock
+        # protocol mode: ask for opponent moves with !REQ_MOVES_TIMED, whose
+        # reply starts with the time left; get_time_ms extrapolates from it
+        self.push_time = push_time
+        self._time_ms: Optional[int] = None
+        self._time_received_at = 0.0  # time.monotonic() when _time_ms arrived
         self._pending_moves: List[Move] = []
+        self._sent_moves: List[Move] = []
         self._prev_opp_moves: List[Move] = []
         self._are_prev_opp_moves_cached = True
+        # seconds spent blocked on the engine, so profiling can tell it apart from thinking
+        self.io_wait_seconds = 0.0
         self._tokens = tokens if tokens is not None else (TokenStream(sys.stdin) if use_protocol else None)
 
         if board is not None and player_side is not None:
@@ -47,12 +65,32 @@ class Controller:
     def get_opponent_side(self) -> PlayerSide:
         return self.player_side.opponent()
 
+    def subscribe(self, listener: MoveListener) -> None:
+        """Report every move applied to the current board, see ``Board.subscribe``.
+
+        That is the agent's own moves and the opponent's, which
+        :meth:`make_move` applies once the turn is over, so caches can follow
+        the game move by move instead of rebuilding every turn.
+        """
+        self.board.subscribe(listener)
+
+    def unsubscribe(self, listener: MoveListener) -> None:
+        self.board.unsubscribe(listener)
+
     def get_time_ms(self) -> int:
         if not self.use_protocol:
-            return -1
+            return self._clock() if self._clock is not None else -1
+        if self._time_ms is not None:
+            return self._time_ms - int(1000 * (time.monotonic() - self._time_received_at))
         assert self._tokens is not None
         self._write_line("!REQ_TIME")
-        return self._tokens.next_int()
+        start = time.perf_counter()
+        time_ms = self._tokens.next_int()
+        self.io_wait_seconds += time.perf_counter() - start
+        if self.push_time:
+            # until the first timed reply, extrapolate from this one
+            self._set_time_ms(time_ms)
+        return time_ms
 
     def make_move(self, move: Move) -> bool:
         self._pending_moves.append(move)
@@ -66,6 +104,7 @@ class Controller:
                     for opponent_move in self.get_opponent_moves():
                         self.board.make_move(opponent_move, self.get_opponent_side())
             else:
+                self._sent_moves.extend(self._pending_moves)
                 self._pending_moves.clear()
 
         return requires_more
@@ -80,12 +119,33 @@ class Controller:
         if self._are_prev_opp_moves_cached or not self.use_protocol:
             return self._prev_opp_moves
         assert self._tokens is not None
-        self._write_line("!REQ_MOVES")
+        self._write_line("!REQ_MOVES_TIMED" if self.push_time else "!REQ_MOVES")
+        start = time.perf_counter()
+        if self.push_time:
+            self._set_time_ms(self._tokens.next_int())
         count = self._tokens.next_int()
         self._prev_opp_moves = [Move.from_token_stream(self._tokens) for _ in range(count)]
+        self.io_wait_seconds += time.perf_counter() - start
         self._are_prev_opp_moves_cached = True
         return self._prev_opp_moves
 
+    def take_sent_moves(self) -> List[Move]:
+        """Snapshot mode: hand the moves of the finished turn to whoever referees the game."""
+        moves = self._sent_moves
+        self._sent_moves = []
+        return moves
+
+    def receive_opponent_moves(self, moves: List[Move]) -> None:
+        """Snapshot mode: apply the opponent's turn, as protocol mode does after ``!REQ_MOVES``."""
+        for move in moves:
+            self.board.make_move(move, self.get_opponent_side())
+        self._prev_opp_moves = list(moves)
+        self._are_prev_opp_moves_cached = True
+
+    def _set_time_ms(self, time_ms: int) -> None:
+        self._time_ms = time_ms
+        self._time_received_at = time.monotonic()
+
     def _flush_pending_moves(self) -> None:
         if not self._pending_moves:
             return
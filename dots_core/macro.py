@@ -0,0 +1,214 @@
+"""Macro moves: a whole capture run as one move of the search.
+
+Taking a chain box by box makes every box a ply of its own, although the
+only real decision in a run is how it ends. Where boxes are on offer,
+:func:`macro_moves` therefore offers just two moves:
+
+- take all: draw every capturing line until none is left. The player keeps
+  the turn and moves again in the quiet position that is left.
+- all but two (double dealing): take the run except the last two boxes of a
+  chain, then draw the line at the far end of that chain. The two boxes are
+  handed over with a single line between them, and the opponent, having
+  taken them, has to move next. Offered once for every chain that ends in
+  such a pair, declining that chain and taking the others.
+
+Those two cover every sensible way to end a run of chains, but not a loop on
+offer, which can also end by handing over four boxes (all but four). Where a
+loop is on offer :func:`macro_moves` falls back to single lines instead, one
+move per undrawn line, so the search over macro moves stays exact. Where
+nothing is on offer every undrawn line is a macro move of its own.
+:func:`make_macro` and :func:`unmake_macro` draw and take back a macro move
+with ``Board.make_move`` and ``Board.unmake_move``.
+"""
+
+from __future__ import annotations
+
+from typing import TYPE_CHECKING
+
+from . import tables
+from .board import MoveClass, PlayerSide
+
+if TYPE_CHECKING:  # pragma: no cover
+    from typing import List, Tuple
+
+    from .board import Board
+    from .move import Move
+
+SINGLE, TAKE_ALL, ALL_BUT_TWO, TAKE_LINE = 0, 1, 2, 3
+NO_EDGE = -1
+
+
+class MacroMove:
+    """Lines one player draws in a row, as one move of the search."""
+
+    __slots__ = ("kind", "edges")
+
+    def __init__(self, kind: int, edges: Tuple[int, ...]) -> None:
+        self.kind = kind
+        self.edges = edges  # edge ids, in drawing order
+
+    @property
+    def keeps_turn(self) -> bool:
+        """Whether the same player moves next (its last line takes a box)."""
+        return self.kind == TAKE_ALL or self.kind == TAKE_LINE
+
+    def __len__(self) -> int:
+        return len(self.edges)
+
+    def __repr__(self) -> str:
+        kind = ("single", "take all", "all but two", "take line")[self.kind]
+        return f"<{kind}: {len(self.edges)} lines>"
+
+    def moves(self, rows: int, cols: int) -> List[Move]:
+        """The lines to draw, in order."""
+        moves = tables.edge_moves(rows, cols)
+        return [moves[e] for e in self.edges]
+
+
+def ordered_edges(board: Board, first: int = NO_EDGE, rotate: int = 0) -> List[int]:
+    """Undrawn edges: *first*, then captures, safe lines and sacrifices.
+
+    Within a class the edges come in id order, starting *rotate* edges in, so
+    searches that use different rotations try moves in different orders.
+    """
+    edge_class = board.edge_class
+    buckets: Tuple[List[int], ...] = ([], [], [], [])
+    n = len(edge_class)
+    for i in range(n):
+        e = (i + rotate) % n
+        buckets[edge_class[e]].append(e)
+    ordered = buckets[MoveClass.CAPTURE] + buckets[MoveClass.SAFE] + buckets[MoveClass.SACRIFICE]
+    if first != NO_EDGE and edge_class[first] != MoveClass.DRAWN:
+        ordered.remove(first)
+        ordered.insert(0, first)
+    return ordered
+
+
+def _pair_end(board: Board, edge: int) -> int:
+    """The far line of the last two boxes of a chain, if capturing *edge* starts them; else ``NO_EDGE``.
+
+    That is: *edge* is the last line of a three-sided box and leads into a
+    two-sided box whose other line ends the chain.
+    """
+    edge_boxes = tables.edge_boxes(board.rows, board.cols)
+    boxes = edge_boxes[edge]
+    if len(boxes) != 2:
+        return NO_EDGE
+    box_sides = board.box_sides
+    a, b = boxes
+    if box_sides[a] == 2 and box_sides[b] == 3:
+        a, b = b, a
+    if box_sides[a] != 3 or box_sides[b] != 2:
+        return NO_EDGE
+    edge_class = board.edge_class
+    far = next(e for e in tables.box_edges(board.rows, board.cols)[b] if e != edge and edge_class[e] != MoveClass.DRAWN)
+    for other in edge_boxes[far]:
+        if other != b and box_sides[other] >= 2:
+            return NO_EDGE  # the chain goes on past it
+    return far
+
+
+def _loop_on_offer(board: Board) -> bool:
+    """Whether a capture leads along two-sided boxes into another three-sided box.
+
+    That is an opened loop (or what is left of one), whose run can also end
+    by handing over four boxes.
+    """
+    edge_boxes = tables.edge_boxes(board.rows, board.cols)
+    box_edges = tables.box_edges(board.rows, board.cols)
+    box_sides = board.box_sides
+    edge_class = board.edge_class
+    edge = edge_class.find(MoveClass.CAPTURE)
+    while edge >= 0:
+        boxes = edge_boxes[edge]
+        box = boxes[0] if box_sides[boxes[0]] == 3 else boxes[-1]
+        line = edge
+        steps = 0
+        while True:
+            ahead = [b for b in edge_boxes[line] if b != box]
+            if not ahead or box_sides[ahead[0]] < 2:
+                break  # the run ends at the border or at an open box
+            box = ahead[0]
+            if box_sides[box] == 3:
+                if steps:
+                    return True
+                break  # two three-sided boxes on one line: taken together
+            steps += 1
+            line = next(e for e in box_edges[box] if e != line and edge_class[e] != MoveClass.DRAWN)
+        edge = edge_class.find(MoveClass.CAPTURE, edge + 1)
+    return False
+
+
+def capture_macros(board: Board) -> List[MacroMove]:
+    """Take all, then all but two for each chain that allows it; empty if no box is on offer."""
+    edge_class = board.edge_class
+    if edge_class.find(MoveClass.CAPTURE) < 0:
+        return []
+    moves = tables.edge_moves(board.rows, board.cols)
+    side = PlayerSide.FIRST_PLAYER  # only for make_move: everything is taken back
+    drawn: List[int] = []
+    while True:
+        # take everything but the pairs that end a chain
+        edge = edge_class.find(MoveClass.CAPTURE)
+        while edge >= 0 and _pair_end(board, edge) != NO_EDGE:
+            edge = edge_class.find(MoveClass.CAPTURE, edge + 1)
+        if edge < 0:
+            break
+        board.make_move(moves[edge], side)
+        drawn.append(edge)
+    pairs = []
+    edge = edge_class.find(MoveClass.CAPTURE)
+    while edge >= 0:
+        pairs.append((edge, _pair_end(board, edge)))
+        edge = edge_class.find(MoveClass.CAPTURE, edge + 1)
+    for edge in reversed(drawn):
+        board.unmake_move(moves[edge])
+
+    taken = tuple(drawn) + tuple(e for pair in pairs for e in pair)
+    macros = [MacroMove(TAKE_ALL, taken)]
+    for i, pair in enumerate(pairs):
+        others = pairs[:i] + pairs[i + 1:]
+        declined = tuple(drawn) + tuple(e for other in others for e in other) + (pair[1],)
+        macros.append(MacroMove(ALL_BUT_TWO, declined))
+    return macros
+
+
+def macro_moves(board: Board, first: int = NO_EDGE, rotate: int = 0) -> List[MacroMove]:
+    """Every macro move on *board*; see :func:`ordered_edges` for *first* and *rotate*."""
+    if board.edge_class.find(MoveClass.CAPTURE) >= 0 and not _loop_on_offer(board):
+        return capture_macros(board)
+    edge_class = board.edge_class
+    return [
+        MacroMove(TAKE_LINE if edge_class[e] == MoveClass.CAPTURE else SINGLE, (e,))
+        for e in ordered_edges(board, first, rotate)
+    ]
+
+
+def make_macro(board: Board, macro: MacroMove, side: PlayerSide) -> int:
+    """Draw *macro* for *side*; returns the boxes taken."""
+    moves = tables.edge_moves(board.rows, board.cols)
+    before = board.scores[side]
+    for e in macro.edges:
+        board.make_move(moves[e], side)
+    return board.scores[side] - before
+
+
+def unmake_macro(board: Board, macro: MacroMove) -> None:
+    """Take back *macro*, the last macro move made on *board*."""
+    moves = tables.edge_moves(board.rows, board.cols)
+    for e in reversed(macro.edges):
+        board.unmake_move(moves[e])
+
+
+__all__ = [
+    "ALL_BUT_TWO",
+    "SINGLE",
+    "TAKE_ALL",
+    "TAKE_LINE",
+    "MacroMove",
+    "capture_macros",
+    "macro_moves",
+    "make_macro",
+    "ordered_edges",
+    "unmake_macro",
+]
@@ -0,0 +1,57 @@
+from __future__ import annotations
+
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:  # pragma: no cover
+    from .token_stream import TokenStream
+
+
+class Move:
+    """Represents a single line placement on the dots board.
+
+    Immutable and hashable like the frozen dataclass it replaces, written out
+    by hand so agent startup does not pay for importing ``dataclasses``.
+    """
+
+    __slots__ = ("row", "col", "is_horizontal")
+
+    row: int
+    col: int
+    is_horizontal: bool
+
+    def __init__(self, row: int, col: int, is_horizontal: bool) -> None:
+        object.__setattr__(self, "row", row)
+        object.__setattr__(self, "col", col)
+        object.__setattr__(self, "is_horizontal", is_horizontal)
+
+    def __setattr__(self, name: str, value: object) -> None:
+        raise AttributeError(f"cannot assign to field {name!r}")
+
+    def __delattr__(self, name: str) -> None:
+        raise AttributeError(f"cannot delete field {name!r}")
+
+    def __eq__(self, other: object) -> bool:
+        if other.__class__ is not self.__class__:
+            return NotImplemented
+        return (self.row, self.col, self.is_horizontal) == (other.row, other.col, other.is_horizontal)
+
+    def __hash__(self) -> int:
+        return hash((self.row, self.col, self.is_horizontal))
+
+    def __repr__(self) -> str:
+        return f"Move(row={self.row!r}, col={self.col!r}, is_horizontal={self.is_horizontal!r})"
+
+    def __reduce__(self):
+        return (Move, (self.row, self.col, self.is_horizontal))
+
+    def to_protocol(self) -> str:
+        """Return the move encoded in the engine protocol format."""
+        return f"{self.row} {self.col} {1 if self.is_horizontal else 0}"
+
+    @classmethod
+    def from_token_stream(cls, tokens: "TokenStream") -> "Move":
+        """Create a move by consuming three tokens from *tokens*."""
+        row = tokens.next_int()
+        col = tokens.next_int()
+        is_horizontal = tokens.next_bool()
+        return cls(row=row, col=col, is_horizontal=is_horizontal)
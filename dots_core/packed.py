@@ -0,0 +1,88 @@
+"""Compact read-only hash tables mapped straight from disk.
+
+A packed table maps 64-bit keys to 32-bit values with open addressing and
+linear probing. The file is a 24-byte header (magic, capacity, count, a 64-bit
+field free for the writer's use) followed by the key array and the value
+array, so a lookup is a couple of indexings into ``mmap``-backed memoryviews
+and nothing is parsed at load time. Key 0 marks an empty slot; a real key of 0
+is stored as 1.
+
+Used for the opening book and the endgame tablebase.
+"""
+
+from __future__ import annotations
+
+import os
+import struct
+import sys
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:  # pragma: no cover
+    from typing import Dict, Optional
+
+_HEADER = struct.Struct("<8sIIQ")
+
+
+class PackedTable:
+    """A packed table file opened for lookups."""
+
+    def __init__(self, path: str, magic: bytes) -> None:
+        import mmap
+
+        with open(path, "rb") as f:
+            self._mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        found, capacity, count, meta = _HEADER.unpack_from(self._mapped)
+        if found != magic or sys.byteorder != "little":
+            raise ValueError(f"{path} is not a {magic.decode()} table")
+        view = memoryview(self._mapped)
+        keys_end = _HEADER.size + 8 * capacity
+        self._keys = view[_HEADER.size:keys_end].cast("Q")
+        self._values = view[keys_end:keys_end + 4 * capacity].cast("I")
+        self._mask = capacity - 1
+        self.count = count
+        self.meta = meta
+
+    def __len__(self) -> int:
+        return self.count
+
+    def get(self, key: int) -> Optional[int]:
+        key = key or 1
+        keys = self._keys
+        mask = self._mask
+        i = key & mask
+        while True:
+            found = keys[i]
+            if found == key:
+                return self._values[i]
+            if found == 0:
+                return None
+            i = (i + 1) & mask
+
+
+def write_packed_table(path: str, magic: bytes, items: Dict[int, int], meta: int = 0) -> None:
+    """Write *items* (64-bit key -> 32-bit value) to *path*, at most half full."""
+    from array import array
+
+    capacity = 8
+    while capacity < 2 * len(items):
+        capacity *= 2
+    mask = capacity - 1
+    keys = array("Q", bytes(8 * capacity))
+    values = array("I", bytes(4 * capacity))
+    for key, value in items.items():
+        key = key or 1
+        i = key & mask
+        while keys[i] != 0:
+            i = (i + 1) & mask
+        keys[i] = key
+        values[i] = value
+
+    tmp = path + ".tmp"
+    with open(tmp, "wb") as f:
+        f.write(_HEADER.pack(magic, capacity, len(items), meta))
+        f.write(keys.tobytes())
+        f.write(values.tobytes())
+    os.replace(tmp, path)
+
+
+__all__ = ["PackedTable", "write_packed_table"]
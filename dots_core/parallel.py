@@ -0,0 +1,154 @@
+"""Root splitting: score the candidate moves of a search concurrently.
+
+:func:`search_root` hands every root candidate to a pool of worker processes,
+so all candidates are searched within the same wall-clock budget instead of
+one after another against a shared deadline. The workers share the best root
+score found so far through shared memory; a search reads it as its alpha
+bound at every node and gives up on a candidate as soon as it is provably no
+better than one already scored.
+
+The pool is forked on first use and kept for the rest of the process, so a
+move pays for one task round trip per candidate and nothing else. Where
+``fork`` is unavailable or only one worker would run (``DOTS_WORKERS``,
+default: the number of CPUs), the candidates are searched in turn in the
+calling process, still sharing the bound.
+
+A score function has the signature ``score(board, move, *args, bound=...)``
+and raises ``TimeoutError`` when it runs out of time; ``bound.value`` is the
+best root score so far. It must be a module-level function so that it can be
+sent to the workers.
+"""
+
+from __future__ import annotations
+
+import os
+import time
+from typing import TYPE_CHECKING
+
+from . import profiling
+
+if TYPE_CHECKING:  # pragma: no cover
+    from typing import Callable, List, Optional, Sequence
+
+    from .board import Board
+    from .move import Move
+
+# scores are whole boxes: searching against best - 1/2 leaves a candidate
+# that ties the best with its exact score, never a bound equal to it
+_TIE_MARGIN = 0.5
+_RESULT_GRACE_SECS = 0.05  # how long a late worker may take to notice the deadline
+
+_pool = None
+_pool_workers = 0
+_bound = None  # in the workers: the shared best root score
+_bound_lock = None
+
+
+class _LocalBound:
+    """The shared bound of a search that runs in this process."""
+
+    __slots__ = ("value",)
+
+    def __init__(self, value: float) -> None:
+        self.value = value
+
+
+def worker_count() -> int:
+    """Worker processes for :func:`search_root`; 1 means no pool."""
+    try:
+        return max(1, int(os.environ.get("DOTS_WORKERS", "")))
+    except ValueError:
+        return os.cpu_count() or 1
+
+
+def _init_worker(bound, lock) -> None:
+    global _bound, _bound_lock
+    _bound = bound
+    _bound_lock = lock
+
+
+def get_pool(workers: int):
+    """The process-wide pool of *workers* forked workers, created on first use."""
+    global _pool, _pool_workers, _bound, _bound_lock
+    if _pool is None or _pool_workers != workers:
+        import multiprocessing
+        import sys
+
+        if _pool is not None:
+            _pool.terminate()
+        context = multiprocessing.get_context("fork")
+        _bound = context.RawValue("d", float("-inf"))
+        _bound_lock = context.Lock()
+        # the workers inherit stdout: anything still buffered would be written twice
+        sys.stdout.flush()
+        _pool = context.Pool(workers, initializer=_init_worker, initargs=(_bound, _bound_lock))
+        _pool_workers = workers
+    return _pool
+
+
+def _score_task(score: Callable[..., float], board: Board, move: Move, args: tuple, bound) -> tuple:
+    """Run one candidate; returns ``(score or None on timeout, nodes searched)``."""
+    nodes = profiling.nodes
+    try:
+        value = score(board, move, *args, bound=bound)
+    except TimeoutError:
+        return None, profiling.nodes - nodes
+    if value > bound.value + _TIE_MARGIN:
+        if _bound_lock is None:
+            bound.value = value - _TIE_MARGIN
+        else:
+            with _bound_lock:
+                if value > bound.value + _TIE_MARGIN:
+                    bound.value = value - _TIE_MARGIN
+    return value, profiling.nodes - nodes
+
+
+def _pool_task(score: Callable[..., float], board: Board, move: Move, args: tuple) -> tuple:
+    return _score_task(score, board, move, args, _bound)
+
+
+def search_root(
+    score: Callable[..., float],
+    board: Board,
+    moves: Sequence[Move],
+    args: tuple,
+    time_deadline: float,
+) -> List[Optional[float]]:
+    """Scores of *moves* in order, ``None`` for moves not scored by *time_deadline*.
+
+    A score at or below the best other score is only an upper bound: the
+    search of that move was cut off once it could not win.
+    """
+    workers = min(worker_count(), len(moves))
+    if workers <= 1 or not hasattr(os, "fork"):
+        bound = _LocalBound(float("-inf"))
+        results = []
+        for move in moves:
+            if time.time() > time_deadline:
+                results.append(None)
+                continue
+            value, nodes = _score_task(score, board, move, args, bound)
+            profiling.count_nodes(nodes)
+            results.append(value)
+        return results
+
+    import multiprocessing
+
+    pool = get_pool(worker_count())
+    _bound.value = float("-inf")
+    pending = [pool.apply_async(_pool_task, (score, board, move, args)) for move in moves]
+    # one cutoff for all candidates, so the grace period is paid once, not once per late one
+    cutoff = time_deadline + _RESULT_GRACE_SECS
+    results = []
+    for task in pending:
+        try:
+            value, nodes = task.get(max(0.0, cutoff - time.time()))
+        except multiprocessing.TimeoutError:
+            results.append(None)
+            continue
+        profiling.count_nodes(nodes)
+        results.append(value)
+    return results
+
+
+__all__ = ["get_pool", "search_root", "worker_count"]
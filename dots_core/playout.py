@@ -0,0 +1,80 @@
+"""Random playouts on a flat copy of the board.
+
+A playout only needs the undrawn lines and the number of sides of every box.
+:class:`PlayoutBase` extracts them from a board once. Each playout then copies
+two flat arrays instead of cloning the board, and draws a random line by
+swapping it with the last undrawn one and popping it (swap-remove), so a move
+costs O(1) with no ``get_valid_moves`` scan.
+
+A playout is driven by its own ``random.Random(seed)``. Playing the same seeds
+after each candidate move gives every candidate the same random numbers
+(common random numbers), so the difference between two candidates shows up
+in far fewer playouts than with independent ones.
+"""
+
+from __future__ import annotations
+
+import random
+from typing import TYPE_CHECKING
+
+from . import tables
+from .profiling import count_nodes
+
+if TYPE_CHECKING:  # pragma: no cover
+    from typing import Iterable, List
+
+    from .board import Board
+
+
+class PlayoutBase:
+    """The undrawn lines and box sides of a position, to start playouts from."""
+
+    __slots__ = ("edge_boxes", "undrawn", "box_sides")
+
+    def __init__(self, board: Board) -> None:
+        self.edge_boxes = tables.edge_boxes(board.rows, board.cols)
+        self.undrawn = [e for e, klass in enumerate(board.edge_class) if klass]
+        self.box_sides = bytes(board.box_sides)
+
+    def playout(self, first_edge: int, seed: int, limit: int) -> int:
+        """Net boxes for the player drawing *first_edge*, then *limit* random lines.
+
+        The lines after the first are drawn by whoever is to move, as in the
+        game: completing a box moves again.
+        """
+        edge_boxes = self.edge_boxes
+        sides = bytearray(self.box_sides)
+        undrawn = self.undrawn[:]
+        undrawn.remove(first_edge)
+        rng = random.Random(seed)
+        net = 0
+        sign = 1  # +1 while the first player is to move
+        edge = first_edge
+        drawn = 0
+        while True:
+            taken = 0
+            for b in edge_boxes[edge]:
+                sides[b] += 1
+                if sides[b] == 4:
+                    taken += 1
+            if taken:
+                net += sign * taken
+            else:
+                sign = -sign
+            if drawn == limit or not undrawn:
+                break
+            drawn += 1
+            i = int(rng.random() * len(undrawn))
+            edge = undrawn[i]
+            undrawn[i] = undrawn[-1]
+            undrawn.pop()
+        return net
+
+    def playouts(self, first_edge: int, seeds: Iterable[int], limit: int) -> List[int]:
+        """:meth:`playout` for every seed."""
+        results = [self.playout(first_edge, seed, limit) for seed in seeds]
+        count_nodes(len(results))
+        return results
+
+
+__all__ = ["PlayoutBase"]
@@ -0,0 +1,132 @@
+"""Opt-in instrumentation of a game under real match conditions.
+
+Enabled through environment variables, so a submission can be profiled as
+launched by the UI without touching its code:
+
+- ``DOTS_PROFILE=1``: per-move wall and CPU time plus search node counts,
+  dumped as JSON with a summary logged at game end.
+- ``DOTS_PROFILE=cprofile``: additionally captures a cProfile of the game.
+- ``DOTS_PROFILE_DIR``: directory for the dumps (default: ``profiles/`` next
+  to the agent package).
+"""
+
+from __future__ import annotations
+
+import os
+import time
+from typing import TYPE_CHECKING
+
+from .custom_logger import log
+
+if TYPE_CHECKING:  # pragma: no cover
+    from typing import Callable, List, Optional, Tuple
+
+    from .controller import Controller
+    from .move import Move
+
+nodes = 0
+
+
+def count_nodes(n: int = 1) -> None:
+    """Report *n* searched nodes (or rollouts); cheap enough for inner loops."""
+    global nodes
+    nodes += n
+
+
+class GameProfiler:
+    """Times every ``make_move`` call of a game and dumps the results."""
+
+    def __init__(self, controller: Controller, output_dir: str, use_cprofile: bool) -> None:
+        self.controller = controller
+        self.output_dir = output_dir
+        self.use_cprofile = use_cprofile
+        self.records: List[dict] = []
+        self._profile = None
+        self._started_at = 0.0
+
+    @classmethod
+    def from_env(cls, controller: Controller, agent_dir: Optional[str] = None) -> Optional["GameProfiler"]:
+        mode = os.environ.get("DOTS_PROFILE", "").strip().lower()
+        if mode in ("", "0", "false", "off"):
+            return None
+        default_dir = os.path.join(agent_dir or os.getcwd(), "profiles")
+        output_dir = os.environ.get("DOTS_PROFILE_DIR") or default_dir
+        return cls(controller, output_dir, use_cprofile=(mode == "cprofile"))
+
+    def start(self) -> None:
+        self._started_at = time.time()
+        if self.use_cprofile:
+            import cProfile
+
+            self._profile = cProfile.Profile()
+            self._profile.enable()
+
+    def wrap(self, make_move: Callable[[Controller], Tuple[bool, Move]]) -> Callable[[Controller], Tuple[bool, Move]]:
+        """Return *make_move* instrumented with per-move timings."""
+
+        def timed_make_move(controller: Controller) -> Tuple[bool, Move]:
+            nodes_before = nodes
+            io_before = controller.io_wait_seconds
+            wall_before = time.perf_counter()
+            cpu_before = time.process_time()
+
+            requires_more, move = make_move(controller)
+
+            wall = time.perf_counter() - wall_before
+            io_wait = controller.io_wait_seconds - io_before
+            self.records.append({
+                "move": len(self.records) + 1,
+                "played": move.to_protocol(),
+                "requiresMore": requires_more,
+                "wallMs": 1000 * wall,
+                # time blocked on the engine (opponent's turn, !REQ_TIME) is not ours
+                "thinkMs": 1000 * (wall - io_wait),
+                "ioWaitMs": 1000 * io_wait,
+                "cpuMs": 1000 * (time.process_time() - cpu_before),
+                "nodes": nodes - nodes_before,
+            })
+            return requires_more, move
+
+        return timed_make_move
+
+    def finish(self) -> None:
+        import json
+
+        if self._profile is not None:
+            self._profile.disable()
+
+        os.makedirs(self.output_dir, exist_ok=True)
+        stamp = time.strftime("%Y%m%d-%H%M%S", time.localtime(self._started_at))
+        base = os.path.join(self.output_dir, f"game-{stamp}-{os.getpid()}-p{int(self.controller.get_my_side())}")
+
+        with open(base + ".moves.json", "w") as f:
+            json.dump({"moves": self.records}, f, indent=1)
+        if self._profile is not None:
+            self._profile.dump_stats(base + ".prof")
+
+        log(self.summary(base))
+
+    def summary(self, base: str) -> str:
+        think = sum(r["thinkMs"] for r in self.records)
+        cpu = sum(r["cpuMs"] for r in self.records)
+        total_nodes = sum(r["nodes"] for r in self.records)
+        slowest = max(self.records, key=lambda r: r["thinkMs"], default=None)
+
+        lines = [
+            f"[profile] {len(self.records)} moves, think {think:.1f} ms, cpu {cpu:.1f} ms",
+            f"[profile] {total_nodes} nodes ({1000 * total_nodes / think:.0f}/s)" if think > 0 else f"[profile] {total_nodes} nodes",
+        ]
+        if slowest is not None:
+            lines.append(f"[profile] slowest move #{slowest['move']}: {slowest['thinkMs']:.1f} ms")
+        if self._profile is not None:
+            import io
+            import pstats
+
+            out = io.StringIO()
+            pstats.Stats(self._profile, stream=out).sort_stats("cumulative").print_stats(8)
+            lines.append(out.getvalue().rstrip())
+        lines.append(f"[profile] written to {base}.*")
+        return "\n".join(lines)
+
+
+__all__ = ["GameProfiler", "count_nodes"]
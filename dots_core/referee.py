@@ -0,0 +1,175 @@
+"""In-process referee: two submissions play on one authoritative board.
+
+Mirrors what ``ui.py`` does over pipes, at function-call speed: each player
+gets a snapshot-mode :class:`Controller` with its own copy of the board, the
+referee collects the moves of every turn, checks them against the
+authoritative :class:`Board` and delivers them to the other player before its
+next turn.
+
+A turn follows the engine's continuation rule: every move but the last one
+must capture a box, and the last one must not (unless it ends the game).
+Breaking the rule, playing an illegal move, raising an exception or running
+out of time forfeits the game.
+"""
+
+from __future__ import annotations
+
+import time
+from dataclasses import dataclass, field
+from typing import Callable, Dict, List, Optional, Tuple
+
+from .board import Board, PlayerSide
+from .controller import Controller
+from .move import Move
+
+MakeMove = Callable[[Controller], Tuple[bool, Move]]
+
+
+@dataclass
+class GameResult:
+    """Outcome of a refereed game."""
+
+    scores: Dict[PlayerSide, int]
+    winner: Optional[PlayerSide]
+    forfeited: Optional[PlayerSide] = None
+    reason: str = ""
+    turns: int = 0
+    moves: Dict[PlayerSide, int] = field(default_factory=dict)
+    think_seconds: Dict[PlayerSide, float] = field(default_factory=dict)
+
+    def result_for(self, side: PlayerSide) -> float:
+        """1 for a win, 0.5 for a draw, 0 for a loss."""
+        if self.winner is None:
+            return 0.5
+        return 1.0 if self.winner is side else 0.0
+
+
+class Referee:
+    """Plays ``first`` (player 1) against ``second`` (player 2) on *board*.
+
+    *to_move* is the side whose turn it is on *board*.
+    """
+
+    def __init__(
+        self,
+        first: MakeMove,
+        second: MakeMove,
+        board: Board,
+        *,
+        time_limit_secs: Optional[float] = None,
+        to_move: PlayerSide = PlayerSide.FIRST_PLAYER,
+    ) -> None:
+        self.board = board
+        self.time_limit_secs = time_limit_secs
+        self.to_move = to_move
+        self.players: Dict[PlayerSide, MakeMove] = {
+            PlayerSide.FIRST_PLAYER: first,
+            PlayerSide.SECOND_PLAYER: second,
+        }
+        self.remaining: Dict[PlayerSide, float] = {
+            side: (time_limit_secs if time_limit_secs is not None else float("inf")) for side in self.players
+        }
+        self._turn_started = 0.0
+        self.controllers: Dict[PlayerSide, Controller] = {
+            side: Controller(board.clone(), side, use_protocol=False, clock=self._make_clock(side))
+            for side in self.players
+        }
+
+    def _make_clock(self, side: PlayerSide) -> Callable[[], int]:
+        def time_ms() -> int:
+            if self.time_limit_secs is None:
+                return -1
+            return int(1000 * (self.remaining[side] - (time.perf_counter() - self._turn_started)))
+
+        return time_ms
+
+    def play(self) -> GameResult:
+        moves = {side: 0 for side in self.players}
+        think_seconds = {side: 0.0 for side in self.players}
+        side = self.to_move
+        last_turn: List[Move] = []
+        turns = 0
+
+        while not self.board.is_completed():
+            controller = self.controllers[side]
+            if turns > 0:
+                controller.receive_opponent_moves(last_turn)
+
+            self._turn_started = time.perf_counter()
+            failure = self._run_turn(side)
+            elapsed = time.perf_counter() - self._turn_started
+            self.remaining[side] -= elapsed
+            think_seconds[side] += elapsed
+            turns += 1
+
+            last_turn = controller.take_sent_moves()
+            moves[side] += len(last_turn)
+            if failure:
+                return self._forfeit(side, failure, turns, moves, think_seconds)
+            if self.remaining[side] < 0:
+                return self._forfeit(side, "ran out of time", turns, moves, think_seconds)
+            error = self._apply_turn(side, last_turn)
+            if error:
+                return self._forfeit(side, error, turns, moves, think_seconds)
+            side = side.opponent()
+
+        scores = self.board.get_scores()
+        winner = None
+        if scores[PlayerSide.FIRST_PLAYER] != scores[PlayerSide.SECOND_PLAYER]:
+            winner = max(scores, key=lambda s: scores[s])
+        return GameResult(scores, winner, turns=turns, moves=moves, think_seconds=think_seconds)
+
+    def _run_turn(self, side: PlayerSide) -> str:
+        """Let *side* play its turn; returns why it forfeits, if it does."""
+        # same loop as Agent.run, for one turn
+        controller = self.controllers[side]
+        board = controller.get_current_board()
+        while True:
+            try:
+                requires_more, _ = self.players[side](controller)
+            except Exception as exc:
+                # a crashing agent loses the game, as it would under the engine
+                return f"raised {exc!r}"
+            if not requires_more or board.is_completed():
+                break
+            # checked between calls: a player that keeps asking for another
+            # move must not hold the game forever
+            if time.perf_counter() - self._turn_started > self.remaining[side]:
+                return "ran out of time"
+        return ""
+
+    def _apply_turn(self, side: PlayerSide, turn: List[Move]) -> str:
+        """Play *turn* on the authoritative board; returns why it is illegal, if it is."""
+        if not turn:
+            return "made no move"
+        for i, move in enumerate(turn):
+            if not self.board.is_valid_move(move):
+                return f"illegal move {move}"
+            continues = self.board.make_move(move, side)
+            is_last = i == len(turn) - 1
+            if not is_last and not continues:
+                return f"kept moving after {move}, which did not capture"
+            if is_last and continues:
+                return f"stopped after {move}, which captured"
+        return ""
+
+    def _forfeit(
+        self,
+        side: PlayerSide,
+        reason: str,
+        turns: int,
+        moves: Dict[PlayerSide, int],
+        think_seconds: Dict[PlayerSide, float],
+    ) -> GameResult:
+        return GameResult(
+            self.board.get_scores(),
+            side.opponent(),
+            forfeited=side,
+            reason=reason,
+            turns=turns,
+            moves=moves,
+            think_seconds=think_seconds,
+        )
+
+
+__all__ = ["GameResult", "Referee"]
@@ -0,0 +1,256 @@
+"""Alpha-beta search on the rest of the game, with a transposition table.
+
+The value of a position is the net score (boxes taken minus boxes conceded)
+that the player to move gets from the rest of the game. It depends only on
+the drawn lines, not on who is to move or on the score so far, so positions
+are keyed by ``Board.zobrist``.
+
+The search moves by macro moves (:mod:`dots_core.macro`), so a whole capture
+run is one ply. Taking all the boxes keeps the turn: it is worth the boxes
+taken plus the value after it. Any other move hands the turn over and is
+worth the boxes taken minus that value. Moves are made and taken back on one
+board rather than on copies. The macro moves drop no move that could be
+better, so a search to the end of the game is exact
+(``dots_core/tests/test_search.py`` checks it against a line-by-line solver).
+
+Past the depth limit the capture runs on offer are still played out (a
+quiescence search, see :func:`quiescence`), so a horizon in the middle of a
+run does not miscount the boxes.
+
+A transposition table has ``probe(key)`` returning ``(value, depth, flag,
+edge)`` or ``None``, and ``store(key, value, depth, flag, edge)``.
+:class:`TranspositionTable` keeps one in this process;
+:class:`dots_core.smp.SharedTT` shares one between processes.
+"""
+
+from __future__ import annotations
+
+import time
+from typing import TYPE_CHECKING
+
+from . import tables
+from .board import MoveClass, PlayerSide
+from .macro import NO_EDGE, capture_macros, macro_moves, make_macro, ordered_edges, unmake_macro
+from .profiling import count_nodes
+
+if TYPE_CHECKING:  # pragma: no cover
+    from typing import Dict, Optional, Tuple
+
+    from .board import Board
+    from .move import Move
+
+EXACT, LOWER, UPPER = 0, 1, 2
+INFINITY = 1 << 20  # beyond any net score
+
+
+class TranspositionTable:
+    """An in-process transposition table."""
+
+    def __init__(self) -> None:
+        self._entries: Dict[int, Tuple[int, int, int, int]] = {}
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def probe(self, key: int) -> Optional[Tuple[int, int, int, int]]:
+        return self._entries.get(key)
+
+    def store(self, key: int, value: int, depth: int, flag: int, edge: int) -> None:
+        old = self._entries.get(key)
+        if old is None or depth >= old[1]:
+            self._entries[key] = (value, depth, flag, edge)
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+
+def take_captures(board: Board, side: PlayerSide) -> int:
+    """Draw capturing lines for *side* until there are none; returns the boxes taken.
+
+    Captures commute: taking a box never spoils another capture, so any order
+    takes the same boxes. *board* is changed in place.
+    """
+    moves = tables.edge_moves(board.rows, board.cols)
+    edge_class = board.edge_class  # make_move updates it in place
+    taken = 0
+    edge = edge_class.find(MoveClass.CAPTURE)
+    while edge >= 0:
+        before = board.scores[side]
+        board.make_move(moves[edge], side)
+        taken += board.scores[side] - before
+        edge = edge_class.find(MoveClass.CAPTURE)
+    return taken
+
+
+def stand_pat(board: Board) -> int:
+    """Static value of a position without captures for the player to move.
+
+    0 while a safe line is left. Otherwise every move is a sacrifice and the
+    player has to hand over at least the smallest one.
+    """
+    if MoveClass.SAFE in board.edge_class or board.is_completed():
+        return 0
+    sizes = [k for k in board.sacrifice_sizes() if k > 0]
+    return -min(sizes) if sizes else 0
+
+
+def quiescence(board: Board) -> int:
+    """Value of *board* for the player to move once the capture runs on offer are played out.
+
+    The player either takes everything and then stands pat, or deals the
+    last two boxes of a chain to the opponent, who faces the same choice.
+    """
+    best = -INFINITY
+    for macro in capture_macros(board):
+        taken = make_macro(board, macro, PlayerSide.FIRST_PLAYER)
+        if macro.keeps_turn:
+            value = taken + stand_pat(board)
+        else:
+            value = taken - quiescence(board)
+        unmake_macro(board, macro)
+        if value > best:
+            best = value
+    return stand_pat(board) if best == -INFINITY else best
+
+
+def negamax(
+    board: Board,
+    depth: int,
+    alpha: int,
+    beta: int,
+    tt=None,
+    time_deadline: Optional[float] = None,
+    rotate: int = 0,
+) -> int:
+    """Value of *board* for the player to move, searched *depth* plies deep.
+
+    *board* is searched in place and left as it was, unless ``TimeoutError``
+    is raised once *time_deadline* (a ``time.time()``) passes.
+    """
+    count_nodes()
+    if time_deadline is not None and time.time() > time_deadline:
+        raise TimeoutError()
+    if board.is_completed():
+        return 0
+
+    key = board.zobrist
+    hash_edge = NO_EDGE
+    if tt is not None:
+        entry = tt.probe(key)
+        if entry is not None:
+            value, entry_depth, flag, hash_edge = entry
+            if entry_depth >= depth:
+                if flag == EXACT:
+                    return value
+                if flag == LOWER and value >= beta:
+                    return value
+                if flag == UPPER and value <= alpha:
+                    return value
+    if depth == 0:
+        return quiescence(board)
+
+    alpha0 = alpha
+    best = -INFINITY
+    best_edge = NO_EDGE
+    for macro in macro_moves(board, hash_edge, rotate):
+        # the side only decides who owns the boxes, which the value ignores
+        taken = make_macro(board, macro, PlayerSide.FIRST_PLAYER)
+        if macro.keeps_turn:
+            value = taken + negamax(board, depth - 1, alpha - taken, beta - taken, tt, time_deadline, rotate)
+        else:
+            value = taken - negamax(board, depth - 1, taken - beta, taken - alpha, tt, time_deadline, rotate)
+        unmake_macro(board, macro)
+        if value > best:
+            best = value
+            best_edge = macro.edges[0]
+            if value > alpha:
+                alpha = value
+                if alpha >= beta:
+                    break
+
+    if tt is not None:
+        flag = UPPER if best <= alpha0 else LOWER if best >= beta else EXACT
+        tt.store(key, best, depth, flag, best_edge)
+    return best
+
+
+def search(
+    board: Board,
+    depth: int,
+    tt=None,
+    time_deadline: Optional[float] = None,
+    rotate: int = 0,
+) -> Tuple[int, Optional[Move]]:
+    """``(value, best move)`` of *board* for the player to move, *depth* plies deep.
+
+    The move is the first line of the best macro move.
+    """
+    if tt is None:
+        tt = TranspositionTable()
+    board = board.clone()  # a timeout leaves the searched board half played
+    negamax(board, depth, -INFINITY, INFINITY, tt, time_deadline, rotate)
+    entry = tt.probe(board.zobrist)
+    if entry is None or entry[3] == NO_EDGE:
+        # a shared table may have lost the root to another position
+        return _search_root(board, depth, tt, time_deadline, rotate)
+    return entry[0], tables.edge_moves(board.rows, board.cols)[entry[3]]
+
+
+def _search_root(board: Board, depth: int, tt, time_deadline: Optional[float], rotate: int) -> Tuple[int, Optional[Move]]:
+    best = -INFINITY
+    best_edge = NO_EDGE
+    for macro in macro_moves(board, NO_EDGE, rotate):
+        taken = make_macro(board, macro, PlayerSide.FIRST_PLAYER)
+        if macro.keeps_turn:
+            value = taken + negamax(board, depth - 1, best - taken, INFINITY, tt, time_deadline, rotate)
+        else:
+            value = taken - negamax(board, depth - 1, -INFINITY, taken - best, tt, time_deadline, rotate)
+        unmake_macro(board, macro)
+        if value > best:
+            best = value
+            best_edge = macro.edges[0]
+    if best_edge == NO_EDGE:
+        return 0, None
+    return best, tables.edge_moves(board.rows, board.cols)[best_edge]
+
+
+def iterative_deepening(
+    board: Board,
+    time_deadline: float,
+    tt=None,
+    start_depth: int = 1,
+    max_depth: Optional[int] = None,
+    rotate: int = 0,
+) -> Tuple[int, Optional[Move], int]:
+    """``(value, best move, depth)`` of the deepest search finished by *time_deadline*.
+
+    The depth is 0 and the move ``None`` if not even *start_depth* finished.
+    """
+    if tt is None:
+        tt = TranspositionTable()
+    moves_left = board.num_horizontal_lines_left + board.num_vertical_lines_left
+    if max_depth is None or max_depth > moves_left:
+        max_depth = moves_left
+    result: Tuple[int, Optional[Move], int] = (0, None, 0)
+    for depth in range(start_depth, max_depth + 1):
+        try:
+            value, move = search(board, depth, tt, time_deadline, rotate)
+        except TimeoutError:
+            break
+        result = (value, move, depth)
+    return result
+
+
+__all__ = [
+    "EXACT",
+    "LOWER",
+    "UPPER",
+    "TranspositionTable",
+    "iterative_deepening",
+    "negamax",
+    "ordered_edges",
+    "quiescence",
+    "search",
+    "stand_pat",
+    "take_captures",
+]
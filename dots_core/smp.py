@@ -0,0 +1,148 @@
+"""Lazy SMP: several processes search one root through a shared table.
+
+The workers of :func:`dots_core.parallel.get_pool` and the calling process
+all run :func:`dots_core.search.iterative_deepening` on the same position.
+Their only link is a transposition table in ``multiprocessing.shared_memory``:
+what one search stores, the others probe, so each gets past the work the
+others have done. Helpers start one ply deeper on every other worker and try
+moves in different orders, so they do not all search the same subtree. The
+answer is the move of the deepest search finished by the deadline.
+
+:class:`SharedTT` is a fixed array of 16-byte entries, each a 64-bit data
+word and that word XORed with the position key. Entries are written without
+a lock: a torn write leaves a pair that no key matches, and probes ignore it.
+"""
+
+from __future__ import annotations
+
+import os
+import time
+from typing import TYPE_CHECKING
+
+from . import profiling
+from .parallel import get_pool, worker_count
+from .search import iterative_deepening
+
+if TYPE_CHECKING:  # pragma: no cover
+    from typing import Dict, Optional, Tuple
+
+    from .board import Board
+    from .move import Move
+
+DEFAULT_TT_ENTRIES = 1 << 18  # 4 MiB
+_VALUE_BIAS = 1 << 15
+_MASK64 = (1 << 64) - 1
+_RESULT_GRACE_SECS = 0.05  # how long a helper may take to notice the deadline
+
+_shared_tt: Optional[SharedTT] = None
+_attached: Dict[str, SharedTT] = {}  # in the workers: tables by name
+
+
+class SharedTT:
+    """A transposition table in shared memory, usable from several processes."""
+
+    def __init__(self, entries: int = DEFAULT_TT_ENTRIES, name: Optional[str] = None) -> None:
+        from multiprocessing import shared_memory
+
+        if entries & (entries - 1):
+            raise ValueError("entries must be a power of two")
+        if name is None:
+            self._memory = shared_memory.SharedMemory(create=True, size=16 * entries)
+        else:
+            self._memory = shared_memory.SharedMemory(name=name)
+        self._owner = name is None
+        self.name = self._memory.name
+        self._slots = self._memory.buf.cast("Q")
+        self._mask = len(self._slots) // 2 - 1
+
+    def probe(self, key: int) -> Optional[Tuple[int, int, int, int]]:
+        """``(value, depth, flag, edge)`` stored for *key*, or ``None``."""
+        i = (key & self._mask) << 1
+        slots = self._slots
+        data = slots[i + 1]
+        if slots[i] ^ data != key:
+            return None
+        return (
+            (data & 0xFFFF) - _VALUE_BIAS,
+            (data >> 16) & 0xFF,
+            (data >> 24) & 0x3,
+            ((data >> 26) & 0xFFFF) - 1,
+        )
+
+    def store(self, key: int, value: int, depth: int, flag: int, edge: int) -> None:
+        depth = min(depth, 0xFF)  # a shallower depth only makes the entry less useful
+        i = (key & self._mask) << 1
+        slots = self._slots
+        old = slots[i + 1]
+        if slots[i] ^ old == key and (old >> 16) & 0xFF > depth:
+            return  # keep the deeper result for the same position
+        data = (value + _VALUE_BIAS) | depth << 16 | flag << 24 | (edge + 1) << 26
+        slots[i] = (key ^ data) & _MASK64
+        slots[i + 1] = data
+
+    def clear(self) -> None:
+        self._memory.buf[:] = bytes(len(self._memory.buf))
+
+    def close(self) -> None:
+        self._slots.release()
+        self._memory.close()
+        if self._owner:
+            self._memory.unlink()
+
+
+def shared_tt() -> SharedTT:
+    """The process-wide shared table, created on first use.
+
+    ``DOTS_TT_ENTRIES`` sets its size (a power of two, default 2**18).
+    """
+    global _shared_tt
+    if _shared_tt is None:
+        import atexit
+
+        _shared_tt = SharedTT(int(os.environ.get("DOTS_TT_ENTRIES", DEFAULT_TT_ENTRIES)))
+        atexit.register(_shared_tt.close)
+    return _shared_tt
+
+
+def _helper(tt_name: str, board: Board, time_deadline: float, start_depth: int, rotate: int) -> tuple:
+    tt = _attached.get(tt_name)
+    if tt is None:
+        tt = _attached[tt_name] = SharedTT(name=tt_name)
+    nodes = profiling.nodes
+    result = iterative_deepening(board, time_deadline, tt, start_depth=start_depth, rotate=rotate)
+    return result, profiling.nodes - nodes
+
+
+def lazy_smp(board: Board, time_deadline: float) -> Tuple[int, Optional[Move], int]:
+    """``(value, best move, depth)`` for the player to move, searched by every worker.
+
+    The value is the net score of the rest of the game, as in
+    :mod:`dots_core.search`. With one worker this is a plain iterative
+    deepening search on the shared table.
+    """
+    import multiprocessing
+
+    tt = shared_tt()
+    helpers = worker_count() - 1 if hasattr(os, "fork") else 0
+    pending = []
+    if helpers > 0:
+        pool = get_pool(worker_count())
+        step = max(1, len(board.edge_class) // (helpers + 1))
+        pending = [
+            pool.apply_async(_helper, (tt.name, board, time_deadline, 1 + i % 2, i * step))
+            for i in range(1, helpers + 1)
+        ]
+
+    best = iterative_deepening(board, time_deadline, tt)
+    for task in pending:
+        try:
+            result, nodes = task.get(max(0.0, time_deadline - time.time()) + _RESULT_GRACE_SECS)
+        except multiprocessing.TimeoutError:
+            continue
+        profiling.count_nodes(nodes)
+        if result[2] > best[2]:
+            best = result
+    return best
+
+
+__all__ = ["DEFAULT_TT_ENTRIES", "SharedTT", "lazy_smp", "shared_tt"]
@@ -0,0 +1,265 @@
+"""Endgame tablebase: exact values of small board regions.
+
+A region is a connected group of unclaimed boxes, two boxes being connected
+when the line between them is not drawn yet. Regions never share an undrawn
+line, so late in the game the board falls apart into independent regions.
+
+The table holds, for every region of up to ``max boxes`` boxes, the net score
+(boxes taken minus boxes conceded) that the player who moves first in the
+region secures with perfect play when the region is played on its own. It is
+exact when one region is left and a sound way to compare regions before that
+(a lone chain of ``n`` boxes is worth ``-n``, a loop less).
+
+Regions are keyed by the undrawn lines inside their bounding box, in the
+orientation with the smallest key, so translated, mirrored and rotated copies
+share an entry. Build the table offline (not committed, like the tables
+snapshot); ``DOTS_TABLEBASE`` selects another file than
+``dots_core/endgame.tablebase``::
+
+    python -m dots_core.tablebase --max-boxes 6
+"""
+
+from __future__ import annotations
+
+import os
+from typing import TYPE_CHECKING
+
+from . import tables
+
+if TYPE_CHECKING:  # pragma: no cover
+    from typing import Dict, Iterable, List, Optional, Tuple
+
+    from .board import Board
+    from .packed import PackedTable
+
+TABLEBASE_MAGIC = b"DOTSEGTB"
+DEFAULT_TABLEBASE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "endgame.tablebase")
+MAX_KEY_EDGES = 48  # the bounding-box dimensions take the top 16 bits of a key
+
+_tablebase: Optional[PackedTable] = None
+_tablebase_loaded = False
+
+
+def _get_tablebase() -> Optional[PackedTable]:
+    global _tablebase, _tablebase_loaded
+    if not _tablebase_loaded:
+        _tablebase_loaded = True
+        path = os.environ.get("DOTS_TABLEBASE", DEFAULT_TABLEBASE)
+        if os.path.isfile(path):
+            from .packed import PackedTable
+
+            _tablebase = PackedTable(path, TABLEBASE_MAGIC)
+    return _tablebase
+
+
+def _is_drawn(board: Board, move) -> bool:
+    if move.is_horizontal:
+        return board.horizontal_lines[move.row][move.col] != 0
+    return board.vertical_lines[move.row][move.col] != 0
+
+
+def region_of(board: Board, box: int) -> List[int]:
+    """Box ids of the region holding *box* (an unclaimed box)."""
+    rows, cols = board.rows, board.cols
+    edges_of = tables.box_edges(rows, cols)
+    boxes_of = tables.edge_boxes(rows, cols)
+    moves = tables.edge_moves(rows, cols)
+    region = [box]
+    seen = {box}
+    for b in region:  # grows while it is walked
+        for e in edges_of[b]:
+            if _is_drawn(board, moves[e]):
+                continue
+            for other in boxes_of[e]:
+                if other not in seen:
+                    seen.add(other)
+                    region.append(other)
+    return region
+
+
+def regions(board: Board) -> List[List[int]]:
+    """Every region of *board*, as lists of box ids."""
+    found = []
+    seen = set()
+    for box, sides in enumerate(board.box_sides):
+        if sides < 4 and box not in seen:
+            region = region_of(board, box)
+            seen.update(region)
+            found.append(region)
+    return found
+
+
+def canonical_key(cells: Iterable[Tuple[int, int]], undrawn: Iterable[Tuple[int, int, bool]]) -> Optional[int]:
+    """Key of the region with boxes at *cells* and lines *undrawn* (``(row, col, is_horizontal)``)."""
+    cells = list(cells)
+    r0 = min(r for r, _ in cells)
+    c0 = min(c for _, c in cells)
+    h = max(r for r, _ in cells) - r0 + 1
+    w = max(c for _, c in cells) - c0 + 1
+    lines = [(r - r0, c - c0, horizontal) for r, c, horizontal in undrawn]
+    if h > w:  # transpose so that every shape has one orientation with h <= w
+        h, w = w, h
+        lines = [(c, r, not horizontal) for r, c, horizontal in lines]
+    if tables.num_edges(h + 1, w + 1) > MAX_KEY_EDGES:
+        return None
+
+    offset = (h + 1) * w
+    ids = [r * w + c if horizontal else offset + r * (w + 1) + c for r, c, horizontal in lines]
+    best = None
+    for perm in tables.edge_symmetries(h + 1, w + 1):
+        mask = 0
+        for e in ids:
+            mask |= 1 << perm[e]
+        if best is None or mask < best:
+            best = mask
+    return (h << 56) | (w << 48) | best
+
+
+def region_key(board: Board, boxes: List[int]) -> Optional[int]:
+    cells = tables.box_cells(board.rows, board.cols)
+    edges_of = tables.box_edges(board.rows, board.cols)
+    moves = tables.edge_moves(board.rows, board.cols)
+    undrawn = set()
+    for b in boxes:
+        for e in edges_of[b]:
+            move = moves[e]
+            if not _is_drawn(board, move):
+                undrawn.add((move.row, move.col, move.is_horizontal))
+    return canonical_key((cells[b] for b in boxes), undrawn)
+
+
+def region_value(board: Board, boxes: List[int]) -> Optional[int]:
+    """Net score of the first player to move in the region, or ``None`` if it is not in the table."""
+    table = _get_tablebase()
+    if table is None or len(boxes) > table.meta:
+        return None
+    key = region_key(board, boxes)
+    if key is None:
+        return None
+    value = table.get(key)
+    if value is None:
+        return None
+    return value - (1 << 32) if value >= 1 << 31 else value
+
+
+def polyominoes(max_boxes: int) -> List[List[Tuple[int, int]]]:
+    """One cell list per free polyomino of up to *max_boxes* cells."""
+
+    def normalise(cells):
+        r0 = min(r for r, _ in cells)
+        c0 = min(c for _, c in cells)
+        return tuple(sorted((r - r0, c - c0) for r, c in cells))
+
+    def free_form(cells):
+        forms = []
+        for flip in (False, True):
+            pts = [(c, r) if flip else (r, c) for r, c in cells]
+            for _ in range(4):
+                pts = [(c, -r) for r, c in pts]
+                forms.append(normalise(pts))
+        return min(forms)
+
+    found = []
+    level = {((0, 0),)}
+    for _ in range(max_boxes):
+        found.extend(level)
+        grown = set()
+        for shape in level:
+            cells = set(shape)
+            for r, c in shape:
+                for cell in ((r - 1, c), (r + 1, c), (r, c - 1), (r, c + 1)):
+                    if cell not in cells:
+                        grown.add(free_form(cells | {cell}))
+        level = grown
+    return [list(shape) for shape in sorted(found)]
+
+
+def solve_shape(cells: List[Tuple[int, int]], entries: Dict[int, int]) -> None:
+    """Solve every position on the lines of the boxes *cells*, adding connected regions to *entries*."""
+    h = max(r for r, _ in cells) + 1
+    w = max(c for _, c in cells) + 1
+    frame_cells = tables.box_cells(h + 1, w + 1)
+    frame_edges = tables.box_edges(h + 1, w + 1)
+    frame_moves = tables.edge_moves(h + 1, w + 1)
+    boxes = [frame_cells.index(cell) for cell in cells]
+
+    # local bit i <-> frame edge lines[i]. A line between a box of the shape
+    # and another box of the frame is always drawn: on a real board that box
+    # is claimed (the region would include it otherwise), and only with it
+    # drawn do the undrawn lines alone tell which boxes make up the region.
+    frame_boxes = tables.edge_boxes(h + 1, w + 1)
+    inside = set(boxes)
+    lines = sorted({e for b in boxes for e in frame_edges[b] if inside.issuperset(frame_boxes[e])})
+    bit = {e: 1 << i for i, e in enumerate(lines)}
+    box_masks = [sum(bit.get(e, 0) for e in frame_edges[b]) for b in boxes]
+    line_boxes = [[j for j, mask in enumerate(box_masks) if mask & bit[e]] for e in lines]
+    joins = [(js[0], js[1], bit[lines[i]]) for i, js in enumerate(line_boxes) if len(js) == 2]
+
+    values = [0] * (1 << len(lines))
+    for state in range(1, 1 << len(lines)):
+        best = None
+        rest_bits = state
+        while rest_bits:
+            low = rest_bits & -rest_bits
+            rest_bits ^= low
+            after = state ^ low
+            taken = 0
+            for j in line_boxes[low.bit_length() - 1]:
+                if state & box_masks[j] == low:
+                    taken += 1
+            # taking a box keeps the move, anything else hands it over
+            value = taken + values[after] if taken else -values[after]
+            if best is None or value > best:
+                best = value
+        values[state] = best
+
+        alive = [j for j, mask in enumerate(box_masks) if state & mask]
+        if not _connected(alive, joins, state):
+            continue
+        undrawn = [frame_moves[e] for e in lines if state & bit[e]]
+        key = canonical_key(
+            (cells[j] for j in alive),
+            ((m.row, m.col, m.is_horizontal) for m in undrawn),
+        )
+        if key is not None:
+            entries[key] = best
+
+
+def _connected(alive: List[int], joins: List[Tuple[int, int, int]], state: int) -> bool:
+    reached = {alive[0]}
+    grew = True
+    while grew:
+        grew = False
+        for a, b, line in joins:
+            if state & line and (a in reached) != (b in reached):
+                reached.add(a)
+                reached.add(b)
+                grew = True
+    return len(reached) == len(alive)
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    import argparse
+    import time
+
+    from .packed import write_packed_table
+
+    parser = argparse.ArgumentParser(description="Build the endgame tablebase of small regions.")
+    parser.add_argument("--max-boxes", type=int, default=6, help="largest region solved")
+    parser.add_argument("--output", default=DEFAULT_TABLEBASE)
+    args = parser.parse_args(argv)
+
+    start = time.perf_counter()
+    entries: Dict[int, int] = {}
+    shapes = polyominoes(args.max_boxes)
+    for i, cells in enumerate(shapes, 1):
+        solve_shape(cells, entries)
+        print(f"\r{i}/{len(shapes)} shapes, {len(entries)} regions", end="", flush=True)
+    print()
+
+    write_packed_table(args.output, TABLEBASE_MAGIC, {k: v & 0xFFFFFFFF for k, v in entries.items()}, meta=args.max_boxes)
+    print(f"wrote {len(entries)} regions to {args.output} in {time.perf_counter() - start:.0f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,257 @@
+"""Per-board-size lookup tables, built once per process and cached.
+
+Edge ids number every line of a ``rows`` x ``cols`` dot grid: horizontal lines
+first, row by row (``row * (cols - 1) + col``), then vertical lines
+(``num_horizontal + row * cols + col``) -- the order of
+``Board.get_valid_moves``. Box ids number the unit squares row by row
+(``row * (cols - 1) + col``).
+
+The adjacency tables (edge -> boxes, box -> edges, edge -> neighbouring edges)
+replace the bounds checks and 2-D indexing the board and the heuristics used
+to repeat on every call.
+
+Zobrist keys (one random 64-bit key per edge, from a fixed seed) can be
+precomputed into a snapshot file that agents map with ``mmap`` at startup
+instead of regenerating them::
+
+    python -m dots_core.tables --sizes 5 10 30
+
+The snapshot is optional; sizes it does not hold are generated on demand.
+"""
+
+from __future__ import annotations
+
+import os
+import sys
+from typing import TYPE_CHECKING
+
+from .move import Move
+
+if TYPE_CHECKING:  # pragma: no cover
+    from typing import Dict, List, Optional, Sequence, Tuple
+
+ZOBRIST_SEED = 0x5EED_D075
+SNAPSHOT_MAGIC = b"DOTSTBL1"
+DEFAULT_SNAPSHOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "tables.snapshot")
+
+_edge_moves: Dict[Tuple[int, int], List[Move]] = {}
+_edge_ids: Dict[Tuple[int, int], Dict[Move, int]] = {}
+_edge_boxes: Dict[Tuple[int, int], List[Tuple[int, ...]]] = {}
+_box_edges: Dict[Tuple[int, int], List[Tuple[int, int, int, int]]] = {}
+_edge_neighbours: Dict[Tuple[int, int], List[Tuple[int, ...]]] = {}
+_box_cells: Dict[Tuple[int, int], List[Tuple[int, int]]] = {}
+_edge_symmetries: Dict[Tuple[int, int], List[Tuple[int, ...]]] = {}
+_zobrist: Dict[Tuple[int, int], Sequence[int]] = {}
+_snapshot: Optional[Dict[Tuple[int, int], Sequence[int]]] = None
+
+
+def num_edges(rows: int, cols: int) -> int:
+    return rows * (cols - 1) + (rows - 1) * cols
+
+
+def edge_id(rows: int, cols: int, move: Move) -> int:
+    if move.is_horizontal:
+        return move.row * (cols - 1) + move.col
+    return rows * (cols - 1) + move.row * cols + move.col
+
+
+def edge_moves(rows: int, cols: int) -> List[Move]:
+    """Edge id -> Move."""
+    key = (rows, cols)
+    moves = _edge_moves.get(key)
+    if moves is None:
+        moves = [Move(r, c, True) for r in range(rows) for c in range(cols - 1)]
+        moves += [Move(r, c, False) for r in range(rows - 1) for c in range(cols)]
+        _edge_moves[key] = moves
+    return moves
+
+
+def edge_ids(rows: int, cols: int) -> Dict[Move, int]:
+    """Move -> edge id."""
+    key = (rows, cols)
+    ids = _edge_ids.get(key)
+    if ids is None:
+        ids = {move: i for i, move in enumerate(edge_moves(rows, cols))}
+        _edge_ids[key] = ids
+    return ids
+
+
+def num_boxes(rows: int, cols: int) -> int:
+    return (rows - 1) * (cols - 1)
+
+
+def box_cells(rows: int, cols: int) -> List[Tuple[int, int]]:
+    """Box id -> ``(row, col)`` of the box."""
+    key = (rows, cols)
+    cells = _box_cells.get(key)
+    if cells is None:
+        cells = [(r, c) for r in range(rows - 1) for c in range(cols - 1)]
+        _box_cells[key] = cells
+    return cells
+
+
+def box_edges(rows: int, cols: int) -> List[Tuple[int, int, int, int]]:
+    """Box id -> edge ids of its top, bottom, left and right sides."""
+    key = (rows, cols)
+    edges = _box_edges.get(key)
+    if edges is None:
+        offset = rows * (cols - 1)
+        edges = [
+            (
+                r * (cols - 1) + c,
+                (r + 1) * (cols - 1) + c,
+                offset + r * cols + c,
+                offset + r * cols + c + 1,
+            )
+            for r, c in box_cells(rows, cols)
+        ]
+        _box_edges[key] = edges
+    return edges
+
+
+def edge_boxes(rows: int, cols: int) -> List[Tuple[int, ...]]:
+    """Edge id -> ids of the one or two boxes the edge borders."""
+    key = (rows, cols)
+    boxes = _edge_boxes.get(key)
+    if boxes is None:
+        adjacent: List[List[int]] = [[] for _ in range(num_edges(rows, cols))]
+        for box, edges in enumerate(box_edges(rows, cols)):
+            for edge in edges:
+                adjacent[edge].append(box)
+        boxes = [tuple(b) for b in adjacent]
+        _edge_boxes[key] = boxes
+    return boxes
+
+
+def edge_neighbours(rows: int, cols: int) -> List[Tuple[int, ...]]:
+    """Edge id -> the other edges of the boxes it borders."""
+    key = (rows, cols)
+    neighbours = _edge_neighbours.get(key)
+    if neighbours is None:
+        sides = box_edges(rows, cols)
+        neighbours = [
+            tuple(e for box in boxes for e in sides[box] if e != edge)
+            for edge, boxes in enumerate(edge_boxes(rows, cols))
+        ]
+        _edge_neighbours[key] = neighbours
+    return neighbours
+
+
+def edge_symmetries(rows: int, cols: int) -> List[Tuple[int, ...]]:
+    """Edge permutations of the board's symmetries, identity first.
+
+    ``perm[e]`` is the image of edge ``e``. Every board has the four
+    reflections and half-turn of a rectangle; square boards add the four
+    transposing symmetries.
+    """
+    key = (rows, cols)
+    perms = _edge_symmetries.get(key)
+    if perms is None:
+        last_r, last_c = rows - 1, cols - 1
+        maps = [
+            lambda r, c: (r, c),
+            lambda r, c: (last_r - r, c),
+            lambda r, c: (r, last_c - c),
+            lambda r, c: (last_r - r, last_c - c),
+        ]
+        if rows == cols:
+            maps += [
+                lambda r, c: (c, r),
+                lambda r, c: (last_c - c, r),
+                lambda r, c: (c, last_r - r),
+                lambda r, c: (last_c - c, last_r - r),
+            ]
+        offset = rows * (cols - 1)
+        perms = []
+        for f in maps:
+            perm = []
+            for move in edge_moves(rows, cols):
+                end = (move.row, move.col + 1) if move.is_horizontal else (move.row + 1, move.col)
+                (r1, c1), (r2, c2) = sorted((f(move.row, move.col), f(*end)))
+                perm.append(r1 * (cols - 1) + c1 if r1 == r2 else offset + r1 * cols + c1)
+            perms.append(tuple(perm))
+        _edge_symmetries[key] = perms
+    return perms
+
+
+def zobrist_keys(rows: int, cols: int) -> Sequence[int]:
+    """Edge id -> 64-bit Zobrist key, identical in every process."""
+    key = (rows, cols)
+    keys = _zobrist.get(key)
+    if keys is None:
+        keys = _load_snapshot().get(key)
+        if keys is None:
+            keys = generate_zobrist_keys(rows, cols)
+        _zobrist[key] = keys
+    return keys
+
+
+def generate_zobrist_keys(rows: int, cols: int) -> List[int]:
+    import random
+
+    rng = random.Random(ZOBRIST_SEED ^ (rows << 16) ^ cols)
+    return [rng.getrandbits(64) for _ in range(num_edges(rows, cols))]
+
+
+def _load_snapshot() -> Dict[Tuple[int, int], Sequence[int]]:
+    """Map the snapshot file, if there is one; its keys are read straight from the mapping."""
+    global _snapshot
+    if _snapshot is not None:
+        return _snapshot
+    _snapshot = {}
+
+    path = os.environ.get("DOTS_TABLES_SNAPSHOT", DEFAULT_SNAPSHOT)
+    if sys.byteorder != "little" or not os.path.isfile(path):
+        return _snapshot
+
+    import mmap
+    import struct
+
+    with open(path, "rb") as f:
+        mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    if mapped[: len(SNAPSHOT_MAGIC)] != SNAPSHOT_MAGIC:
+        return _snapshot
+
+    (count,) = struct.unpack_from("<I", mapped, len(SNAPSHOT_MAGIC))
+    view = memoryview(mapped)
+    entry = struct.Struct("<HHQ")
+    for i in range(count):
+        rows, cols, offset = entry.unpack_from(mapped, len(SNAPSHOT_MAGIC) + 4 + i * entry.size)
+        _snapshot[(rows, cols)] = view[offset: offset + 8 * num_edges(rows, cols)].cast("Q")
+    return _snapshot
+
+
+def write_snapshot(path: str, sizes: Sequence[Tuple[int, int]]) -> None:
+    """Write the Zobrist keys of every ``(rows, cols)`` in *sizes* to *path*."""
+    import struct
+    from array import array
+
+    entry = struct.Struct("<HHQ")
+    offset = len(SNAPSHOT_MAGIC) + 4 + entry.size * len(sizes)
+    offset += -offset % 8  # keep the key arrays 8-byte aligned
+    header = bytearray(SNAPSHOT_MAGIC + struct.pack("<I", len(sizes)))
+    body = bytearray()
+    for rows, cols in sizes:
+        header += entry.pack(rows, cols, offset + len(body))
+        body += array("Q", generate_zobrist_keys(rows, cols)).tobytes()
+    header += bytes(-len(header) % 8)
+
+    with open(path, "wb") as f:
+        f.write(header)
+        f.write(body)
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Precompute the lookup table snapshot mapped by agents.")
+    parser.add_argument("--sizes", type=int, nargs="+", default=list(range(2, 31)), help="dots per side")
+    parser.add_argument("--output", default=DEFAULT_SNAPSHOT)
+    args = parser.parse_args(argv)
+
+    write_snapshot(args.output, [(n, n) for n in args.sizes])
+    print(f"wrote {len(args.sizes)} board sizes to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
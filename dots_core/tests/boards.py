@@ -0,0 +1,84 @@
+"""Boards and a plain reference solver for the tests."""
+
+from __future__ import annotations
+
+import random
+from typing import Dict, List, Optional, Sequence
+
+from dots_core.board import Board, MoveClass, PlayerSide
+
+
+def empty_board(rows: int, cols: int) -> Board:
+    return Board(
+        rows,
+        cols,
+        [[0] * (cols - 1) for _ in range(rows)],
+        [[0] * cols for _ in range(rows - 1)],
+        [[0] * (cols - 1) for _ in range(rows - 1)],
+    )
+
+
+def board_from_lines(horizontal: Sequence[Sequence[int]], vertical: Sequence[Sequence[int]]) -> Board:
+    """The board with these lines drawn, its complete boxes owned by the first player."""
+    rows, cols = len(horizontal), len(horizontal[0]) + 1
+    h, v = horizontal, vertical
+    owners = [
+        [int(bool(h[r][c] and h[r + 1][c] and v[r][c] and v[r][c + 1])) for c in range(cols - 1)]
+        for r in range(rows - 1)
+    ]
+    return Board(rows, cols, h, v, owners)
+
+
+def random_position(rng: random.Random, rows: int, cols: int, lines_left: int, safe_bias: float = 1.0) -> Board:
+    """A position with *lines_left* undrawn lines, mostly reached by safe moves."""
+    board = empty_board(rows, cols)
+    side = PlayerSide.FIRST_PLAYER
+    while board.num_horizontal_lines_left + board.num_vertical_lines_left > lines_left:
+        safe = board.classify_moves()[1]
+        moves = safe if safe and rng.random() < safe_bias else board.get_valid_moves()
+        if not board.make_move(rng.choice(moves), side):
+            side = side.opponent()
+    return board
+
+
+def solve(board: Board, memo: Optional[Dict[int, int]] = None) -> int:
+    """Net score of the rest of the game for the player to move, line by line on copies."""
+    if memo is None:
+        memo = {}
+    if board.is_completed():
+        return 0
+    key = board.zobrist
+    if key in memo:
+        return memo[key]
+    me = PlayerSide.FIRST_PLAYER
+    best = None
+    for move in board.get_valid_moves():
+        child = board.clone()
+        before = child.scores[me]
+        child.make_move(move, me)
+        taken = child.scores[me] - before
+        value = taken + solve(child, memo) if taken else -solve(child, memo)
+        if best is None or value > best:
+            best = value
+    memo[key] = best
+    return best
+
+
+def snapshot(board: Board) -> tuple:
+    """Everything make_move changes, to compare positions with."""
+    return (
+        [row[:] for row in board.horizontal_lines],
+        [row[:] for row in board.vertical_lines],
+        [row[:] for row in board.grid_owner],
+        board.get_scores(),
+        board.box_sides[:],
+        bytes(board.edge_class),
+        board.zobrist,
+        board.num_empty_grids,
+        board.num_horizontal_lines_left,
+        board.num_vertical_lines_left,
+    )
+
+
+def undrawn_edges(board: Board) -> List[int]:
+    return [e for e, klass in enumerate(board.edge_class) if klass != MoveClass.DRAWN]
@@ -0,0 +1,114 @@
+import random
+
+from dots_core import tables
+from dots_core.board import Board, MoveClass, PlayerSide
+from dots_core.search import take_captures
+from dots_core.tests.boards import board_from_lines, empty_board, random_position, snapshot
+
+
+def rebuilt(board):
+    """The same position, with the metadata computed from scratch."""
+    return Board(board.rows, board.cols, board.horizontal_lines, board.vertical_lines, board.grid_owner)
+
+
+def test_unmake_move_restores_every_field():
+    rng = random.Random(0)
+    for _ in range(50):
+        board = empty_board(rng.randint(2, 6), rng.randint(2, 6))
+        history = []
+        side = PlayerSide.FIRST_PLAYER
+        while not board.is_completed():
+            move = rng.choice(board.get_valid_moves())
+            history.append((snapshot(board), move))
+            if not board.make_move(move, side):
+                side = side.opponent()
+        for before, move in reversed(history):
+            board.unmake_move(move)
+            assert snapshot(board) == before
+
+
+def test_incremental_metadata_matches_a_rebuilt_board():
+    rng = random.Random(1)
+    for _ in range(50):
+        board = empty_board(rng.randint(2, 7), rng.randint(2, 7))
+        side = PlayerSide.FIRST_PLAYER
+        while not board.is_completed():
+            if rng.random() < 0.3:
+                # a move taken back must leave no trace
+                probe = rng.choice(board.get_valid_moves())
+                board.make_move(probe, side)
+                board.unmake_move(probe)
+            if not board.make_move(rng.choice(board.get_valid_moves()), side):
+                side = side.opponent()
+            assert snapshot(board) == snapshot(rebuilt(board))
+
+
+def naive_class(board, move):
+    """``(boxes completed, boxes the opponent then takes in a row)`` of *move*, on copies."""
+    child = board.clone()
+    before = child.get_scores()
+    child.make_move(move, PlayerSide.FIRST_PLAYER)
+    completed = child.scores[PlayerSide.FIRST_PLAYER] - before[PlayerSide.FIRST_PLAYER]
+    if completed:
+        return completed, 0
+    return 0, take_captures(child, PlayerSide.SECOND_PLAYER)
+
+
+def test_classify_moves_matches_playing_each_move():
+    rng = random.Random(2)
+    for _ in range(60):
+        board = random_position(rng, rng.randint(3, 6), rng.randint(3, 6), rng.randint(1, 30), safe_bias=0.8)
+        capturing, safe, sacrifices = board.classify_moves()
+        sacrificed = {move: k for k, move in sacrifices}
+        # with boxes already on offer the opponent takes those as well
+        quiet = board.edge_class.find(MoveClass.CAPTURE) < 0
+        classified = [board.edge_id(m) for m in capturing + safe + list(sacrificed)]
+        assert sorted(classified) == sorted(board.edge_id(m) for m in board.get_valid_moves())
+        for move in board.get_valid_moves():
+            completed, handed_over = naive_class(board, move)
+            if completed:
+                assert move in capturing and board.edge_class[board.edge_id(move)] == MoveClass.CAPTURE
+            elif move in safe:
+                assert all(board.box_sides[b] < 2 for b in tables.edge_boxes(board.rows, board.cols)[board.edge_id(move)])
+                if quiet:
+                    assert handed_over == 0
+            elif quiet:
+                # sizes are counted for positions with nothing on offer, where agents use them
+                assert sacrificed[move] == board.sacrifice_size(move) == handed_over > 0
+
+
+def test_sacrifice_sizes_is_the_size_of_each_chain():
+    rng = random.Random(3)
+    for _ in range(60):
+        board = random_position(rng, rng.randint(3, 6), rng.randint(3, 6), rng.randint(4, 30))
+        if board.edge_class.find(MoveClass.CAPTURE) >= 0:
+            continue
+        box_edges = tables.box_edges(board.rows, board.cols)
+        moves = tables.edge_moves(board.rows, board.cols)
+        for box, size in enumerate(board.sacrifice_sizes()):
+            if board.box_sides[box] != 2:
+                assert size == 0
+                continue
+            for e in box_edges[box]:
+                if board.edge_class[e] == MoveClass.SACRIFICE:
+                    assert naive_class(board, moves[e]) == (0, size)
+
+
+def test_listeners_see_moves_on_their_board_only():
+    board = board_from_lines([[1, 1], [1, 0], [0, 0]], [[1, 0, 0], [0, 0, 0]])
+    seen = []
+
+    def listener(move, side, captured):
+        seen.append((board.edge_id(move), side, captured))
+
+    board.subscribe(listener)
+    copy = board.clone()
+    capture = board.edge_class.find(MoveClass.CAPTURE)
+    moves = tables.edge_moves(board.rows, board.cols)
+    board.make_move(moves[capture], PlayerSide.SECOND_PLAYER)
+    copy.make_move(moves[capture], PlayerSide.FIRST_PLAYER)
+    board.unmake_move(moves[capture])
+    assert seen == [(capture, PlayerSide.SECOND_PLAYER, [(0, 0)])]
+    board.unsubscribe(listener)
+    board.make_move(moves[capture], PlayerSide.FIRST_PLAYER)
+    assert len(seen) == 1
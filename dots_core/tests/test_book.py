@@ -0,0 +1,55 @@
+import random
+
+import pytest
+
+from dots_core import book, tables
+from dots_core.board import PlayerSide
+from dots_core.packed import write_packed_table
+from dots_core.tests.boards import empty_board, undrawn_edges
+
+
+def board_with(rows, cols, edges):
+    board = empty_board(rows, cols)
+    moves = tables.edge_moves(rows, cols)
+    for e in edges:
+        board.make_move(moves[e], PlayerSide.FIRST_PLAYER)
+    return board
+
+
+@pytest.fixture
+def use_book(monkeypatch):
+    # restored after the test, whatever book it used
+    for name in ("_book", "_book_path", "_book_loaded"):
+        monkeypatch.setattr(book, name, getattr(book, name))
+    return book.use_book
+
+
+@pytest.mark.parametrize("rows,cols", [(5, 5), (4, 6)])
+def test_lookup_maps_the_book_move_through_every_symmetry(tmp_path, use_book, rows, cols):
+    rng = random.Random(rows * cols)
+    opening = rng.sample(range(tables.num_edges(rows, cols)), 4)
+    board = board_with(rows, cols, opening)
+    best = rng.choice(undrawn_edges(board))
+    key, sym = book.canonical_key(rows, cols, book.drawn_edges(board))
+    path = tmp_path / "test.book"
+    write_packed_table(str(path), book.BOOK_MAGIC, {key: tables.edge_symmetries(rows, cols)[sym][best]}, meta=len(opening))
+    use_book(str(path))
+
+    moves = tables.edge_moves(rows, cols)
+    for perm in tables.edge_symmetries(rows, cols):
+        image = board_with(rows, cols, [perm[e] for e in opening])
+        assert book.lookup(image) == moves[perm[best]]
+
+
+def test_lookup_misses(tmp_path, use_book):
+    board = board_with(5, 5, [0, 7])
+    key, sym = book.canonical_key(5, 5, book.drawn_edges(board))
+    path = tmp_path / "test.book"
+    # the stored move is line 0, which is drawn
+    write_packed_table(str(path), book.BOOK_MAGIC, {key: tables.edge_symmetries(5, 5)[sym][0]}, meta=2)
+    use_book(str(path))
+    assert book.lookup(board_with(5, 5, [1, 7])) is None  # not in the book
+    assert book.lookup(board_with(5, 5, [0, 7, 9])) is None  # deeper than the book
+    assert book.lookup(board) is None  # the book move is already drawn
+    use_book(None)
+    assert book.lookup(board) is None
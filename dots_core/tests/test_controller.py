@@ -0,0 +1,55 @@
+import io
+
+import pytest
+
+from dots_core import controller as controller_module
+from dots_core.board import PlayerSide
+from dots_core.controller import Controller
+from dots_core.move import Move
+from dots_core.token_stream import TokenStream
+
+# player number and an empty 3x3 board, as the engine sends them
+HANDSHAKE = "2\n3 3\n0 0\n0 0\n0 0\n0 0 0\n0 0 0\n0 0\n0 0\n"
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    """A monotonic clock that only moves when the test says so."""
+    now = [100.0]
+    monkeypatch.setattr(controller_module.time, "monotonic", lambda: now[0])
+    return now
+
+
+def sent_lines(capsys):
+    return capsys.readouterr().out.split()
+
+
+def test_timed_replies_replace_time_requests(capsys, clock):
+    # engine replies: the first !REQ_TIME, then the clock left and one opponent move
+    engine = TokenStream(io.StringIO(HANDSHAKE + "60000\n" + "55000\n1\n2 1 1\n"))
+    controller = Controller(tokens=engine, push_time=True)
+    assert controller.get_my_side() is PlayerSide.SECOND_PLAYER
+    assert sent_lines(capsys) == ["!REQ_PLAYER_NUM", "!REQ_BOARD"]
+
+    assert controller.get_time_ms() == 60000
+    clock[0] += 0.25
+    assert controller.get_time_ms() == 59750  # counted down locally, not asked again
+    assert sent_lines(capsys) == ["!REQ_TIME"]
+
+    assert not controller.make_move(Move(0, 0, True))
+    assert sent_lines(capsys) == ["!SENDING_MOVES", "1", "0", "0", "1", "!REQ_MOVES_TIMED"]
+    assert controller.get_current_board().horizontal_lines[2][1] == 1
+    assert controller.get_time_ms() == 55000
+    clock[0] += 1.0
+    assert controller.get_time_ms() == 54000
+    assert sent_lines(capsys) == []
+
+
+def test_untimed_controller_asks_every_time(capsys, clock):
+    engine = TokenStream(io.StringIO(HANDSHAKE + "60000\n" + "1\n2 1 1\n" + "58000\n"))
+    controller = Controller(tokens=engine)
+    sent_lines(capsys)
+    assert controller.get_time_ms() == 60000
+    controller.make_move(Move(0, 0, True))
+    assert controller.get_time_ms() == 58000
+    assert sent_lines(capsys) == ["!REQ_TIME", "!SENDING_MOVES", "1", "0", "0", "1", "!REQ_MOVES", "!REQ_TIME"]
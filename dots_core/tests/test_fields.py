@@ -0,0 +1,52 @@
+import random
+
+import pytest
+
+from dots_core import tables
+from dots_core.board import PlayerSide
+from dots_core.fields import BoxField
+from dots_core.tests.boards import empty_board, random_position, undrawn_edges
+
+
+def brute_sum(board, r0, c0, r1, c1):
+    height, width = board.rows - 1, board.cols - 1
+    return sum(board.box_sides[r * width + c]
+               for r in range(max(0, r0), min(height - 1, r1) + 1)
+               for c in range(max(0, c0), min(width - 1, c1) + 1))
+
+
+@pytest.mark.parametrize("rows, cols", [(2, 2), (3, 7), (6, 4), (9, 9)])
+def test_window_sums_match_brute_force(rows, cols):
+    rng = random.Random(rows * 31 + cols)
+    board = random_position(rng, rows, cols, rng.randint(0, 2 * rows * cols))
+    field = BoxField.from_board(board)
+    height, width = rows - 1, cols - 1
+    for box in range(height * width):
+        assert field.value(box) == board.box_sides[box]
+    for _ in range(200):
+        r0, r1 = sorted(rng.randint(-2, height + 1) for _ in range(2))
+        c0, c1 = sorted(rng.randint(-2, width + 1) for _ in range(2))
+        assert field.window_sum(r0, c0, r1, c1) == brute_sum(board, r0, c0, r1, c1)
+    assert field.window_sum(1, 1, 0, 0) == 0
+
+
+def test_window_counts_the_boxes_it_sums():
+    board = random_position(random.Random(5), 6, 8, 20)
+    field = BoxField.from_board(board)
+    for r in range(board.rows - 1):
+        for c in range(board.cols - 1):
+            total, boxes = field.window(r, c, 2)
+            r0, c0, r1, c1 = max(0, r - 2), max(0, c - 2), min(board.rows - 2, r + 2), min(board.cols - 2, c + 2)
+            assert (total, boxes) == (brute_sum(board, r - 2, c - 2, r + 2, c + 2), (r1 - r0 + 1) * (c1 - c0 + 1))
+
+
+def test_line_drawn_matches_a_rebuilt_field():
+    rng = random.Random(6)
+    board = empty_board(7, 6)
+    field = BoxField.from_board(board)
+    moves = tables.edge_moves(board.rows, board.cols)
+    while not board.is_completed():
+        edge = rng.choice(undrawn_edges(board))
+        board.make_move(moves[edge], PlayerSide.FIRST_PLAYER)
+        field.line_drawn(edge)
+        assert field._sums == BoxField.from_board(board)._sums
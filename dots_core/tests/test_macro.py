@@ -0,0 +1,71 @@
+import random
+
+from dots_core import macro, tables
+from dots_core.board import MoveClass, PlayerSide
+from dots_core.tests.boards import board_from_lines, random_position, snapshot, undrawn_edges
+from dots_core.tests.test_search import CHAIN_AND_LOOP
+
+
+def test_make_and_unmake_macro_round_trip():
+    rng = random.Random(1)
+    for _ in range(200):
+        board = random_position(rng, rng.randint(3, 6), rng.randint(3, 6), rng.randint(1, 20), safe_bias=0.7)
+        before = snapshot(board)
+        for m in macro.macro_moves(board):
+            macro.make_macro(board, m, PlayerSide.SECOND_PLAYER)
+            macro.unmake_macro(board, m)
+            assert snapshot(board) == before
+
+
+def test_every_line_is_a_macro_move_where_nothing_is_on_offer():
+    board = random_position(random.Random(2), 5, 5, 30)
+    assert board.edge_class.find(MoveClass.CAPTURE) < 0
+    moves = macro.macro_moves(board)
+    assert sorted(m.edges[0] for m in moves) == undrawn_edges(board)
+    assert all(m.kind == macro.SINGLE and len(m) == 1 for m in moves)
+
+
+def test_chain_offers_take_all_and_all_but_two():
+    # a 3-chain along the top row, opened at its left end
+    board = board_from_lines([[1, 1, 1], [1, 1, 1], [0, 0, 0], [0, 0, 0]], [[1, 0, 0, 0], [0] * 4, [0] * 4])
+    moves = macro.macro_moves(board)
+    kinds = [m.kind for m in moves]
+    assert kinds == [macro.TAKE_ALL, macro.ALL_BUT_TWO]
+    take_all, decline = moves
+    assert macro.make_macro(board.clone(), take_all, PlayerSide.FIRST_PLAYER) == 3
+    assert macro.make_macro(board.clone(), decline, PlayerSide.FIRST_PLAYER) == 1
+    assert take_all.keeps_turn and not decline.keeps_turn
+
+
+def test_every_pair_can_be_declined():
+    rng = random.Random(3)
+    seen = 0
+    for _ in range(400):
+        board = random_position(rng, 5, 5, rng.randint(6, 16), safe_bias=0.8)
+        moves = macro.capture_macros(board)
+        declines = [m for m in moves if m.kind == macro.ALL_BUT_TWO]
+        # each decline hands over a different pair
+        assert len({m.edges[-1] for m in declines}) == len(declines)
+        seen += len(declines) > 1
+    assert seen
+
+
+def test_a_loop_on_offer_falls_back_to_single_lines():
+    board = board_from_lines(*CHAIN_AND_LOOP)
+    # open the loop in its middle
+    loop_line = next(e for e in undrawn_edges(board) if _opens_loop(board, e))
+    board.make_move(board_edge_move(board, loop_line), PlayerSide.FIRST_PLAYER)
+    moves = macro.macro_moves(board)
+    assert sorted(m.edges[0] for m in moves) == undrawn_edges(board)
+    assert {m.kind for m in moves} == {macro.SINGLE, macro.TAKE_LINE}
+    assert all(m.keeps_turn == (board.edge_class[m.edges[0]] == MoveClass.CAPTURE) for m in moves)
+
+
+def board_edge_move(board, edge):
+    return tables.edge_moves(board.rows, board.cols)[edge]
+
+
+def _opens_loop(board, edge):
+    child = board.clone()
+    child.make_move(board_edge_move(board, edge), PlayerSide.FIRST_PLAYER)
+    return macro._loop_on_offer(child)
@@ -0,0 +1,46 @@
+import time
+
+import pytest
+
+from dots_core import parallel
+from dots_core.move import Move
+from dots_core.tests.boards import empty_board
+
+
+def cell_score(board, move, offset, bound=None):
+    return 10 * move.row + move.col + offset
+
+
+def stalling_score(board, move, bound=None):
+    time.sleep(1.0)  # ignores the deadline, like a search stuck in a long node
+    return 0
+
+
+@pytest.fixture
+def fresh_pool():
+    """Terminate the pool afterwards, so stalled tasks do not hold up later tests."""
+    yield
+    if parallel._pool is not None:
+        parallel._pool.terminate()
+        parallel._pool = None
+
+
+MOVES = [Move(0, 0, True), Move(1, 0, True), Move(0, 2, False), Move(1, 1, False), Move(2, 1, True)]
+
+
+@pytest.mark.parametrize("workers", ["1", "2"])
+def test_search_root_scores_every_candidate(monkeypatch, workers):
+    monkeypatch.setenv("DOTS_WORKERS", workers)
+    scores = parallel.search_root(cell_score, empty_board(3, 3), MOVES, (5,), time.time() + 10)
+    assert scores == [cell_score(None, move, 5) for move in MOVES]
+
+
+def test_late_candidates_share_one_grace_period(monkeypatch, fresh_pool):
+    monkeypatch.setenv("DOTS_WORKERS", "2")
+    monkeypatch.setattr(parallel, "_RESULT_GRACE_SECS", 0.2)
+    parallel.get_pool(2)  # forked before the clock starts
+    start = time.time()
+    scores = parallel.search_root(stalling_score, empty_board(3, 3), MOVES, (), start + 0.05)
+    # a grace period per late candidate would take about a second
+    assert time.time() - start < 0.5
+    assert scores == [None] * len(MOVES)
@@ -0,0 +1,57 @@
+import random
+
+from dots_core import tables
+from dots_core.board import MoveClass, PlayerSide
+from dots_core.playout import PlayoutBase
+from dots_core.tests.boards import board_from_lines, random_position
+
+
+def board_playout(board, undrawn, first_edge, seed, limit):
+    """:meth:`PlayoutBase.playout` played on a copy of *board*, picking lines the same way."""
+    board = board.clone()
+    moves = tables.edge_moves(board.rows, board.cols)
+    me = side = PlayerSide.FIRST_PLAYER
+    before = board.get_scores()
+    undrawn = undrawn[:]
+    undrawn.remove(first_edge)
+    rng = random.Random(seed)
+    edge, drawn = first_edge, 0
+    while True:
+        if not board.make_move(moves[edge], side):
+            side = side.opponent()
+        if drawn == limit or not undrawn:
+            break
+        drawn += 1
+        i = int(rng.random() * len(undrawn))
+        edge = undrawn[i]
+        undrawn[i] = undrawn[-1]
+        undrawn.pop()
+    after = board.get_scores()
+    return (after[me] - before[me]) - (after[me.opponent()] - before[me.opponent()])
+
+
+def test_playout_matches_playing_on_the_board():
+    rng = random.Random(7)
+    for _ in range(150):
+        n = rng.randint(3, 7)
+        board = random_position(rng, n, n, rng.randint(1, 2 * n * (n - 1)), safe_bias=rng.random())
+        base = PlayoutBase(board)
+        first = rng.choice(base.undrawn)
+        seed, limit = rng.randrange(1000), rng.randint(0, 60)
+        assert base.playout(first, seed, limit) == board_playout(board, base.undrawn, first, seed, limit)
+
+
+def test_playout_leaves_the_base_unchanged():
+    base = PlayoutBase(random_position(random.Random(8), 5, 5, 25))
+    undrawn, sides = base.undrawn[:], base.box_sides
+    results = base.playouts(undrawn[0], range(20), 100)
+    assert (base.undrawn, base.box_sides) == (undrawn, sides)
+    assert results == [base.playout(undrawn[0], seed, 100) for seed in range(20)]
+
+
+def test_a_capture_scores_for_the_player_drawing_it():
+    # box 0 has three sides, so its last side takes it whatever the seed
+    board = board_from_lines([[1, 1], [1, 0], [0, 0]], [[1, 0, 0], [0, 0, 0]])
+    capture = board.edge_class.find(MoveClass.CAPTURE)
+    base = PlayoutBase(board)
+    assert [base.playout(capture, seed, 0) for seed in range(5)] == [1] * 5
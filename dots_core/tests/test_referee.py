@@ -0,0 +1,45 @@
+import random
+
+from dots_core.board import PlayerSide
+from dots_core.referee import Referee
+from dots_core.tests.boards import empty_board
+
+
+def random_player(seed):
+    rng = random.Random(seed)
+
+    def make_move(controller):
+        move = rng.choice(controller.get_current_board().get_valid_moves())
+        return controller.make_move(move), move
+
+    return make_move
+
+
+def crashing_player(controller):
+    raise ValueError("no move for you")
+
+
+def test_random_players_finish_the_game():
+    result = Referee(random_player(0), random_player(1), empty_board(4, 5)).play()
+    assert result.forfeited is None
+    assert sum(result.scores.values()) == 3 * 4
+    assert sum(result.moves.values()) == 4 * 4 + 3 * 5
+
+
+def test_a_crashing_player_forfeits():
+    result = Referee(random_player(0), crashing_player, empty_board(4, 4)).play()
+    assert result.forfeited is PlayerSide.SECOND_PLAYER
+    assert result.winner is PlayerSide.FIRST_PLAYER
+    assert result.reason == "raised ValueError('no move for you')"
+    assert result.turns == 2
+
+
+def stalling_player(controller):
+    # claims a capture every time without ever moving
+    return True, controller.get_current_board().get_valid_moves()[0]
+
+
+def test_a_player_that_never_ends_its_turn_runs_out_of_time():
+    result = Referee(stalling_player, random_player(0), empty_board(4, 4), time_limit_secs=0.05).play()
+    assert (result.forfeited, result.reason) == (PlayerSide.FIRST_PLAYER, "ran out of time")
+    assert result.think_seconds[PlayerSide.FIRST_PLAYER] < 1
@@ -0,0 +1,62 @@
+import random
+
+import pytest
+
+from dots_core import search
+from dots_core.board import PlayerSide
+from dots_core.tests.boards import board_from_lines, random_position, solve
+
+# a 5-chain and a 4-loop: the loop has to be declined with all but four
+CHAIN_AND_LOOP = ([[0, 1, 1], [1, 1, 0], [0, 0, 0], [1, 1, 1]], [[1, 0, 0, 1], [1, 0, 1, 1], [1, 0, 1, 0]])
+LOOP_ON_4X5 = ([[1, 1, 1, 1], [0, 1, 1, 0], [0, 0, 0, 1], [1, 1, 1, 0]], [[1, 0, 0, 0, 1], [1, 1, 0, 1, 0], [0, 1, 0, 1, 0]])
+
+
+def lines_left(board):
+    return board.num_horizontal_lines_left + board.num_vertical_lines_left
+
+
+@pytest.mark.parametrize("lines", [CHAIN_AND_LOOP, LOOP_ON_4X5])
+def test_search_solves_loop_endgames(lines):
+    board = board_from_lines(*lines)
+    value, move = search.search(board, lines_left(board))
+    assert value == solve(board)
+    assert move_value(board, move) == value
+
+
+def move_value(board, move):
+    """Net score of playing *move* and then the best line."""
+    child = board.clone()
+    before = child.scores[PlayerSide.FIRST_PLAYER]
+    child.make_move(move, PlayerSide.FIRST_PLAYER)
+    taken = child.scores[PlayerSide.FIRST_PLAYER] - before
+    return taken + solve(child) if taken else -solve(child)
+
+
+@pytest.mark.parametrize("seed", range(4))
+def test_full_depth_search_matches_solver(seed):
+    rng = random.Random(seed)
+    for _ in range(15):
+        rows, cols = rng.choice([(4, 4), (4, 5), (5, 4), (3, 5)])
+        board = random_position(rng, rows, cols, rng.randint(6, 12), safe_bias=rng.choice([1.0, 0.8]))
+        before = (board.zobrist, board.box_sides[:], bytes(board.edge_class), board.get_scores())
+        value, move = search.search(board, lines_left(board))
+        assert value == solve(board)
+        assert move_value(board, move) == value
+        assert (board.zobrist, board.box_sides, bytes(board.edge_class), board.get_scores()) == before
+
+
+def test_iterative_deepening_reaches_the_exact_value():
+    rng = random.Random(7)
+    board = random_position(rng, 4, 4, 10)
+    value, move, depth = search.iterative_deepening(board, float("inf"), rotate=3)
+    assert (value, depth) == (solve(board), lines_left(board))
+    assert move is not None and board.is_valid_move(move)
+
+
+def test_transposition_table_keeps_the_deeper_entry():
+    tt = search.TranspositionTable()
+    tt.store(1, 5, 4, search.EXACT, 2)
+    tt.store(1, 9, 2, search.LOWER, 3)
+    assert tt.probe(1) == (5, 4, search.EXACT, 2)
+    tt.store(1, 7, 4, search.UPPER, 1)
+    assert tt.probe(1) == (7, 4, search.UPPER, 1)
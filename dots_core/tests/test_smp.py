@@ -0,0 +1,38 @@
+import random
+import time
+
+import pytest
+
+from dots_core.smp import SharedTT, lazy_smp
+from dots_core.search import EXACT, LOWER
+from dots_core.tests.boards import board_from_lines, random_position, solve
+from dots_core.tests.test_search import CHAIN_AND_LOOP, LOOP_ON_4X5
+
+
+@pytest.mark.parametrize("workers", ["1", "2"])
+def test_lazy_smp_matches_the_exhaustive_value(monkeypatch, workers):
+    monkeypatch.setenv("DOTS_WORKERS", workers)
+    rng = random.Random(int(workers))
+    boards = [board_from_lines(*CHAIN_AND_LOOP), board_from_lines(*LOOP_ON_4X5)]
+    boards += [random_position(rng, *rng.choice([(4, 4), (4, 5)]), rng.randint(6, 11)) for _ in range(6)]
+    for board in boards:
+        value, move, depth = lazy_smp(board, time.time() + 60)
+        assert depth == board.num_horizontal_lines_left + board.num_vertical_lines_left
+        assert value == solve(board)
+        assert move is not None and board.is_valid_move(move)
+
+
+def test_shared_tt_round_trip_and_depth_preference():
+    tt = SharedTT(1 << 4)
+    try:
+        key = (1 << 63) | 5
+        assert tt.probe(key) is None
+        tt.store(key, -7, 300, EXACT, 41)
+        assert tt.probe(key) == (-7, 255, EXACT, 41)
+        tt.store(key, 3, 2, LOWER, 0)
+        assert tt.probe(key) == (-7, 255, EXACT, 41)
+        assert tt.probe(key ^ (1 << 40)) is None  # same slot, other position
+        tt.clear()
+        assert tt.probe(key) is None
+    finally:
+        tt.close()
@@ -0,0 +1,52 @@
+import random
+
+import pytest
+
+from dots_core import tablebase
+from dots_core.packed import write_packed_table
+from dots_core.tests.boards import random_position, solve
+
+MAX_BOXES = 4
+
+
+@pytest.fixture(scope="module")
+def table_path(tmp_path_factory):
+    entries = {}
+    for cells in tablebase.polyominoes(MAX_BOXES):
+        tablebase.solve_shape(cells, entries)
+    path = tmp_path_factory.mktemp("tablebase") / "small.tablebase"
+    write_packed_table(str(path), tablebase.TABLEBASE_MAGIC, {k: v & 0xFFFFFFFF for k, v in entries.items()}, meta=MAX_BOXES)
+    return str(path)
+
+
+@pytest.fixture
+def small_tablebase(monkeypatch, table_path):
+    monkeypatch.setenv("DOTS_TABLEBASE", table_path)
+    monkeypatch.setattr(tablebase, "_tablebase", None)
+    monkeypatch.setattr(tablebase, "_tablebase_loaded", False)
+
+
+def test_polyominoes_counts_free_shapes():
+    assert [len([s for s in tablebase.polyominoes(5) if len(s) == n]) for n in range(1, 6)] == [1, 1, 2, 5, 12]
+
+
+def test_region_value_is_exact_for_a_lone_region(small_tablebase):
+    rng = random.Random(0)
+    checked = 0
+    for _ in range(300):
+        rows, cols = rng.choice([(3, 3), (2, 5), (5, 2), (3, 4), (4, 3)])
+        board = random_position(rng, rows, cols, rng.randint(1, 12), safe_bias=0.8)
+        regions = tablebase.regions(board)
+        if len(regions) != 1 or len(regions[0]) > MAX_BOXES:
+            continue
+        assert tablebase.region_value(board, regions[0]) == solve(board)
+        checked += 1
+    assert checked > 50
+
+
+def test_region_value_without_a_table(monkeypatch, tmp_path):
+    monkeypatch.setenv("DOTS_TABLEBASE", str(tmp_path / "missing.tablebase"))
+    monkeypatch.setattr(tablebase, "_tablebase", None)
+    monkeypatch.setattr(tablebase, "_tablebase_loaded", False)
+    board = random_position(random.Random(1), 3, 3, 6)
+    assert tablebase.region_value(board, tablebase.regions(board)[0]) is None
@@ -1,7 +1,10 @@
 from __future__ import annotations
 
 from collections import deque
-from typing import Deque, TextIO
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:  # pragma: no cover
+    from typing import Deque, TextIO
 
 
 class TokenStream:
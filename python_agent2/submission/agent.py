@@ -1,9 +1,9 @@
 from __future__ import annotations
 import random
 from typing import Tuple
-from ..controller import Controller
-from ..move import Move
-from ..custom_logger import log
+from dots_core.controller import Controller
+from dots_core.move import Move
+from dots_core.custom_logger import log
 
 
 def make_move(controller: Controller) -> Tuple[bool, Move]:
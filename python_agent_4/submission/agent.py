@@ -1,19 +1,23 @@
 from __future__ import annotations
 import random
+import time
 from typing import Tuple
-from ..controller import Controller
-from ..move import Move
-from ..custom_logger import log
+from dots_core.controller import Controller
+from dots_core.macro import SINGLE, MacroMove, capture_macros, make_macro
+from dots_core.move import Move
+from dots_core.custom_logger import log
+from dots_core.parallel import worker_count
+from dots_core.profiling import count_nodes
+from dots_core.search import stand_pat, take_captures
+from dots_core.smp import lazy_smp
+
+# with several cores the endgame search runs on all of them (Lazy SMP)
+SMP_MOVE_SECS = 0.5
 
 
 # -------------------- Utility: count how many sides a box has --------------------
 def count_sides(board, r: int, c: int) -> int:
-    return (
-        board.horizontal_lines[r][c]
-        + board.horizontal_lines[r + 1][c]
-        + board.vertical_lines[r][c]
-        + board.vertical_lines[r][c + 1]
-    )
+    return board.box_sides[r * (board.cols - 1) + c]
 
 
 # -------------------- Chain detection (DFS) --------------------
@@ -68,41 +72,46 @@ def evaluate_board(board, my_side):
 
 # -------------------- Alpha–Beta Minimax --------------------
 def minimax(board, depth, alpha, beta, maximizing, my_side):
+    count_nodes()
     if depth == 0 or board.is_completed():
-        return evaluate_board(board, my_side), None
+        # quiescence: the side to move takes every box on offer before scoring
+        mover = my_side if maximizing else my_side.opponent()
+        take_captures(board, mover)
+        pat = stand_pat(board)
+        return evaluate_board(board, my_side) + (pat if maximizing else -pat), None
 
     best_move = None
-    valid_moves = board.get_valid_moves()
 
-    # Move ordering: capturing moves first
-    capturing = [m for m in valid_moves if board.is_capturing_move(m)]
-    others = [m for m in valid_moves if not board.is_capturing_move(m)]
-    ordered_moves = capturing + others[:40]  # limit branching
+    # A capture run is one move (take it all, or all but two); otherwise limit branching
+    ordered_moves = capture_macros(board)
+    if not ordered_moves:
+        ordered_moves = [MacroMove(SINGLE, (board.edge_id(m),)) for m in board.get_valid_moves()[:40]]
 
     if maximizing:
         value = float("-inf")
         for move in ordered_moves:
             child = board.clone()
-            child.make_move(move, my_side)
-            score, _ = minimax(child, depth - 1, alpha, beta, False, my_side)
+            # taking every box keeps the turn
+            make_macro(child, move, my_side)
+            score, _ = minimax(child, depth - 1, alpha, beta, move.keeps_turn, my_side)
             if score > value:
                 value, best_move = score, move
             alpha = max(alpha, value)
             if alpha >= beta:
                 break
-        return value, best_move
+        return value, best_move.moves(board.rows, board.cols)[0] if best_move else None
     else:
         value = float("inf")
         for move in ordered_moves:
             child = board.clone()
-            child.make_move(move, my_side.opponent())
-            score, _ = minimax(child, depth - 1, alpha, beta, True, my_side)
+            make_macro(child, move, my_side.opponent())
+            score, _ = minimax(child, depth - 1, alpha, beta, not move.keeps_turn, my_side)
             if score < value:
                 value, best_move = score, move
             beta = min(beta, value)
             if alpha >= beta:
                 break
-        return value, best_move
+        return value, best_move.moves(board.rows, board.cols)[0] if best_move else None
 
 
 # -------------------- Main decision logic --------------------
@@ -127,6 +136,15 @@ def make_move(controller: Controller) -> Tuple[bool, Move]:
     log(f"Valid moves remaining: {moves_left}")
 
     # --- Switch to minimax in late game ---
+    if moves_left < 100 and worker_count() > 1:
+        budget = min(SMP_MOVE_SECS, time_ms / 1000.0 / 20) if time_ms and time_ms > 0 else SMP_MOVE_SECS
+        value, move, depth = lazy_smp(board, time.time() + budget)
+        if move is not None:
+            log(f"🧠 Lazy SMP ({worker_count()} workers) reached depth {depth}, value {value}")
+            requires_more = controller.make_move(move)
+            log(f"Lazy SMP chose: {move}, requires_more: {requires_more}")
+            return requires_more, move
+
     if moves_left < 100:
         log("🧠 Using minimax (depth=2) for endgame")
         _, move = minimax(
@@ -145,48 +163,11 @@ def make_move(controller: Controller) -> Tuple[bool, Move]:
 
     # --- Early/midgame: fast greedy logic ---
     chains = find_chains(board)
-    long_chains = [chain for chain in chains if len(chain) > 1]
     log(f"Detected {len(chains)} chain(s): {[len(c) for c in chains]}")
 
-    capturing_moves = []
-    safe_moves = []
-    risky_moves = []
-
-    for move in valid_moves:
-        if board.is_capturing_move(move):
-            capturing_moves.append(move)
-            continue
-
-        test_board = board.clone()
-        test_board.make_move(move, controller.get_my_side())
-
-        three_sided_boxes = 0
-        for r in range(test_board.rows - 1):
-            for c in range(test_board.cols - 1):
-                if count_sides(test_board, r, c) == 3:
-                    three_sided_boxes += 1
-
-        touches_chain = False
-        for chain in long_chains:
-            for (cr, cc) in chain:
-                if (
-                    move.is_horizontal
-                    and (move.row == cr or move.row == cr + 1)
-                    and move.col == cc
-                ) or (
-                    not move.is_horizontal
-                    and (move.col == cc or move.col == cc + 1)
-                    and move.row == cr
-                ):
-                    touches_chain = True
-                    break
-            if touches_chain:
-                break
-
-        if three_sided_boxes == 0 and not touches_chain:
-            safe_moves.append(move)
-        else:
-            risky_moves.append(move)
+    # a safe move leaves no 3-sided box, so it cannot touch a chain either
+    capturing_moves, safe_moves, sacrifices = board.classify_moves()
+    risky_moves = [move for _, move in sacrifices]
 
     if capturing_moves:
         move = random.choice(capturing_moves)
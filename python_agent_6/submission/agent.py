@@ -1,19 +1,14 @@
 from __future__ import annotations
 import random
 from typing import Tuple
-from ..controller import Controller
-from ..move import Move
-from ..custom_logger import log
+from dots_core.controller import Controller
+from dots_core.move import Move
+from dots_core.custom_logger import log
 
 
 # ---------------- Utility: count how many sides a box has ----------------
 def count_sides(board, r: int, c: int) -> int:
-    return (
-        board.horizontal_lines[r][c]
-        + board.horizontal_lines[r + 1][c]
-        + board.vertical_lines[r][c]
-        + board.vertical_lines[r][c + 1]
-    )
+    return board.box_sides[r * (board.cols - 1) + c]
 
 
 # ---------------- Light chain detection ----------------
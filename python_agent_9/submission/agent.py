@@ -1,109 +1,78 @@
 from __future__ import annotations
 import random
 import time
+import weakref
 from typing import Tuple, List, Optional
-from ..controller import Controller
-from ..move import Move
-from ..custom_logger import log
+from dots_core import book
+from dots_core.board import Board
+from dots_core.chains import Chain, find_chains
+from dots_core.controller import Controller
+from dots_core.macro import SINGLE, MacroMove, capture_macros, make_macro
+from dots_core.move import Move
+from dots_core.parallel import search_root
+from dots_core.playout import PlayoutBase
+from dots_core.custom_logger import log
+from dots_core.fields import BoxField
+from dots_core.profiling import count_nodes
+from dots_core.search import stand_pat, take_captures
+from dots_core.tables import box_cells, edge_boxes
+from dots_core.tablebase import region_of, region_value
 
 
 HOTSPOT_RADIUS = 3            
 LOOKAHEAD_DEPTH = 3           
 LOOKAHEAD_CANDIDATES = 8      
-MONTE_TIE_ROLLOUTS = 12       
+MONTE_TIE_ROLLOUTS = 48       # most playouts per candidate
+MONTE_TIE_BATCH = 4           # playouts per candidate between eliminations
+MONTE_TIE_SECS = 0.05         # hard cap on the tie-breaker
+MONTE_RACE_Z = 2.0            # confidence needed to drop a candidate
 MONTE_PLAYOUT_DEPTH = 30      
 ENDGAME_MOVE_THRESHOLD = 60   
 MINIMUM_TIME_FOR_LOOKAHEAD = 0.4  
 
-def count_sides(board, r: int, c: int) -> int:
-    return (
-        board.horizontal_lines[r][c]
-        + board.horizontal_lines[r + 1][c]
-        + board.vertical_lines[r][c]
-        + board.vertical_lines[r][c + 1]
-    )
-
-
-def detect_chains(board) -> List[List[tuple]]:
-    visited = [[False for _ in range(board.cols - 1)] for _ in range(board.rows - 1)]
-    chains = []
-    for r in range(board.rows - 1):
-        for c in range(board.cols - 1):
-            if visited[r][c]:
-                continue
-            s = count_sides(board, r, c)
-            if 2 <= s < 4:
-                stack = [(r, c)]
-                chain = []
-                while stack:
-                    cr, cc = stack.pop()
-                    if not (0 <= cr < board.rows - 1 and 0 <= cc < board.cols - 1):
-                        continue
-                    if visited[cr][cc]:
-                        continue
-                    cs = count_sides(board, cr, cc)
-                    if not (2 <= cs < 4):
-                        continue
-                    visited[cr][cc] = True
-                    chain.append((cr, cc))
-                    for dr, dc in [(-1, 0), (1, 0), (0, -1), (0, 1)]:
-                        stack.append((cr + dr, cc + dc))
-                if chain:
-                    chains.append(chain)
-    return chains
-
-
-def choose_chain_to_open(chains: List[List[tuple]]) -> List[tuple]:
-    return min(chains, key=len)
-
-
-def get_moves_to_open_chain(board, chain: List[tuple]) -> List[Move]:
-    moves = []
-    valid = board.get_valid_moves()
-    for (r, c) in chain:
-        for m in valid:
-            if board.is_capturing_move(m):
-                continue
-            if m.is_horizontal and (m.row == r or m.row == r + 1) and m.col == c:
-                moves.append(m)
-            elif not m.is_horizontal and (m.col == c or m.col == c + 1) and m.row == r:
-                moves.append(m)
-    return moves
-
-
-
-def compute_heatmap(board) -> List[List[int]]:
-    rows = board.rows - 1
-    cols = board.cols - 1
-    heat = [[0 for _ in range(cols)] for _ in range(rows)]
-    for r in range(rows):
-        for c in range(cols):
-            heat[r][c] = count_sides(board, r, c)
-    return heat
-
-
-def local_move_score(board, move: Move, heatmap: Optional[List[List[int]]] = None) -> float:
+# box-side density of every game board, kept up to date by a board listener;
+# one per board, since a module playing both sides sees two boards in turn
+_heatmaps: weakref.WeakKeyDictionary[Board, BoxField] = weakref.WeakKeyDictionary()
+
+def chain_cost(board, chain: Chain) -> float:
+    """Boxes lost by opening *chain*: exact from the tablebase when its region is in it."""
+    value = region_value(board, region_of(board, chain.boxes[0]))
+    return -value if value is not None else len(chain)
+
+
+def choose_chain_to_open(board, chains: List[Chain]) -> Chain:
+    return min(chains, key=lambda ch: (chain_cost(board, ch), len(ch)))
+
+
+
+def compute_heatmap(board) -> BoxField:
+    return BoxField.from_board(board)
+
+
+def game_heatmap(controller: Controller) -> BoxField:
+    """The heatmap of the game board, built once and then updated move by move."""
+    board = controller.get_current_board()
+    heatmap = _heatmaps.get(board)
+    if heatmap is None:
+        heatmap = _heatmaps[board] = compute_heatmap(board)
+        controller.subscribe(lambda move, side, captured: heatmap.line_drawn(board.edge_id(move)))
+    return heatmap
+
+
+def local_move_score(board, move: Move, heatmap: Optional[BoxField] = None) -> float:
 
     if board.is_capturing_move(move):
         return 100.0
 
     score = 0.0
     
-    boxes = []
-    if move.is_horizontal:
-        if move.row > 0:
-            boxes.append((move.row - 1, move.col))
-        if move.row < board.rows - 1:
-            boxes.append((move.row, move.col))
-    else:
-        if move.col > 0:
-            boxes.append((move.row, move.col - 1))
-        if move.col < board.cols - 1:
-            boxes.append((move.row, move.col))
+    box_ids = edge_boxes(board.rows, board.cols)[board.edge_id(move)]
+    cells = box_cells(board.rows, board.cols)
+    boxes = [cells[b] for b in box_ids]
 
     
-    for (r, c) in boxes:
-        s_old = count_sides(board, r, c)
+    for b in box_ids:
+        s_old = board.box_sides[b]
         s_new = s_old + 1
         if s_new == 3:
             score -= 90.0
@@ -118,13 +87,9 @@ def local_move_score(board, move: Move, heatmap: Optional[List[List[int]]] = Non
         total = 0
         cnt = 0
         for (r, c) in boxes:
-            for dr in range(-HOTSPOT_RADIUS, HOTSPOT_RADIUS + 1):
-                for dc in range(-HOTSPOT_RADIUS, HOTSPOT_RADIUS + 1):
-                    rr = r + dr
-                    cc = c + dc
-                    if 0 <= rr < len(heatmap) and 0 <= cc < len(heatmap[0]):
-                        total += heatmap[rr][cc]
-                        cnt += 1
+            window_total, window_cnt = heatmap.window(r, c, HOTSPOT_RADIUS)
+            total += window_total
+            cnt += window_cnt
         if cnt > 0:
             avg = total / cnt
             
@@ -136,20 +101,28 @@ def local_move_score(board, move: Move, heatmap: Optional[List[List[int]]] = Non
 
 
 
-def shallow_minimax_score(board, depth: int, my_side, maximizing: bool, time_deadline: float) -> float:
+def shallow_minimax_score(board, depth: int, my_side, maximizing: bool, time_deadline: float,
+                          alpha: float = float("-inf"), beta: float = float("inf"), bound=None) -> float:
 
+    count_nodes()
     if time.time() > time_deadline:
         raise TimeoutError()
+    # bound.value: best root score so far, shared by all root candidates
+    if bound is not None and bound.value > alpha:
+        alpha = bound.value
 
     if depth == 0 or board.is_completed():
+        # quiescence: the side to move takes every box on offer before scoring
+        mover = my_side if maximizing else my_side.opponent()
+        take_captures(board, mover)
         s = board.get_scores()
-        return s[my_side] - s[my_side.opponent()]
+        pat = stand_pat(board)
+        return s[my_side] - s[my_side.opponent()] + (pat if maximizing else -pat)
 
-    valid = board.get_valid_moves()
-    
-    captures = [m for m in valid if board.is_capturing_move(m)]
-    others = [m for m in valid if not board.is_capturing_move(m)]
-    ordered = captures + others[:min(len(others), 20)]  
+    # a capture run is one move: take it all, or deal the last two boxes away
+    ordered = capture_macros(board)
+    if not ordered:
+        ordered = [MacroMove(SINGLE, (board.edge_id(m),)) for m in board.get_valid_moves()[:20]]
 
     if maximizing:
         best = float("-inf")
@@ -157,11 +130,15 @@ def shallow_minimax_score(board, depth: int, my_side, maximizing: bool, time_dea
             if time.time() > time_deadline:
                 raise TimeoutError()
             child = board.clone()
-            cont = child.make_move(m, my_side)
-            next_max = maximizing if cont else False
-            val = shallow_minimax_score(child, depth - 1, my_side, next_max, time_deadline)
+            make_macro(child, m, my_side)
+            next_max = maximizing if m.keeps_turn else False
+            val = shallow_minimax_score(child, depth - 1, my_side, next_max, time_deadline, alpha, beta, bound)
             if val > best:
                 best = val
+                if best > alpha:
+                    alpha = best
+                    if alpha >= beta:
+                        break
         return best
     else:
         best = float("inf")
@@ -170,45 +147,60 @@ def shallow_minimax_score(board, depth: int, my_side, maximizing: bool, time_dea
             if time.time() > time_deadline:
                 raise TimeoutError()
             child = board.clone()
-            cont = child.make_move(m, opp)
-            next_max = False if cont else True
-            val = shallow_minimax_score(child, depth - 1, my_side, next_max, time_deadline)
+            make_macro(child, m, opp)
+            next_max = False if m.keeps_turn else True
+            val = shallow_minimax_score(child, depth - 1, my_side, next_max, time_deadline, alpha, beta, bound)
             if val < best:
                 best = val
+                if best < beta:
+                    beta = best
+                    if alpha >= beta:
+                        break
         return best
 
 
 
-def monte_tie_breaker(board, my_side, candidates: List[Move], rollouts: int, depth: int) -> Move:
-    best = None
-    best_score = float("-inf")
-    for m in candidates:
-        total = 0.0
-        for _ in range(rollouts):
-            clone = board.clone()
-            clone.make_move(m, my_side)
-            total += _simulate_random_playout_score(clone, my_side, limit=depth)
-        avg = total / max(1, rollouts)
-        if avg > best_score:
-            best_score = avg
-            best = m
-    return best if best is not None else random.choice(candidates)
-
-
-def _simulate_random_playout_score(board, my_side, limit: int) -> float:
-    side = my_side
-    for _ in range(limit):
-        if board.is_completed():
-            break
-        vm = board.get_valid_moves()
-        if not vm:
-            break
-        mv = random.choice(vm)
-        cont = board.make_move(mv, side)
-        if not cont:
-            side = side.opponent()
-    s = board.get_scores()
-    return s[my_side] - s[my_side.opponent()]
+def score_candidate(board, move: Move, my_side, depth: int, time_deadline: float, bound=None) -> float:
+    clone = board.clone()
+    clone.make_move(move, my_side)
+    return shallow_minimax_score(clone, depth, my_side, False, time_deadline, bound=bound)
+
+
+
+def monte_tie_breaker(board, candidates: List[Move], rollouts: int, depth: int,
+                      time_deadline: float) -> Move:
+    """Race the candidates on random playouts until one is clearly ahead.
+
+    Every candidate is played out from the same seeds, and a candidate is
+    dropped once its paired difference to the leader is below zero with
+    MONTE_RACE_Z confidence. Stops at *rollouts* playouts per candidate or
+    at *time_deadline*, and then picks the best average.
+    """
+    base = PlayoutBase(board)
+    edges = {m: board.edge_id(m) for m in candidates}
+    results = {m: [] for m in candidates}
+    alive = list(candidates)
+    seed = random.getrandbits(32)
+    played = 0
+    while len(alive) > 1 and played < rollouts and time.time() < time_deadline:
+        seeds = range(seed + played, seed + played + MONTE_TIE_BATCH)
+        for m in alive:
+            results[m].extend(base.playouts(edges[m], seeds, depth))
+        played += MONTE_TIE_BATCH
+        leader = max(alive, key=lambda m: sum(results[m]))
+        alive = [m for m in alive if m is leader or not _behind(results[m], results[leader])]
+    if not played:
+        return candidates[0]
+    return max(alive, key=lambda m: sum(results[m]))
+
+
+def _behind(results: List[int], leader: List[int]) -> bool:
+    """Whether *results* trail *leader* significantly, playout by playout."""
+    n = len(results)
+    diffs = [a - b for a, b in zip(results, leader)]
+    mean = sum(diffs) / n
+    variance = sum((d - mean) ** 2 for d in diffs) / max(1, n - 1)
+    return mean + MONTE_RACE_Z * (variance / n) ** 0.5 < 0
 
 
 
@@ -220,6 +212,12 @@ def make_move(controller: Controller) -> Tuple[bool, Move]:
     if not valid_moves:
         return False, Move(0, 0, True)
 
+    book_move = book.lookup(board)
+    if book_move is not None:
+        req = controller.make_move(book_move)
+        log(f"[book] Chosen: {book_move}")
+        return req, book_move
+
     
     engine_time_ms = -1
     try:
@@ -233,7 +231,7 @@ def make_move(controller: Controller) -> Tuple[bool, Move]:
         remaining_time = 2.0
 
     
-    capturing = [m for m in valid_moves if board.is_capturing_move(m)]
+    capturing, _, sacrifices = board.classify_moves()
     if capturing:
         move = random.choice(capturing)
         req = controller.make_move(move)
@@ -241,62 +239,22 @@ def make_move(controller: Controller) -> Tuple[bool, Move]:
         return req, move
 
     
-    heatmap = compute_heatmap(board)
-    chains = detect_chains(board)
-    long_chains = [ch for ch in chains if len(ch) > 2]
+    heatmap = game_heatmap(controller)
+    # handing over more than two boxes is risky, anything else counts as safe
+    risky_moves = {m for k, m in sacrifices if k > 2}
 
     
-    scored_moves = []
-    safe_moves = []
-    risky_moves = []
-    three_sided = {(r, c) for r in range(board.rows - 1) for c in range(board.cols - 1) if count_sides(board, r, c) == 3}
-
-    for m in valid_moves:
-        
-        def touches_three(mv: Move) -> bool:
-            if mv.is_horizontal:
-                if mv.row > 0 and (mv.row - 1, mv.col) in three_sided:
-                    return True
-                if mv.row < board.rows - 1 and (mv.row, mv.col) in three_sided:
-                    return True
-            else:
-                if mv.col > 0 and (mv.row, mv.col - 1) in three_sided:
-                    return True
-                if mv.col < board.cols - 1 and (mv.row, mv.col) in three_sided:
-                    return True
-            return False
-
-        def touches_long_chain(mv: Move) -> bool:
-            for chain in long_chains:
-                for (cr, cc) in chain:
-                    if (
-                        mv.is_horizontal
-                        and (mv.row == cr or mv.row == cr + 1)
-                        and mv.col == cc
-                    ) or (
-                        not mv.is_horizontal
-                        and (mv.col == cc or mv.col == cc + 1)
-                        and mv.row == cr
-                    ):
-                        return True
-            return False
-
-        sc = local_move_score(board, m, heatmap)
-        scored_moves.append((sc, m))
-        if touches_three(m):
-            risky_moves.append(m)
-        elif touches_long_chain(m):
-            
-            risky_moves.append(m)
-        else:
-            safe_moves.append(m)
+    scored_moves = [(local_move_score(board, m, heatmap), m) for m in valid_moves]
 
     
-    if safe_moves:
-        scored_moves = [(s, m) for (s, m) in scored_moves if m in safe_moves]
+    if len(risky_moves) < len(valid_moves):
+        scored_moves = [(s, m) for (s, m) in scored_moves if m not in risky_moves]
     else:
-        
-        pass
+        chains = find_chains(board)
+        if chains:
+            # every move gives boxes away: open the chain that costs least
+            openers = set(choose_chain_to_open(board, chains).opening_moves())
+            scored_moves = [(s, m) for (s, m) in scored_moves if m in openers]
 
     
     scored_moves.sort(key=lambda x: x[0], reverse=True)
@@ -316,26 +274,12 @@ def make_move(controller: Controller) -> Tuple[bool, Move]:
 
     if can_do_lookahead and candidates:
         
+        # all candidates are searched at once, sharing the best score as a bound
+        scores = search_root(score_candidate, board, candidates, (my_side, LOOKAHEAD_DEPTH - 1, time_deadline), time_deadline)
         best_move = None
         best_score = float("-inf")
-        per_candidate_deadline = time_deadline
-        for c in candidates:
-            
-            if time.time() > time_deadline:
-                break
-            
-            try:
-                score = shallow_minimax_score(board.clone(), LOOKAHEAD_DEPTH, my_side, True, time_deadline)
-            except TimeoutError:
-                break
-
-            try:
-                clone = board.clone()
-                clone.make_move(c, my_side)
-                score = shallow_minimax_score(clone, LOOKAHEAD_DEPTH - 1, my_side, False, time_deadline)
-            except TimeoutError:
-                continue
-            if score > best_score:
+        for c, score in zip(candidates, scores):
+            if score is not None and score > best_score:
                 best_score = score
                 best_move = c
 
@@ -350,7 +294,9 @@ def make_move(controller: Controller) -> Tuple[bool, Move]:
         top_candidates = [m for (s, m) in scored_moves if abs(s - top_score) < 1e-6][:4]
         if len(top_candidates) > 1:
             
-            tie_choice = monte_tie_breaker(board, my_side, top_candidates, MONTE_TIE_ROLLOUTS, MONTE_PLAYOUT_DEPTH)
+            tie_deadline = time.time() + min(remaining_time * 0.05, MONTE_TIE_SECS)
+            tie_choice = monte_tie_breaker(board, top_candidates, MONTE_TIE_ROLLOUTS, MONTE_PLAYOUT_DEPTH,
+                                           tie_deadline)
             req = controller.make_move(tie_choice)
             log(f"[mc tiebreak] Chosen: {tie_choice}")
             return req, tie_choice
@@ -358,8 +304,6 @@ def make_move(controller: Controller) -> Tuple[bool, Move]:
     
     if candidates:
         chosen = candidates[0]
-    elif safe_moves:
-        chosen = safe_moves[0]
     else:
         chosen = random.choice(valid_moves)
 
@@ -0,0 +1,40 @@
+import gc
+import random
+
+from dots_core.board import PlayerSide
+from dots_core.controller import Controller
+from dots_core.fields import BoxField
+from dots_core.tests.boards import empty_board
+from python_agent_9.submission import agent
+
+
+def test_game_heatmap_keeps_one_field_per_board():
+    # one module playing both sides, as in self-play through the referee
+    board = empty_board(6, 6)
+    controllers = {side: Controller(board.clone(), side, use_protocol=False) for side in PlayerSide}
+    rng = random.Random(0)
+    side = PlayerSide.FIRST_PLAYER
+    while not board.is_completed():
+        controller = controllers[side]
+        heatmap = agent.game_heatmap(controller)
+        assert agent.game_heatmap(controller) is heatmap
+        assert heatmap._sums == BoxField.from_board(controller.get_current_board())._sums
+        move = rng.choice(board.get_valid_moves())
+        continues = board.make_move(move, side)
+        controller.make_move(move)
+        if not continues:
+            controllers[side.opponent()].receive_opponent_moves(controller.take_sent_moves())
+            side = side.opponent()
+    for controller in controllers.values():
+        assert len(controller.get_current_board()._listeners) == 1
+
+
+def test_game_heatmap_forgets_finished_boards():
+    gc.collect()
+    count = len(agent._heatmaps)
+    controller = Controller(empty_board(4, 4), PlayerSide.FIRST_PLAYER, use_protocol=False)
+    agent.game_heatmap(controller)
+    grown = len(agent._heatmaps)
+    del controller
+    gc.collect()
+    assert (grown, len(agent._heatmaps)) == (count + 1, count)
@@ -1,23 +1,90 @@
 from __future__ import annotations
 import time, random, math
 from typing import Optional, List
-from ..controller import Controller
-from ..move import Move
-from ..board import Board, PlayerSide
-from ..custom_logger import log
+from dots_core.controller import Controller
+from dots_core.move import Move
+from dots_core.board import Board, MoveClass, PlayerSide
+from dots_core.custom_logger import log
+from dots_core.macro import SINGLE, MacroMove, macro_moves, make_macro
+from dots_core.profiling import count_nodes
+from dots_core.search import search
+from dots_core.tables import edge_boxes
 
 
 TOTAL_GAME_TIME = 60.0  # total seconds for full match
+# positions with this few lines left are solved, not sampled. search() to the
+# end of the game is exact at any size (dots_core/tests/test_search.py), so
+# this only bounds the time a solve may take.
+SOLVE_LINES = 8
+# progressive widening: a node visited n times has at most 1 + PW_C * n**PW_ALPHA children
+PW_C = 1.0
+PW_ALPHA = 0.5
+# rewards are in [-1, 1]: mostly win/draw/loss, MARGIN_WEIGHT of it the score margin
+MARGIN_WEIGHT = 0.2
+# UCT exploration constant for every board size: a 10-game benchmarks.mcts_tuning
+# sweep at 200 rollouts on 3x3 and 5x5 did not separate the constants beyond
+# the noise, so there is nothing to tune per size yet
+EXPLORATION = 1.4
+MCTS_MAX_ITERS: Optional[int] = None  # fixed rollouts per move instead of the clock (tuning)
 MCTS_START_TIME: Optional[float] = None
 MCTS_ROOT: Optional["MCTSNode"] = None
+MCTS_PENDING: List[Move] = []  # rest of the chosen capture run, played on the next calls
+
+
+# ---------------- Exact results ----------------
+def exact_result(board: Board, side: PlayerSide) -> Optional[float]:
+    """Final score difference for *side* (to move) if the game is over or small enough to solve.
+
+    Solved values mark nodes as proven, so they must be exact: the search
+    goes as many plies deep as there are lines left, so it always reaches
+    the end of the game.
+    """
+    scores = board.get_scores()
+    diff = scores[side] - scores[side.opponent()]
+    if board.is_completed():
+        return float(diff)
+    lines_left = board.num_horizontal_lines_left + board.num_vertical_lines_left
+    if lines_left <= SOLVE_LINES:
+        value, _ = search(board, lines_left)
+        return float(diff + value)
+    return None
+
+
+# ---------------- Rewards ----------------
+def reward(diff: float, total_boxes: int) -> float:
+    """Reward in [-1, 1] of a final score difference: the result plus a little margin."""
+    result = (diff > 0) - (diff < 0)
+    return (1.0 - MARGIN_WEIGHT) * result + MARGIN_WEIGHT * diff / max(1, total_boxes)
+
+
+# ---------------- Move prior ----------------
+def move_prior(board: Board, macro: MacroMove, sizes: List[int]) -> float:
+    """Cheap guess of how good *macro* is: what it takes, gives away and does locally."""
+    if macro.kind != SINGLE:
+        return 100.0  # capture runs
+    edge = macro.edges[0]
+    boxes = edge_boxes(board.rows, board.cols)[edge]
+    sides = board.box_sides
+    if board.edge_class[edge] == MoveClass.SACRIFICE:
+        return -10.0 * max(sizes[b] for b in boxes if sides[b] == 2)  # boxes handed over
+    score = 0.0
+    for b in boxes:
+        if sides[b] == 1:
+            score += 8.0
+        elif sides[b] == 0:
+            score += 1.0
+    return score + random.random() * 0.001
 
 
 # ---------------- Node Definition ----------------
+# Tree edges are macro moves: a whole capture run is one node. A node's value
+# and proven result are seen from the player who made its move (the parent's
+# side to move); ``side`` is the player to move at the node.
 class MCTSNode:
     def __init__(
         self,
         board: Board,
-        move: Optional[Move] = None,
+        move: Optional[MacroMove] = None,
         side: Optional[PlayerSide] = None,
         parent: Optional["MCTSNode"] = None,
     ):
@@ -26,15 +93,40 @@ class MCTSNode:
         self.side = side
         self.parent = parent
         self.children: List[MCTSNode] = []
-        self.untried_moves: List[Move] = board.get_valid_moves()
+        self.untried_moves: List[MacroMove] = macro_moves(board)
+        self._untried_sorted = False
         self.visits = 0
         self.value = 0.0
+        # exact final score difference once the subtree is solved
+        self.proven: Optional[float] = None
+        if parent is not None:
+            result = exact_result(board, side)
+            if result is not None:
+                self.proven = result if side == parent.side else -result
+                self.untried_moves = []
 
-    def uct_child(self, c: float = 1.4) -> Optional["MCTSNode"]:
-        if not self.children:
-            return None
+    def can_expand(self) -> bool:
+        """Progressive widening: whether the node may get another child now."""
+        if not self.untried_moves:
+            return False
+        if len(self.children) < 1 + PW_C * self.visits ** PW_ALPHA:
+            return True
+        return all(ch.proven is not None for ch in self.children)
+
+    def next_untried(self) -> MacroMove:
+        """The untried move with the best prior; the list is sorted on first use."""
+        if not self._untried_sorted:
+            sizes = self.board.sacrifice_sizes()
+            self.untried_moves.sort(key=lambda m: move_prior(self.board, m, sizes))
+            self._untried_sorted = True
+        return self.untried_moves.pop()
+
+    def uct_child(self, c: float = EXPLORATION) -> Optional["MCTSNode"]:
+        """The unsolved child to descend into; solved subtrees get no more rollouts."""
         best_score, best = -1e9, None
         for ch in self.children:
+            if ch.proven is not None:
+                continue
             if ch.visits == 0:
                 return ch
             exploit = ch.value / ch.visits
@@ -47,16 +139,38 @@ class MCTSNode:
     def best_child(self) -> Optional["MCTSNode"]:
         if not self.children:
             return None
-        return max(self.children, key=lambda ch: ch.visits)
+        proven = [ch for ch in self.children if ch.proven is not None]
+        open_children = [ch for ch in self.children if ch.proven is None]
+        best_proven = max(proven, key=lambda ch: ch.proven) if proven else None
+        if not open_children:
+            return best_proven
+        best = max(open_children, key=lambda ch: ch.visits)
+        # a solved move beats the most visited one if it is worth more than that one's average
+        total_boxes = (self.board.rows - 1) * (self.board.cols - 1)
+        if best_proven is not None and reward(best_proven.proven, total_boxes) >= best.value / max(1, best.visits):
+            return best_proven
+        return best
 
     def update(self, result: float):
         self.visits += 1
         self.value += result
 
+    def try_prove(self) -> bool:
+        """Solve the node from its children once every move is expanded and solved."""
+        if self.proven is not None:
+            return True
+        if self.untried_moves or not self.children:
+            return False
+        if any(ch.proven is None for ch in self.children):
+            return False
+        best = max(ch.proven for ch in self.children)  # seen from self.side
+        self.proven = best if self.parent is None or self.parent.side == self.side else -best
+        return True
+
 
 # ---------------- Rollout ----------------
 def simulate_random_game(board: Board, side: PlayerSide) -> float:
-    """Play random moves until completion and return +1 / -1 score."""
+    """Play random moves until completion and return the final score difference for *side*."""
     b = board.clone()
     s = side
     while not b.is_completed():
@@ -72,59 +186,78 @@ def simulate_random_game(board: Board, side: PlayerSide) -> float:
 
 
 # ---------------- MCTS Core ----------------
-def mcts_search(root: MCTSNode, my_side: PlayerSide, sec_budget: float) -> Optional[Move]:
-    end_time = time.time() + sec_budget
+def mcts_search(
+    root: MCTSNode, my_side: PlayerSide, sec_budget: float, max_iters: Optional[int] = None
+) -> Optional[MacroMove]:
+    """The move to play after *sec_budget* seconds, or *max_iters* rollouts if given."""
+    start = time.time()
+    end_time = start + sec_budget
+    c = EXPLORATION
+    total_boxes = (root.board.rows - 1) * (root.board.cols - 1)
     iters = 0
-    while time.time() < end_time:
+    while root.proven is None and (iters < max_iters if max_iters is not None else time.time() < end_time):
         node = root
         board = root.board.clone()
-        side = my_side
 
         # --- Selection ---
-        while not node.untried_moves and node.children:
-            node = node.uct_child()
-            if node is None:
+        while node.children and not node.can_expand():
+            child = node.uct_child(c)
+            if child is None:
                 break
-            if node.move:
-                cont = board.make_move(node.move, side)
-                if not cont:
-                    side = side.opponent()
+            make_macro(board, child.move, node.side)
+            node = child
 
         # --- Expansion ---
-        if node and node.untried_moves:
-            m = random.choice(node.untried_moves)
-            cont = board.make_move(m, side)
-            next_side = side if cont else side.opponent()
+        if node.can_expand():
+            m = node.next_untried()
+            make_macro(board, m, node.side)
+            next_side = node.side if m.keeps_turn else node.side.opponent()
             child = MCTSNode(board.clone(), move=m, side=next_side, parent=node)
             node.children.append(child)
-            node.untried_moves.remove(m)
             node = child
-            side = next_side
 
-        # --- Simulation ---
-        result = simulate_random_game(board, side)
+        # --- Simulation (a solved node needs none) ---
+        if node.proven is not None:
+            diff = node.proven if node.parent.side == my_side else -node.proven
+        else:
+            diff = simulate_random_game(board, node.side)
+            if node.side != my_side:
+                diff = -diff
+        result = reward(diff, total_boxes)
 
-        # --- Backpropagation ---
+        # --- Backpropagation: results for my_side, proofs minimax-style ---
+        proving = True
         while node:
-            if node.side == my_side:
-                node.update(result)
+            if node.parent is not None:
+                node.update(result if node.parent.side == my_side else -result)
             else:
-                node.update(-result)
+                node.update(result)
+            proving = proving and node.try_prove()
             node = node.parent
 
         iters += 1
 
-    log(f"[MCTS] {iters} rollouts in {sec_budget:.2f}s")
+    count_nodes(iters)
+    solved = f", solved {root.proven:+.0f}" if root.proven is not None else ""
+    log(f"[MCTS] {iters} rollouts in {time.time() - start:.2f}s{solved}")
     best = root.best_child()
     return best.move if best else None
 
 
 # ---------------- Main Interface ----------------
 def make_move(controller: Controller):
-    global MCTS_ROOT, MCTS_START_TIME
+    global MCTS_ROOT, MCTS_START_TIME, MCTS_PENDING
     board = controller.get_current_board()
     my_side = controller.get_my_side()
 
+    if MCTS_PENDING:
+        move = MCTS_PENDING.pop(0)
+        if board.is_valid_move(move):
+            requires_more = controller.make_move(move)
+            log(f"[MCTS] Move: {move} (capture run), more? {requires_more}")
+            return requires_more, move
+        MCTS_PENDING = []
+
     if MCTS_START_TIME is None:
         MCTS_START_TIME = time.time()
     elapsed = time.time() - MCTS_START_TIME
@@ -141,15 +274,21 @@ def make_move(controller: Controller):
     else:
         matched = None
         for ch in MCTS_ROOT.children:
-            if (ch.board.horizontal_lines == board.horizontal_lines and
+            if (ch.side == my_side and
+                ch.board.horizontal_lines == board.horizontal_lines and
                 ch.board.vertical_lines == board.vertical_lines):
                 matched = ch
                 break
-        MCTS_ROOT = matched or MCTSNode(board.clone(), None, my_side)
+        if matched is None or (matched.proven is not None and not matched.children):
+            matched = MCTSNode(board.clone(), None, my_side)  # solved on sight: search it as a root
+        MCTS_ROOT = matched
+        MCTS_ROOT.parent = None
 
-    move = mcts_search(MCTS_ROOT, my_side, per_move_time)
-    if move is None:
+    macro = mcts_search(MCTS_ROOT, my_side, per_move_time, MCTS_MAX_ITERS)
+    if macro is None:
         move = random.choice(valid_moves)
+    else:
+        move, *MCTS_PENDING = macro.moves(board.rows, board.cols)
 
     requires_more = controller.make_move(move)
     log(f"[MCTS] Move: {move}, more? {requires_more}")
@@ -157,6 +296,3 @@ def make_move(controller: Controller):
 
 
 __all__ = ["make_move"]
-
-
-
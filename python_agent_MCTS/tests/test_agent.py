@@ -0,0 +1,39 @@
+import random
+
+import pytest
+
+from dots_core.board import PlayerSide
+from dots_core.tests.boards import random_position, solve
+from python_agent_MCTS.submission import agent
+
+
+def score_diff(board, side):
+    scores = board.get_scores()
+    return scores[side] - scores[side.opponent()]
+
+
+@pytest.mark.parametrize("solve_lines", [agent.SOLVE_LINES, 12])
+def test_exact_result_is_the_solved_value(monkeypatch, solve_lines):
+    monkeypatch.setattr(agent, "SOLVE_LINES", solve_lines)
+    rng = random.Random(solve_lines)
+    for _ in range(25):
+        rows, cols = rng.choice([(4, 4), (4, 5), (5, 4)])
+        board = random_position(rng, rows, cols, rng.randint(1, solve_lines), safe_bias=rng.choice([1.0, 0.8]))
+        side = rng.choice(list(PlayerSide))
+        assert agent.exact_result(board, side) == score_diff(board, side) + solve(board)
+
+
+def test_exact_result_leaves_larger_positions_to_sampling():
+    board = random_position(random.Random(0), 5, 5, agent.SOLVE_LINES + 1)
+    assert agent.exact_result(board, PlayerSide.FIRST_PLAYER) is None
+
+
+def test_a_proven_root_plays_a_best_move():
+    rng = random.Random(3)
+    for _ in range(5):
+        board = random_position(rng, 4, 4, 11)
+        root = agent.MCTSNode(board.clone(), None, PlayerSide.FIRST_PLAYER)
+        macro = agent.mcts_search(root, PlayerSide.FIRST_PLAYER, 30.0)
+        assert root.proven == score_diff(board, PlayerSide.FIRST_PLAYER) + solve(board)
+        child = next(ch for ch in root.children if ch.move is macro)
+        assert child.proven == root.proven
@@ -0,0 +1,146 @@
+import asyncio
+from collections import deque
+
+import pytest
+
+import ui
+
+
+def test_profile_dumps_leave_the_source_hash_alone(tmp_path):
+    (tmp_path / "agent.py").write_text("print('hi')\n")
+    before = ui.hash_agent_sources(str(tmp_path))
+    (tmp_path / "profiles").mkdir()
+    (tmp_path / "profiles" / "game.json").write_text("{}")
+    assert ui.hash_agent_sources(str(tmp_path)) == before
+    (tmp_path / "agent.py").write_text("print('bye')\n")
+    assert ui.hash_agent_sources(str(tmp_path)) != before
+
+
+class FakeStdout:
+    def __init__(self, lines):
+        self.lines = [(line + "\n").encode() for line in lines]
+
+    async def readline(self):
+        return self.lines.pop(0) if self.lines else b""
+
+
+class FakeStdin:
+    def __init__(self):
+        self.sent = b""
+
+    def write(self, data):
+        self.sent += data
+
+    async def drain(self):
+        pass
+
+
+class FakeAgent:
+    """The stdio pipes of an agent process, with its lines scripted."""
+
+    def __init__(self, lines):
+        self.stdout = FakeStdout(lines)
+        self.stdin = FakeStdin()
+
+
+@pytest.fixture
+def game(monkeypatch):
+    """Player 1 of a 3x3 game, 12.5 seconds into its clock."""
+    board = ui.Board(rows=3, cols=3, horizontalLines=[[0, 0] for _ in range(3)],
+                     verticalLines=[[0, 0, 0] for _ in range(2)], gridOwner=[[0, 0] for _ in range(2)])
+    monkeypatch.setattr(ui, "current_board", board)
+    monkeypatch.setattr(ui, "time_taken", [12.5, 0])
+    monkeypatch.setattr(ui, "bot_moves", [deque(), deque()])
+    monkeypatch.setattr(ui, "is_bot_initialized", [True, True])
+    monkeypatch.setattr(ui, "bot1", "agent")
+    monkeypatch.setattr(ui, "game_timeline", [])
+    monkeypatch.setattr(ui, "agent_metrics", {})
+    return board
+
+
+@pytest.mark.parametrize("request_line, clock_line", [("!REQ_MOVES_TIMED", ["47500"]), ("!REQ_MOVES", [])])
+def test_reply_to_a_moves_request(game, request_line, clock_line):
+    agent = FakeAgent([request_line, "!SENDING_MOVES", "1", "0 1 1"])
+    move = asyncio.run(ui.update_bot_and_get_move(agent, 1, [[2, 0, 1]]))
+    # the clock left, in whole milliseconds, before the opponent's moves
+    assert agent.stdin.sent.decode().split("\n") == clock_line + ["1", "2 0 1", ""]
+    assert (move["row"], move["col"], move["isHorizontal"]) == (0, 1, 1)
+    assert game.horizontalLines == [[0, 1], [0, 0], [0, 0]]
+    assert ui.game_timeline[-1]["timeRequests"] == 0
+
+
+def test_finished_builds_are_not_reused(monkeypatch):
+    builds = []
+    on_disk = set()
+
+    async def build(dir, source_hash, previous_build=None):
+        builds.append(source_hash)
+        await asyncio.sleep(0)
+        if len(builds) == 1:
+            raise OSError("cmake: command not found")
+        on_disk.add(source_hash)
+        return [dir + "/build/agent"]
+
+    monkeypatch.setattr(ui, "build_cpp_agent", build)
+    monkeypatch.setattr(ui, "is_build_current", lambda dir, source_hash: source_hash in on_disk)
+    monkeypatch.setattr(ui, "build_tasks", {})
+    monkeypatch.setattr(ui, "build_status", {})
+
+    async def scenario():
+        with pytest.raises(OSError):
+            await ui.ensure_cpp_agent_built("cpp_agent", "h1")
+        # the toolchain got fixed: the same sources build again
+        path = await ui.ensure_cpp_agent_built("cpp_agent", "h1")
+        assert await ui.ensure_cpp_agent_built("cpp_agent", "h1") == path
+        assert builds == ["h1", "h1"]
+        on_disk.clear()  # the executable was deleted
+        await ui.ensure_cpp_agent_built("cpp_agent", "h1")
+        assert builds == ["h1", "h1", "h1"]
+        assert ui.build_tasks == {}
+
+    asyncio.run(scenario())
+
+
+def test_concurrent_callers_share_a_build(monkeypatch):
+    builds = []
+
+    async def build(dir, source_hash, previous_build=None):
+        builds.append(source_hash)
+        await asyncio.sleep(0.01)
+        return [dir + "/build/agent"]
+
+    monkeypatch.setattr(ui, "build_cpp_agent", build)
+    monkeypatch.setattr(ui, "is_build_current", lambda dir, source_hash: False)
+    monkeypatch.setattr(ui, "build_tasks", {})
+
+    async def scenario():
+        return await asyncio.gather(*(ui.ensure_cpp_agent_built("cpp_agent", "h1") for _ in range(3)))
+
+    assert len(set(map(tuple, asyncio.run(scenario())))) == 1
+    assert builds == ["h1"]
+
+
+def test_only_agents_that_played_are_kept_warm(monkeypatch):
+    spawned = []
+
+    class WarmProcess:
+        returncode = None
+
+    async def spawn(bot, source_hash):
+        spawned.append(bot)
+        return WarmProcess()
+
+    monkeypatch.setattr(ui, "spawn_agent", spawn)
+    monkeypatch.setattr(ui, "get_agent_source_hash", lambda bot: "h1")
+    monkeypatch.setattr(ui, "agent_pool", {})
+    monkeypatch.setattr(ui, "python_agents", ["python_agent", "python_agent_9", "python_agent_MCTS"])
+    monkeypatch.setattr(ui, "cpp_agents", ["cpp_agent"])
+
+    async def scenario():
+        await ui.refill_agent_pools()
+        assert spawned == []
+        await ui.acquire_agent("python_agent_9")
+        await ui.refill_agent_pools()
+
+    asyncio.run(scenario())
+    assert spawned == ["python_agent_9"] * (1 + ui.AGENT_POOL_SIZE)
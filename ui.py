@@ -1,3 +1,4 @@
+import hashlib
 import os
 import signal
 import sys
@@ -7,7 +8,7 @@ from typing import List
 from collections import deque
 
 from fastapi import FastAPI
-from fastapi.responses import FileResponse
+from fastapi.responses import FileResponse, PlainTextResponse
 from fastapi.staticfiles import StaticFiles
 import uvicorn
 from pydantic import BaseModel
@@ -18,6 +19,10 @@ import asyncio
 STEP 0: Define globals and schemas
 '''
 TIME_LIMIT_SECS = 60
+AGENT_POOL_SIZE = 2  # warm processes kept per agent (both players may use the same bot)
+IGNORED_SOURCE_DIRS = {"build", "__pycache__", "profiles"}  # outputs, not sources: build products and DOTS_PROFILE dumps
+PYTHON_HARNESS = "dots_core"
+THINK_TIME_BUCKETS_SECS = [0.001, 0.01, 0.1, 0.5, 1, 5, 10, 30, 60]
 
 class Board(BaseModel):
     rows: int
@@ -64,6 +69,13 @@ bot1 = None
 bot2 = None
 bot_moves = [None, None]
 current_board: Board = None
+agent_pool = {}  # bot name -> deque of (source hash, warm process)
+refilling_pools = set()
+build_tasks = {}  # bot name -> (source hash, build task)
+build_status = {}  # bot name -> state of its latest build
+game_id = 0
+game_timeline = []  # one record per bot turn of the current game
+agent_metrics = {}  # bot name -> counters exported on /metrics
 
 
 
@@ -80,9 +92,9 @@ def is_cpp_agent(dir):
 
 def is_python_agent(dir):
     '''
-    If a folder has agent.py then consider it as a python_agent
+    If a folder has submission/agent.py (and is not a cpp_agent) then consider it as a python_agent
     '''
-    return os.path.isfile(os.path.join(dir, "agent.py"))
+    return os.path.isfile(os.path.join(dir, "submission", "agent.py")) and not is_cpp_agent(dir)
 
 
 def get_all_agents(dir):
@@ -105,25 +117,148 @@ def get_all_agents(dir):
 '''
 STEP 2: Build the cpp agents
 '''
+def get_agent_dir(bot):
+    return os.path.join(os.getcwd(), bot)
 
-def build_cpp_agent(dir):
+
+def hash_agent_sources(dir):
+    '''
+    Content hash of all the source files of an agent (build outputs and profile dumps are ignored).
+    Used to skip needless rebuilds and to retire warm processes running stale code.
+    '''
+    digest = hashlib.sha256()
+    for root, dirs, files in os.walk(dir):
+        dirs[:] = sorted(d for d in dirs if d not in IGNORED_SOURCE_DIRS and not d.startswith('.'))
+        for name in sorted(files):
+            if name.endswith('.pyc'):
+                continue
+            path = os.path.join(root, name)
+            digest.update(os.path.relpath(path, dir).encode())
+            with open(path, 'rb') as f:
+                digest.update(f.read())
+    return digest.hexdigest()
+
+
+def is_build_current(dir, source_hash):
+    executable = os.path.join(dir, "build", "agent")
+    hash_file = os.path.join(dir, "build", ".source_hash")
+    if not (os.path.isfile(executable) and os.path.isfile(hash_file)):
+        return False
+    with open(hash_file) as f:
+        return f.read().strip() == source_hash
+
+
+async def run_build_step(cmd, cwd):
+    proc = await asyncio.create_subprocess_exec(
+        *cmd,
+        cwd=cwd,
+        stdout=asyncio.subprocess.PIPE,
+        stderr=asyncio.subprocess.STDOUT,
+    )
+    output, _ = await proc.communicate()
+    if proc.returncode != 0:
+        raise sps.CalledProcessError(proc.returncode, cmd, output.decode(errors='replace'))
+
+
+async def build_cpp_agent(dir, source_hash, previous_build=None):
     '''
     dir: expects full path
+    source_hash: hash_agent_sources(dir)
+    previous_build: in-flight build of older sources, it has to finish before
+        this one can reuse the build directory
     returns: path to agent executable
     '''
+    bot = os.path.basename(dir)
+    if previous_build is not None:
+        try:
+            await previous_build
+        except Exception:
+            pass
+
     # create build directory
     build_dir = os.path.join(dir, "build")
     os.makedirs(build_dir, exist_ok=True)
 
-    # create build configs and run make
-    sps.run(['cmake', '..'], cwd=build_dir, check=True, stdout=sps.DEVNULL, stderr=sps.DEVNULL)
-    sps.run(["cmake", "--build", "."], cwd=build_dir, check=True, stdout=sps.DEVNULL, stderr=sps.DEVNULL)
+    build_status[bot] = {
+        'state': 'building',
+        'sourceHash': source_hash,
+        'startedAt': time.time(),
+        'durationSecs': None,
+        'error': None,
+    }
 
+    # create build configs and run make
+    try:
+        await run_build_step(['cmake', '..'], build_dir)
+        await run_build_step(["cmake", "--build", "."], build_dir)
+    except (OSError, sps.CalledProcessError) as e:
+        build_status[bot]['state'] = 'failed'
+        build_status[bot]['error'] = e.output if isinstance(e, sps.CalledProcessError) else str(e)
+        raise
+    finally:
+        build_status[bot]['durationSecs'] = time.time() - build_status[bot]['startedAt']
+
+    with open(os.path.join(build_dir, '.source_hash'), 'w') as f:
+        f.write(source_hash)
+
+    build_status[bot]['state'] = 'ready'
     return [os.path.join(build_dir, 'agent')]
 
 
+async def ensure_cpp_agent_built(bot, source_hash):
+    '''
+    Build bot unless its executable is already up to date with source_hash.
+    Concurrent callers asking for the same sources share a single build.
+    A build leaves build_tasks once it finishes: later callers check the
+    executable on disk again, and a failed build is retried.
+    '''
+    dir = get_agent_dir(bot)
+    in_flight = build_tasks.get(bot)
+
+    if in_flight is None or in_flight[0] != source_hash:
+        if await asyncio.to_thread(is_build_current, dir, source_hash):
+            if build_status.get(bot, {}).get('state') != 'building':
+                build_status[bot] = {
+                    'state': 'ready',
+                    'sourceHash': source_hash,
+                    'startedAt': None,
+                    'durationSecs': None,
+                    'error': None,
+                }
+            return [os.path.join(dir, "build", "agent")]
+
+        # another caller may have started this build while we were checking
+        in_flight = build_tasks.get(bot)
+        if in_flight is None or in_flight[0] != source_hash:
+            previous_build = in_flight[1] if in_flight is not None else None
+            task = asyncio.create_task(build_cpp_agent(dir, source_hash, previous_build))
+            in_flight = (source_hash, task)
+            build_tasks[bot] = in_flight
+
+            def forget_build(task):
+                if build_tasks.get(bot, (None, None))[1] is task:
+                    del build_tasks[bot]
+
+            task.add_done_callback(forget_build)
+
+    # shield so one cancelled caller does not abort the build for everyone else
+    return await asyncio.shield(in_flight[1])
+
+
 def get_python_agent(bot):
-    return f"{sys.executable} -m {bot}".split()
+    # python agents only hold a submission, the shared harness in dots_core runs it
+    return [sys.executable, "-m", PYTHON_HARNESS, bot]
+
+
+def get_agent_source_hash(bot):
+    '''
+    Hash of everything an agent runs: its own sources, plus the shared harness for python agents
+    '''
+    source_hash = hash_agent_sources(get_agent_dir(bot))
+    if bot in python_agents:
+        harness_hash = hash_agent_sources(get_agent_dir(PYTHON_HARNESS))
+        source_hash = hashlib.sha256((source_hash + harness_hash).encode()).hexdigest()
+    return source_hash
 
 
 '''
@@ -221,6 +356,15 @@ async def forward_stderr_to_stdout(process):
         sys.stdout.flush()
 
 
+async def stop_process(proc):
+    proc.stdin.close()
+    try:
+        await asyncio.wait_for(proc.wait(), timeout=1)  # wait max 1 sec
+    except asyncio.TimeoutError:
+        proc.terminate()
+        await asyncio.wait_for(proc.wait(), timeout=2)
+
+
 async def close_procs():
     global processes, bot1, bot2, bot_moves, current_board, is_bot_initialized, time_taken
 
@@ -230,12 +374,7 @@ async def close_procs():
         if proc is None:
             continue
 
-        proc.stdin.close()
-        try:
-            await asyncio.wait_for(proc.wait(), timeout=1)  # wait max 1 sec
-        except asyncio.TimeoutError:
-            proc.terminate()
-            await asyncio.wait_for(proc.wait(), timeout=2)
+        await stop_process(proc)
     
     processes = [None, None]
     bot1 = None
@@ -246,6 +385,84 @@ async def close_procs():
     time_taken = [None, None]
 
 
+'''
+STEP 3.5: Warm pool of agent processes
+Agents block on the !REQ_PLAYER_NUM handshake right after startup, so processes
+can be spawned ahead of time and handed to the next game that needs them.
+'''
+async def spawn_agent(bot, source_hash):
+    if bot in cpp_agents:
+        bot_path = await ensure_cpp_agent_built(bot, source_hash)
+    else:
+        bot_path = get_python_agent(bot)
+
+    proc = await asyncio.create_subprocess_exec(
+        *bot_path,
+        stdin=asyncio.subprocess.PIPE,
+        stdout=asyncio.subprocess.PIPE,
+        stderr=asyncio.subprocess.PIPE,
+        # this server answers !REQ_MOVES_TIMED, python agents may use it
+        env={**os.environ, 'DOTS_PUSH_TIME': '1'},
+    )
+
+    asyncio.create_task(forward_stderr_to_stdout(proc))
+    return proc
+
+
+async def acquire_agent(bot):
+    '''
+    Hand out a warm process for bot, spawning one if none is usable.
+    Processes started from older sources (or that died) are retired.
+    '''
+    source_hash = await asyncio.to_thread(get_agent_source_hash, bot)
+    pool = agent_pool.setdefault(bot, deque())
+
+    while pool:
+        warm_hash, proc = pool.popleft()
+        if warm_hash == source_hash and proc.returncode is None:
+            return proc
+        await retire_process(proc)
+
+    return await spawn_agent(bot, source_hash)
+
+
+async def refill_agent_pool(bot):
+    if bot in refilling_pools:
+        return
+    refilling_pools.add(bot)
+
+    try:
+        source_hash = await asyncio.to_thread(get_agent_source_hash, bot)
+        pool = agent_pool.setdefault(bot, deque())
+        while len(pool) < AGENT_POOL_SIZE:
+            pool.append((source_hash, await spawn_agent(bot, source_hash)))
+    except Exception as e:
+        print(f"Could not warm up {bot}: {e}")
+    finally:
+        refilling_pools.discard(bot)
+
+
+async def refill_agent_pools():
+    # only agents that have played get a pool (acquire_agent creates it), so
+    # the many agents nobody picks cost no processes or builds; they are
+    # warmed independently so a slow C++ build does not hold up the rest
+    await asyncio.gather(*[refill_agent_pool(bot) for bot in list(agent_pool)])
+
+
+async def retire_process(proc):
+    # warm processes have not started a game yet, so there is nothing to wind down
+    if proc.returncode is None:
+        proc.terminate()
+        await proc.wait()
+
+
+async def drain_agent_pools():
+    for pool in agent_pool.values():
+        while pool:
+            _, proc = pool.popleft()
+            await retire_process(proc)
+
+
 async def get_line(proc):
     try:
         line = await asyncio.wait_for(proc.stdout.readline(), timeout=TIME_LIMIT_SECS)
@@ -267,12 +484,18 @@ async def send_line(proc, cmd):
 
 
 async def get_moves(proc, playerID):
+    '''
+    returns: moves, time charged to the player, and a breakdown of that time
+        as seen by the server (thinking vs. receiving the moves)
+    '''
     global time_taken
     start_time = time.perf_counter()
+    time_requests = 0
 
     while True:
         line = await get_line(proc)
         if line == '!REQ_TIME':
+            time_requests += 1
             await send_line(proc, int(1000*(TIME_LIMIT_SECS - time_taken[playerID-1] - (time.perf_counter() - start_time))))
             continue
         elif not line:
@@ -282,6 +505,7 @@ async def get_moves(proc, playerID):
         break
 
     assert line == '!SENDING_MOVES', "Agent not configured properly!"
+    think_end_time = time.perf_counter()
 
     num_moves = await get_line(proc)
     num_moves = int(num_moves)
@@ -294,7 +518,12 @@ async def get_moves(proc, playerID):
     
     end_time = time.perf_counter()
 
-    return moves, end_time - start_time
+    stats = {
+        'thinkSecs': think_end_time - start_time,
+        'receiveSecs': end_time - think_end_time,
+        'timeRequests': time_requests,
+    }
+    return moves, end_time - start_time, stats
 
 
 async def send_moves(proc, moves):
@@ -320,35 +549,27 @@ async def init_bot(proc, playerID, board):
 
 
 async def start_new_game(bot1_, bot2_, board):
-    global processes, bot1, bot2, current_board, time_taken, bot_moves
+    global processes, bot1, bot2, current_board, time_taken, bot_moves, game_id, game_timeline
     bot1 = bot1_
     bot2 = bot2_
     current_board = board
     time_taken = [0, 0]
     bot_moves = [deque(), deque()]
+    game_id += 1
+    game_timeline = []
 
     for i, bot in enumerate([bot1_, bot2_]):
         if bot == 'Human':
             continue
 
-        bot_path = ''
-        if bot in cpp_agents:
-            bot_path = build_cpp_agent(os.path.join(os.getcwd(), bot))
-        elif bot in python_agents:
-            bot_path = get_python_agent(bot)
-
-        processes[i] = await asyncio.create_subprocess_exec(
-            *bot_path,
-            stdin=asyncio.subprocess.PIPE,
-            stdout=asyncio.subprocess.PIPE,
-            stderr=asyncio.subprocess.PIPE,
-        )
-
-        asyncio.create_task(forward_stderr_to_stdout(processes[i]))
+        processes[i] = await acquire_agent(bot)
 
         # now send the init stuff
         await init_bot(processes[i], i+1, current_board)
 
+    # replace the processes this game took from the pool
+    asyncio.create_task(refill_agent_pools())
+
 
 async def update_bot_and_get_move(proc, playerID, previousMoves):
     global current_board, is_bot_initialized, time_taken
@@ -360,11 +581,14 @@ async def update_bot_and_get_move(proc, playerID, previousMoves):
             play_moves_on_current_board(previousMoves, playerID=1)
 
         # send the board to initialise
+        send_start_time = time.perf_counter()
         await send_line(proc, current_board)
+        send_secs = time.perf_counter() - send_start_time
 
         # get moves
-        moves, time_taken_for_move = await get_moves(proc, playerID)
+        moves, time_taken_for_move, stats = await get_moves(proc, playerID)
         time_taken[playerID-1] += time_taken_for_move
+        record_turn(playerID, moves, send_secs, stats)
 
         for move in moves:
             bot_moves[playerID-1].append({
@@ -384,12 +608,18 @@ async def update_bot_and_get_move(proc, playerID, previousMoves):
         
     # send previous move to bot
     line = await get_line(proc)
-    assert line == "!REQ_MOVES", "Bot is not asking for opponent moves!"
+    assert line in ("!REQ_MOVES", "!REQ_MOVES_TIMED"), "Bot is not asking for opponent moves!"
 
+    send_start_time = time.perf_counter()
+    if line == "!REQ_MOVES_TIMED":
+        # the clock left comes first, so the bot needs no !REQ_TIME this turn
+        await send_line(proc, int(1000*(TIME_LIMIT_SECS - time_taken[playerID-1])))
     await send_moves(proc, previousMoves)
+    send_secs = time.perf_counter() - send_start_time
 
-    moves, time_taken_for_move = await get_moves(proc, playerID)
+    moves, time_taken_for_move, stats = await get_moves(proc, playerID)
     time_taken[playerID-1] += time_taken_for_move
+    record_turn(playerID, moves, send_secs, stats)
 
     for move in moves:
         bot_moves[playerID-1].append({
@@ -405,9 +635,120 @@ async def update_bot_and_get_move(proc, playerID, previousMoves):
 
 
 
+'''
+STEP 3.75: Per-move telemetry
+'''
+def get_agent_metrics(bot):
+    if bot not in agent_metrics:
+        agent_metrics[bot] = {
+            'turns': 0,
+            'moves': 0,
+            'continuationMoves': 0,
+            'timeRequests': 0,
+            'thinkSecs': 0.0,
+            'protocolSecs': 0.0,
+            'thinkBuckets': [0] * len(THINK_TIME_BUCKETS_SECS),
+        }
+    return agent_metrics[bot]
+
+
+def record_turn(playerID, moves, send_secs, stats):
+    '''
+    Add one bot turn (a batch of moves, all but the last being captures)
+    to the game timeline and to the per-agent counters.
+    '''
+    bot = bot1 if playerID == 1 else bot2
+    protocol_secs = send_secs + stats['receiveSecs']
+
+    game_timeline.append({
+        'turn': len(game_timeline) + 1,
+        'playerID': playerID,
+        'agent': bot,
+        'moves': moves,
+        'continuationMoves': max(0, len(moves) - 1),
+        'thinkSecs': stats['thinkSecs'],
+        'sendSecs': send_secs,
+        'receiveSecs': stats['receiveSecs'],
+        'protocolSecs': protocol_secs,
+        'timeRequests': stats['timeRequests'],
+        'timeRemainingSecs': TIME_LIMIT_SECS - time_taken[playerID-1],
+    })
+
+    metrics = get_agent_metrics(bot)
+    metrics['turns'] += 1
+    metrics['moves'] += len(moves)
+    metrics['continuationMoves'] += max(0, len(moves) - 1)
+    metrics['timeRequests'] += stats['timeRequests']
+    metrics['thinkSecs'] += stats['thinkSecs']
+    metrics['protocolSecs'] += protocol_secs
+    for i, bound in enumerate(THINK_TIME_BUCKETS_SECS):
+        if stats['thinkSecs'] <= bound:
+            metrics['thinkBuckets'][i] += 1
+
+
+def format_prometheus_metrics():
+    lines = [
+        '# HELP dots_agent_turns_total Turns (batches of moves) played by an agent.',
+        '# TYPE dots_agent_turns_total counter',
+    ]
+    lines += [f'dots_agent_turns_total{{agent="{bot}"}} {m["turns"]}' for bot, m in agent_metrics.items()]
+
+    lines += [
+        '# HELP dots_agent_moves_total Moves played by an agent.',
+        '# TYPE dots_agent_moves_total counter',
+    ]
+    lines += [f'dots_agent_moves_total{{agent="{bot}"}} {m["moves"]}' for bot, m in agent_metrics.items()]
+
+    lines += [
+        '# HELP dots_agent_continuation_moves_total Moves played after a capture within the same turn.',
+        '# TYPE dots_agent_continuation_moves_total counter',
+    ]
+    lines += [f'dots_agent_continuation_moves_total{{agent="{bot}"}} {m["continuationMoves"]}' for bot, m in agent_metrics.items()]
+
+    lines += [
+        '# HELP dots_agent_time_requests_total !REQ_TIME round trips made by an agent.',
+        '# TYPE dots_agent_time_requests_total counter',
+    ]
+    lines += [f'dots_agent_time_requests_total{{agent="{bot}"}} {m["timeRequests"]}' for bot, m in agent_metrics.items()]
+
+    lines += [
+        '# HELP dots_agent_protocol_seconds_total Time spent sending the board/moves and receiving the reply.',
+        '# TYPE dots_agent_protocol_seconds_total counter',
+    ]
+    lines += [f'dots_agent_protocol_seconds_total{{agent="{bot}"}} {m["protocolSecs"]}' for bot, m in agent_metrics.items()]
+
+    lines += [
+        '# HELP dots_agent_think_seconds Time from handing a turn to the agent until it starts sending moves.',
+        '# TYPE dots_agent_think_seconds histogram',
+    ]
+    for bot, m in agent_metrics.items():
+        for bound, count in zip(THINK_TIME_BUCKETS_SECS, m['thinkBuckets']):
+            lines.append(f'dots_agent_think_seconds_bucket{{agent="{bot}",le="{bound}"}} {count}')
+        lines.append(f'dots_agent_think_seconds_bucket{{agent="{bot}",le="+Inf"}} {m["turns"]}')
+        lines.append(f'dots_agent_think_seconds_sum{{agent="{bot}"}} {m["thinkSecs"]}')
+        lines.append(f'dots_agent_think_seconds_count{{agent="{bot}"}} {m["turns"]}')
+
+    lines += [
+        '# HELP dots_player_time_remaining_seconds Clock left for each player of the current game.',
+        '# TYPE dots_player_time_remaining_seconds gauge',
+    ]
+    for i, bot in enumerate([bot1, bot2]):
+        if bot is not None and bot != 'Human' and time_taken[i] is not None:
+            lines.append(f'dots_player_time_remaining_seconds{{player="{i+1}",agent="{bot}"}} {TIME_LIMIT_SECS - time_taken[i]}')
+
+    return '\n'.join(lines) + '\n'
+
+
+
 '''
 STEP 4: Setup the server
 '''
+@app.on_event("shutdown")
+async def shut_down_agents():
+    await close_procs()
+    await drain_agent_pools()
+
+
 @app.get("/")
 async def home():
     return FileResponse('./static/index.html')
@@ -419,6 +760,29 @@ def send_all_agents():
     return cpp_agents + python_agents
 
 
+@app.get("/build-status")
+def send_build_status():
+    global build_status
+    return build_status
+
+
+@app.get("/metrics", response_class=PlainTextResponse)
+def send_metrics():
+    return format_prometheus_metrics()
+
+
+@app.get("/game-timeline")
+def send_game_timeline():
+    global game_id, game_timeline
+    return {
+        'game': game_id,
+        'bot1': bot1,
+        'bot2': bot2,
+        'timeLimitSecs': TIME_LIMIT_SECS,
+        'turns': game_timeline,
+    }
+
+
 @app.post("/start-game")
 async def start_new_game_endpoint(request: NewGameRequest):
     await close_procs()